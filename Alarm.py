@@ -1,4 +1,98 @@
-class AlarmTypePOD:
-    def __init__(self, at_id: int, alarm_desc: str):
-        self.at_id = at_id
-        self.alarm_desc = alarm_desc
\ No newline at end of file
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from PyQt6.QtSql import QSqlQuery
+
+from src.io import DpLog
+from src.io.ConnectionPool import current_db
+
+
+class AlarmTypePOD:
+    """
+    An alarm type, identified by its AT_ID. Get instances from alarm_types rather than creating
+    them, so that every result uses the same instance for the same alarm type.
+    """
+    __slots__ = ("at_id", "alarm_desc")
+
+    def __init__(self, at_id: int, alarm_desc: str):
+        self.at_id = at_id
+        self.alarm_desc = alarm_desc
+
+    def __eq__(self, other):
+        if not isinstance(other, AlarmTypePOD):
+            return NotImplemented
+        return self.at_id == other.at_id
+
+    def __hash__(self):
+        return hash(self.at_id)
+
+    def __repr__(self):
+        return "AlarmTypePOD(%i, %r)" % (self.at_id, self.alarm_desc)
+
+
+class AlarmTypeRegistry:
+    """
+    In memory copy of ALARM_TYPE, loaded once and handing out one AlarmTypePOD per AT_ID.
+
+    The table's version, its row count and max AT_ID, is checked at most every version_ttl
+    seconds, and the table is reloaded when it changed. Edits to the description of an existing
+    row don't change the version; call refresh(force=True) after making one.
+    """
+    def __init__(self, version_ttl: float = 30.0):
+        self.version_ttl = version_ttl
+
+        self._types: Dict[int, AlarmTypePOD] = {}
+        self._version: Optional[Tuple[int, int]] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, at_id: int) -> AlarmTypePOD:
+        """
+        The alarm type with this AT_ID. An alarm code missing from ALARM_TYPE gets a type described by its code.
+        """
+        self.refresh()
+        with self._lock:
+            alarm_type = self._types.get(at_id)
+            if alarm_type is None:
+                alarm_type = self._types[at_id] = AlarmTypePOD(at_id, str(at_id))
+            return alarm_type
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Reloads ALARM_TYPE if its version changed since the last load
+        :param force: reload without checking the version
+        :return: False if the table couldn't be read, the previous copy is kept then
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._version is not None and now - self._checked <= self.version_ttl:
+                return True
+
+            db = current_db()
+            query = QSqlQuery(db)
+            if not query.exec("SELECT COUNT(AT_ID), MAX(AT_ID) FROM ALARM_TYPE") or not query.next():
+                DpLog.log().error("Failed to query the alarm type version: %s", query.lastError().text())
+                return False
+            version = (int(query.value(0) or 0), int(query.value(1) or 0))
+            self._checked = now
+            if not force and version == self._version:
+                return True
+
+            query.setForwardOnly(True)
+            if not query.exec("SELECT AT_ID, ALARM_DESC FROM ALARM_TYPE"):
+                DpLog.log().error("Failed to query alarm types: %s", query.lastError().text())
+                return False
+            while query.next():
+                at_id = int(query.value(0))
+                alarm_desc = str(query.value(1) or "")
+                alarm_type = self._types.get(at_id)
+                # Existing instances are kept unless their description changed, so results stay comparable
+                if alarm_type is None or alarm_type.alarm_desc != alarm_desc:
+                    self._types[at_id] = AlarmTypePOD(at_id, alarm_desc)
+            self._version = version
+            DpLog.log().debug("Loaded %i alarm types", version[0])
+            return True
+
+
+alarm_types = AlarmTypeRegistry()
@@ -1,1129 +1,1095 @@
-from typing import Dict, List
-
-from PyQt6.QtSql import QSqlQuery
-
-from src.dao import MachineStatus, Alarm
-from src.dao.Machine import MachinePOD
-from src.io import DpLog
-from src.io.DatabaseIO import DatabaseIO
-
-# Frequency Analysis
-    # state
-class MachineStateDistributionPOD:
-    """
-    Holds state distribution data for a single machine.
-    contains the Machine ID, the Machine Name, and a Dict mapping
-    the state type to a floating point percentage of the time spent
-    in that state, between 0-1.0
-    """
-    def __init__(self, mach_id: int,
-                 mach_name: str,
-                 states: Dict[MachineStatus.MachineStateType, float]):
-        self.mach_id = mach_id
-        self.mach_name = mach_name
-        self.states = states
-
-class MachineGoodbadDistributionPOD:
-    """
-    Holds good/bad production distribution data for a single machine.
-    contains the Machine ID, the Machine Name, good production and bad production
-    """
-    def __init__(self, mach_id: int,
-                 mach_name: str,
-                 mach_goodprod: float,
-                 mach_badprod: float):
-        self.mach_id = mach_id
-        self.mach_name = mach_name
-        self.mach_goodprod = mach_goodprod
-        self.mach_badprod = mach_badprod
-
-class MachineStateavgprodDistributionPOD:
-    """
-    Holds average production distribution data for a single machine for each state.
-    contains the Machine ID, the Machine Name, and a Dict mapping
-    the state type to an floating number of the average production in that state, between 0.0-1.0
-    """
-    def __init__(self, mach_id: int,
-                 mach_name: str,
-                 states: Dict[MachineStatus.MachineStateType, float]):
-        self.mach_id = mach_id
-        self.mach_name = mach_name
-        self.states = states
-
-class MachineStateavgspeedDistributionPOD:
-    """
-    Holds average speed distribution data for a single machine for each state.
-    contains the Machine ID, the Machine Name, and a Dict mapping
-    the state type to an floating number of the average production in that state, between 0.0-1.0
-    """
-    def __init__(self, mach_id: int,
-                 mach_name: str,
-                 states: Dict[MachineStatus.MachineStateType, float]):
-        self.mach_id = mach_id
-        self.mach_name = mach_name
-        self.states = states
-
-    # alarm
-class MachineAlarmCountPOD:
-    """
-    Holds count of each alarm type data for a single machine
-    contains the Machine ID, alarm_name and alarm count
-    """
-    def __init__(self, mach_id: int):
-        self.mach_id = mach_id
-        self.alarm_counts: Dict[Alarm.AlarmTypePOD, int] = {} # alarm_count is a dictionary where the key is with the type of alarmtypePOD and value is an int
-
-class MachineAlarmCleartimePOD:
-    """
-    Holds cleartime of each alarm type data for a single machine
-    contains the Machine ID, alarm_name and alarm count
-    """
-    def __init__(self, mach_id: int):
-        self.mach_id = mach_id
-        self.alarm_cleartime: Dict[Alarm.AlarmTypePOD, float] = {} # alarm_cleartime is a dictionary where the key is with the type of alarmtypePOD and value is a float
-
-class MachineAlarmAvgclearPOD:
-    """
-    Holds average cleartime of each alarm type data for a single machine
-    contains the Machine ID, alarm_name and alarm count
-    """
-    def __init__(self, mach_id: int):
-        self.mach_id = mach_id
-        self.alarm_avgclear: Dict[Alarm.AlarmTypePOD, float] = {} # alarm_avgclear is a dictionary where the key is with the type of alarmtypePOD and value is a float
-
-
-# Time Series Analysis
-
-    # time
-class MachineAvgspeedTimePOD:
-    """
-    Holds average speed data for a single machine.
-    contains the Machine ID, the Machine Name, Hour, average speed
-    """
-
-    def __init__(self, mach_id: int,
-                 mach_name: str,
-                 hour: int,
-                 average_speed: float):
-        self.mach_id = mach_id
-        self.mach_name = mach_name
-        self.hour = hour
-        self.average_speed = average_speed
-
-class MachineAvgprodTimePOD:
-    """
-    Holds average production data for a single machine.
-    contains the Machine ID, the Machine Name, Hour, average production
-    """
-
-    def __init__(self, mach_id: int,
-                 mach_name: str,
-                 hour: int,
-                 average_prod: float):
-        self.mach_id = mach_id
-        self.mach_name = mach_name
-        self.hour = hour
-        self.average_prod = average_prod
-
-
-
-
-
-
-    # hour
-class MachineAvgspeedHourPOD:
-    """
-    Holds average speed data for a single machine, hourly in one day.
-    contains the Machine ID, the Machine Name, Hour, average speed
-    """
-    def __init__(self, mach_id: int):
-        self.mach_id = mach_id
-        self.avg_speed = [0.0] * 24  # create a list of 24 items and each item is a floating number
-
-class MachineAvgprodHourPOD:
-    """
-    Holds average speed data for a single machine, hourly in one day.
-    contains the Machine ID, the Machine Name, Hour, average speed
-    """
-    def __init__(self, mach_id: int):
-        self.mach_id = mach_id
-        self.avg_prod = [0.0] * 24  # create a list of 24 items and each item is a floating number
-
-class MachineGoodbadratioHourPOD:
-    """
-    Holds good/bad ratio data for a single machine, hourly in one day.
-    contains the Machine ID, the Machine Name, Hour, good/bad ratio
-    """
-    def __init__(self, mach_id: int):
-        self.mach_id = mach_id
-        self.good_bad_ratio = [0.0] * 24  # create a list of 24 items and each item is a floating number
-
-class MachineUptimeHourPOD:
-    """
-    Holds good/bad ratio data for a single machine, hourly in one day.
-    contains the Machine ID, the Machine Name, Hour, uptime percentage
-    """
-    def __init__(self, mach_id: int):
-        self.mach_id = mach_id
-        self.uptime_percent = [0.0] * 24  # create a list of 24 items and each item is a floating number
-
-class AnalyticsDAO:
-
-# Frequency Analysis
-    # state distribution
-    @staticmethod
-    def get_machines_state_distribution(t_start: int, t_end: int, machines: List[MachinePOD]) -> List[MachineStateDistributionPOD]:
-        """
-        Queries a list of the distribution of states of each machine on a certain time range
-        :param t_start: start of the range, unix time
-        :param t_end: end of the range, unix time
-        :param machines: list of all machines, for initializing the data
-        :return:
-        """
-
-        query_str = """SELECT 
-   	ms2.MACHINE_ID,
-    ms2.CURRENT_STATE,
-  	COUNT(ms2.STS_ID) / (SELECT 
-                         	COUNT(ms1.STS_ID) 
-                         FROM MACHINE_STATUS ms1 
-                         WHERE ms1.MACHINE_ID=ms2.MACHINE_ID
-                         AND ms2.STS_TIME >= :t_start AND ms2.STS_TIME <= :t_end
-    ) AS TIME_FRAC
-FROM MACHINE_STATUS ms2
-WHERE
-	ms2.STS_TIME >= :t_start AND ms2.STS_TIME <= :t_end
-GROUP BY ms2.MACHINE_ID, ms2.CURRENT_STATE"""
-
-        db = DatabaseIO().get_db()
-        query = QSqlQuery(db)
-
-        query.prepare(query_str)
-        query.bindValue(":t_start", t_start)
-        query.bindValue(":t_end", t_end)
-
-        ok = query.exec()
-
-        if not ok:
-            DpLog.log().error("Failed to query get machine state distribution: %s", query.lastError().text())
-            return []
-        else:
-            num_sts = query.size()
-            DpLog.log().debug("Found %i machine state distribution", num_sts)
-
-            # start from here
-            sts_dist: List[MachineStateDistributionPOD] = []  # create a list with the type of MachineStateDistributionPOD
-
-            for m in machines:  # iterate all instances in machine List
-                new_sd = MachineStateDistributionPOD(
-                    mach_id=m.get_machine_id(),
-                    mach_name=m.get_machine_name(),
-                    states={}  # create an empty dictionary
-                )  # create an instance of class MachineStateDistributionPOD, three arguments of the __init__ method
-
-                for s in MachineStatus.MachineStateType:  # iterate all instances in MachineStateType enum class under MachineStatus file
-                    new_sd.states[s] = 0.0  # mapping the time related to the key of machinestateype in the enum and add to the dictionary new_sd.state, initialize to 0.0
-
-                sts_dist.append(new_sd)  # add new_sd to sts_dist
-
-            while query.next():  # iterate all the query results
-                mach_id_query = int(query.value(0))
-                state = MachineStatus.MachineStateType(int(query.value(1)))
-                total_time = float(query.value(2))
-
-                for i in range(len(sts_dist)):
-                    if sts_dist[i].mach_id == mach_id_query:
-                        sts_dist[i].states[state] = total_time
-            return sts_dist
-
-    @staticmethod
-    def get_machines_goodbad_distribution(t_start: int, t_end: int, machines: List[MachinePOD]) -> List[MachineStateDistributionPOD]:
-        """
-        Queries a list of the distribution of good and bad production of each machine on a certain time range
-        :param t_start: start of the range, unix time
-        :param t_end: end of the range, unix time
-        :param machines: list of all machines, for initializing the data
-        :return:
-        """
-
-        query_str = """SELECT
-	MACHINE_ID,
-	GOOD_PROD,
-    BAD_PROD
-FROM	
-	(
-	SELECT
-    	MACHINE_ID,
-    	SUM(CASE
-            	WHEN CURRENT_STATE=5
-            	THEN COUNT_PROD
-            	ELSE 0
-        	END) AS GOOD_PROD,
-    	SUM(CASE
-            	WHEN CURRENT_STATE=5
-            	THEN 0
-            	ELSE COUNT_PROD
-        	END) AS BAD_PROD
-	FROM
-    	MACHINE_STATUS
-    WHERE
-        STS_TIME>=:t_start and STS_TIME<=:t_end
-	GROUP BY
-    	MACHINE_ID
-    ) AS SUBQ"""
-
-        db = DatabaseIO().get_db()
-        query = QSqlQuery(db)
-
-        query.prepare(query_str)
-        query.bindValue(":t_start", t_start)
-        query.bindValue(":t_end", t_end)
-
-        ok = query.exec()
-
-        if not ok:
-            DpLog.log().error("Failed to query get machine good/bad production distribution: %s", query.lastError().text())
-            return []
-        else:
-            num_sts = query.size()
-            DpLog.log().debug("Found %i machine good/bad production distribution", num_sts)
-
-            # start from here
-            mach_goodbad_dist: List[MachineGoodbadDistributionPOD] = []  # create a list with the type of MachineGoodbadDistributionPOD
-
-            for m in machines:  # iterate all instances in machine List
-                new_sd = MachineGoodbadDistributionPOD(
-                    mach_id=m.get_machine_id(),
-                    mach_name=m.get_machine_name(),
-                    mach_goodprod=0.0,
-                    mach_badprod=0.0
-                )  # create an instance of class MachineGoodbadDistributionPOD, four arguments of the __init__ method
-
-                mach_goodbad_dist.append(new_sd)  # add new_sd to mach_goodbad_dist
-
-            while query.next():  # iterate all the query results
-                mach_id_query = int(query.value(0))
-                good_prod_query = int(query.value(1))
-                bad_prod_query = int(query.value(2))
-
-
-                for i in range(len(mach_goodbad_dist)):
-                    if mach_goodbad_dist[i].mach_id == mach_id_query:
-                        mach_goodbad_dist[i].mach_goodprod = good_prod_query
-                        mach_goodbad_dist[i].mach_badprod = bad_prod_query
-            return mach_goodbad_dist
-
-    @staticmethod
-    def get_machines_stateavgprod_distribution(t_start: int, t_end: int, machines: List[MachinePOD]) -> List[MachineStateavgprodDistributionPOD]:
-        """
-        Queries a list of the distribution of average production each states of each machine on a certain time range
-        :param t_start: start of the range, unix time
-        :param t_end: end of the range, unix time
-        :param machines: list of all machines, for initializing the data
-        :return:
-        """
-
-        query_str = """SELECT
-	MACHINE_ID,
-	CURRENT_STATE,
-	AVG(COUNT_PROD) AS AVERAGE_PRODUCTION
-FROM
-	MACHINE_STATUS
-WHERE
-    STS_TIME>=:t_start and STS_TIME<=:t_end
-GROUP BY
-	MACHINE_ID,
-	CURRENT_STATE"""
-
-        db = DatabaseIO().get_db()
-        query = QSqlQuery(db)
-
-        query.prepare(query_str)
-        query.bindValue(":t_start", t_start)
-        query.bindValue(":t_end", t_end)
-
-        ok = query.exec()
-
-        if not ok:
-            DpLog.log().error("Failed to query get machine average production for each state distribution: %s", query.lastError().text())
-            return []
-        else:
-            num_sts = query.size()
-            DpLog.log().debug("Found %i machine average production for each state distribution", num_sts)
-
-            # start from here
-            machine_avgprod_dist: List[MachineStateavgprodDistributionPOD] = []  # create a list with the type of MachineStateavgprodDistributionPOD
-
-            for m in machines:  # iterate all instances in machine List
-                new_sd = MachineStateavgprodDistributionPOD(
-                    mach_id=m.get_machine_id(),
-                    mach_name=m.get_machine_name(),
-                    states={}  # create an empty dictionary
-                )  # create an instance of class MachineStateDistributionPOD, three arguments of the __init__ method
-
-                for s in MachineStatus.MachineStateType:  # iterate all instances in MachineStateType enum class under MachineStatus file
-                    new_sd.states[s] = 0.0  # mapping the time related to the key of machinestateype in the enum and add to the dictionary new_sd.state, initialize to 0.0
-
-                machine_avgprod_dist.append(new_sd)  # add new_sd to  machine_avgprod_dist
-
-            while query.next():  # iterate all the query results
-                mach_id_query = int(query.value(0))
-                state = MachineStatus.MachineStateType(int(query.value(1)))
-                average_production = float(query.value(2))
-
-                for i in range(len(machine_avgprod_dist)):
-                    if machine_avgprod_dist[i].mach_id == mach_id_query:
-                        machine_avgprod_dist[i].states[state] = average_production
-            return machine_avgprod_dist
-
-    @staticmethod
-    def get_machines_stateavgspeed_distribution(t_start: int, t_end: int, machines: List[MachinePOD]) -> List[MachineStateavgspeedDistributionPOD]:
-        """
-        Queries a list of the distribution of average speed each states of each machine on a certain time range
-        :param t_start: start of the range, unix time
-        :param t_end: end of the range, unix time
-        :param machines: list of all machines, for initializing the data
-        :return:
-        """
-
-        query_str = """SELECT
-	MACHINE_ID,
-	CURRENT_STATE,
-	720*AVG(CURRENT_SPEED) AS AVERAGE_SPEED
-FROM
-	MACHINE_STATUS
-WHERE
-    STS_TIME>=:t_start and STS_TIME<=:t_end
-GROUP BY
-	MACHINE_ID,
-	CURRENT_STATE"""
-
-        db = DatabaseIO().get_db()
-        query = QSqlQuery(db)
-
-        query.prepare(query_str)
-        query.bindValue(":t_start", t_start)
-        query.bindValue(":t_end", t_end)
-
-        ok = query.exec()
-
-        if not ok:
-            DpLog.log().error("Failed to query get machine average speed for each state distribution: %s", query.lastError().text())
-            return []
-        else:
-            num_sts = query.size()
-            DpLog.log().debug("Found %i machine average speed for each state distribution", num_sts)
-
-            # start from here
-            machine_avgspeed_dist: List[MachineStateavgspeedDistributionPOD] = []  # create a list with the type of MachineStateavgspeedDistributionPOD
-
-            for m in machines:  # iterate all instances in machine List
-                new_sd = MachineStateavgspeedDistributionPOD(
-                    mach_id=m.get_machine_id(),
-                    mach_name=m.get_machine_name(),
-                    states={}  # create an empty dictionary
-                )  # create an instance of class MachineStateDistributionPOD, three arguments of the __init__ method
-
-                for s in MachineStatus.MachineStateType:  # iterate all instances in MachineStateType enum class under MachineStatus file
-                    new_sd.states[s] = 0.0  # mapping the time related to the key of machinestateype in the enum and add to the dictionary new_sd.state, initialize to 0.0
-
-                machine_avgspeed_dist.append(new_sd)  # add new_sd to machine_avgspeed_dist
-
-            while query.next():  # iterate all the query results
-                mach_id_query = int(query.value(0))
-                state = MachineStatus.MachineStateType(int(query.value(1)))
-                average_speed = float(query.value(2))
-
-                for i in range(len(machine_avgspeed_dist)):
-                    if machine_avgspeed_dist[i].mach_id == mach_id_query:
-                        machine_avgspeed_dist[i].states[state] = average_speed
-            return machine_avgspeed_dist
-
-
-    # alarm
-    @staticmethod  # frequency analysis count of alarm type per machine
-    def get_machine_alarm_count(t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> MachineAlarmCountPOD:
-        """
-        Queries a list of the count of each type of alarm of each machine on a certain time range
-        :param t_start: start of the range, unix time
-        :param t_end: end of the range, unix time
-        :param machines: list of all machines, for initializing the data
-        :return:
-        """
-
-        query_str = """SELECT
-	MA.MACHINE_ID,
-    MA.ALARM_CODE,
-    AT.ALARM_DESC,
-	COUNT(MA.ALARM_CODE) AS COUNT_ALARM
-FROM	
-	MACHINE_ALARM AS MA
-LEFT JOIN
-	ALARM_TYPE AS AT
-ON 
-	MA.ALARM_CODE=AT.AT_ID
-WHERE
-    MA.ALARM_TIME>=:t_start and MA.ALARM_TIME<=:t_end and MA.MACHINE_ID=:mach_id
-GROUP BY
-	MA.MACHINE_ID,
-    MA.ALARM_CODE
-ORDER BY
-	MA.MACHINE_ID,
-    MA.ALARM_CODE"""
-
-        db = DatabaseIO().get_db()
-        query = QSqlQuery(db)
-
-        query.prepare(query_str)
-        query.bindValue(":t_start", t_start)
-        query.bindValue(":t_end", t_end)
-        query.bindValue(":mach_id", mach_id)
-
-        ok = query.exec()
-
-        if not ok:
-            DpLog.log().error("Failed to query get count of each type of alarm per machine : %s",
-                              query.lastError().text())
-            return None
-        else:
-            num_sts = query.size()
-            DpLog.log().debug("Found %i count of each type of alarm per machine", num_sts)
-
-            # start from here
-
-            m = MachineAlarmCountPOD(mach_id)  # create an instance of class MachineHourPOD
-
-            while query.next():  # iterate all the query results
-                mach_id_query = int(query.value(0))
-                alarm_code_query = int(query.value(1))
-                alarm_desc_query = str(query.value(2))
-                alarm_counts_query = float(query.value(3))
-
-                ap = Alarm.AlarmTypePOD(alarm_code_query, alarm_desc_query)
-
-                m.alarm_counts[ap] = alarm_counts_query
-
-            return m
-
-    @staticmethod  # frequency analysis count of alarm type per machine
-    def get_machine_alarm_cleartime(t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> MachineAlarmCleartimePOD:
-        """
-        Queries a list of the cleartimet of each type of alarm of each machine on a certain time range
-        :param t_start: start of the range, unix time
-        :param t_end: end of the range, unix time
-        :param machines: list of all machines, for initializing the data
-        :return:
-        """
-
-        query_str = """
-SELECT 
-    DISTINCT MA.ALARM_CODE,
-    MA.MACHINE_ID,
-    AT.ALARM_DESC,
-    SUM(HOUR(TIMEDIFF(FROM_UNIXTIME(MA.ACK_TIME),FROM_UNIXTIME(MA.ALARM_TIME)))) AS ALARM_CLEAR_TIME
-FROM 
- 	MACHINE_ALARM MA
-LEFT JOIN
- 	ALARM_TYPE AS AT
-ON
- 	MA.ALARM_CODE = AT.AT_ID
-WHERE
-    ALARM_TIME>=:t_start and ACK_TIME<=:t_end and MACHINE_ID=:mach_id
-GROUP BY
-    MA.ALARM_CODE,
-    MA.MACHINE_ID
-
-"""
-
-        db = DatabaseIO().get_db()
-        query = QSqlQuery(db)
-
-        query.prepare(query_str)
-        query.bindValue(":t_start", t_start)
-        query.bindValue(":t_end", t_end)
-        query.bindValue(":mach_id", mach_id)
-
-        ok = query.exec()
-
-        if not ok:
-            DpLog.log().error("Failed to query get cleartime of each type of alarm per machine : %s",
-                              query.lastError().text())
-            return None
-        else:
-            num_sts = query.size()
-            DpLog.log().debug("Found %i cleartime of each type of alarm per machine", num_sts)
-
-            # start from here
-
-            m = MachineAlarmCleartimePOD(mach_id)
-
-            while query.next():  # iterate all the query results
-                mach_id_query = int(query.value(0))
-                alarm_code_query = int(query.value(1))
-                alarm_desc_query = str(query.value(2))
-                alarm_cleartime_query = float(query.value(3))
-
-                ap = Alarm.AlarmTypePOD(alarm_code_query, alarm_desc_query)
-
-                m.alarm_cleartime[ap] = alarm_cleartime_query
-
-            return m
-
-    @staticmethod  # frequency analysis count of alarm type per machine
-    def get_machine_alarm_avgclear(t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> MachineAlarmAvgclearPOD:
-        """
-        Queries a list of the average cleartime of each type of alarm of each machine on a certain time range
-        :param t_start: start of the range, unix time
-        :param t_end: end of the range, unix time
-        :param machines: list of all machines, for initializing the data
-        :return:
-        """
-
-        query_str = """
-SELECT 
-    DISTINCT MA.ALARM_CODE,
-    MA.MACHINE_ID,
-    AT.ALARM_DESC,
-    AVG(HOUR(TIMEDIFF(FROM_UNIXTIME(MA.ACK_TIME),FROM_UNIXTIME(MA.ALARM_TIME)))) AS ALARM_CLEAR_TIME
-FROM 
-  MACHINE_ALARM MA
-LEFT JOIN
-  ALARM_TYPE AS AT
-ON
-  MA.ALARM_CODE = AT.AT_ID
-GROUP BY
-    MA.ALARM_CODE,
-    MA.MACHINE_ID
-
-"""
-
-        db = DatabaseIO().get_db()
-        query = QSqlQuery(db)
-
-        query.prepare(query_str)
-        query.bindValue(":t_start", t_start)
-        query.bindValue(":t_end", t_end)
-        query.bindValue(":mach_id", mach_id)
-
-        ok = query.exec()
-
-        if not ok:
-            DpLog.log().error("Failed to query get average cleartime of each type of alarm per machine : %s",
-                              query.lastError().text())
-            return None
-        else:
-            num_sts = query.size()
-            DpLog.log().debug("Found %i average cleartime of each type of alarm per machine", num_sts)
-
-            # start from here
-
-            m = MachineAlarmAvgclearPOD(mach_id)
-
-            while query.next():  # iterate all the query results
-                mach_id_query = int(query.value(0))
-                alarm_code_query = int(query.value(1))
-                alarm_desc_query = str(query.value(2))
-                alarm_avgclear= float(query.value(3))
-
-                ap = Alarm.AlarmTypePOD(alarm_code_query, alarm_desc_query)
-
-                m.alarm_avgclear[ap] = alarm_avgclear
-
-            return m
-
-
-# Time Series Analysis
-    # time
-    @staticmethod
-    def get_machine_avgspeed_time(t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> List[MachineAvgspeedHourPOD]:
-        """
-        Queries a list of the average speed of each machine on a certain time range
-        :param t_start: start of the range, unix time
-        :param t_end: end of the range, unix time
-        :param machines: list of all machines, for initializing the data
-        :return:
-        """
-
-        query_str = """
-SELECT 
-    DISTINCT HOUR,
-    MACHINE_ID,
-    AVG(CURRENT_SPEED) AS AVERAGE_SPEED
-FROM 
-    (
-    SELECT
-        STS_ID,
-        MACHINE_ID,
-        COUNT_PROD,
-        CURRENT_SPEED,
-        FROM_UNIXTIME(STS_TIME) AS ACTUAL_TIME,
-        ROUND(STS_TIME/3600, 0) * 3600 AS HOUR
-    FROM 
- 	    MACHINE_STATUS
- 	WHERE
- 	    STS_TIME>=:t_start and STS_TIME<=:t_end and MACHINE_ID=:mach_id and CURRENT_STATE=5
-    ) AS SUBQ
-GROUP BY
-    HOUR,
-    MACHINE_ID
-ORDER BY
-    HOUR ASC
-"""
-
-        db = DatabaseIO().get_db()
-        query = QSqlQuery(db)
-
-        query.prepare(query_str)
-        query.bindValue(":t_start", t_start)
-        query.bindValue(":t_end", t_end)
-        query.bindValue(":mach_id", mach_id)
-
-        ok = query.exec()
-
-        if not ok:
-            DpLog.log().error("Failed to query get machine average speed: %s", query.lastError().text())
-            return []
-        else:
-            num_sts = query.size()
-            DpLog.log().debug("Found %i machine average speed", num_sts)
-
-            # start from here
-            mach_avgspeed_time_dist: List[MachineAvgspeedTimePOD] = []
-
-            ids_temp = []
-            names_temp = []
-            hours_temp = []
-            speed_temp = []
-            while query.next():  # iterate all the query results
-                """mach_id_query = int(query.value(1))
-                mach_name_query = ""
-                hour_query = int(query.value(0))
-                average_speed_query = int(query.value(2))
-
-                m = MachineAvgspeedHourPOD(mach_id_query, mach_name_query, hour_query, average_speed_query)
-                mach_avgspeed_hour_dist.append(m)"""
-                ids_temp.append(int(query.value(1)))
-                names_temp.append("")
-                hours_temp.append(int(query.value(0)))
-                speed_temp.append(float(query.value(2)))
-
-            average_window_side_hours = 1
-            filtered_speed = []
-            for row in range(len(ids_temp)):  # rolling average
-
-                # Find the row that's the average window's worth of hours before this row, limiting to row zero
-                row_start = row
-                while row_start > 0 and hours_temp[row_start] + average_window_side_hours > hours_temp[row]:
-                    row_start -= 1
-
-                # Find the row that's the average window's worth of hours after this row, limiting to the last row
-                row_end = row
-                while row_end < len(hours_temp)-1 and hours_temp[row_end] - average_window_side_hours < hours_temp[row]:
-                    row_end += 1
-
-                # average over the range of row_start to row_end. Includes row_end.
-                cnt = 0
-                tmp_spd = 0.0
-                for ar in range(row_start, row_end+1):
-                    cnt += 1
-                    tmp_spd += speed_temp[ar]
-
-                # Append filtered data to the output list
-                m = MachineAvgspeedTimePOD(ids_temp[row],
-                                           names_temp[row],
-                                           hours_temp[row],
-                                           int(tmp_spd / cnt))
-                mach_avgspeed_time_dist.append(m)
-
-            return mach_avgspeed_time_dist
-
-    @staticmethod
-    def get_machine_avgprod_time(t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> List[
-        MachineAvgprodTimePOD]:
-        """
-        Queries a list of the average prod of each machine on a certain time range
-        :param t_start: start of the range, unix time
-        :param t_end: end of the range, unix time
-        :param machines: list of all machines, for initializing the data
-        :return:
-        """
-
-        query_str = """
-SELECT 
-    DISTINCT HOUR,
-    MACHINE_ID,
-    360*AVG(COUNT_PROD) AS AVERAGE_PROD
-FROM 
-    (
-    SELECT
-        STS_ID,
-        MACHINE_ID,
-        COUNT_PROD,
-        CURRENT_SPEED,
-        FROM_UNIXTIME(STS_TIME) AS ACTUAL_TIME,
-        ROUND(STS_TIME/3600, 0) * 3600 AS HOUR
-    FROM 
- 	    MACHINE_STATUS
- 	WHERE
- 	    STS_TIME>=:t_start and STS_TIME<=:t_end and MACHINE_ID=:mach_id
-    ) AS SUBQ
-GROUP BY
-    HOUR,
-    MACHINE_ID
-ORDER BY
-    HOUR ASC
-"""
-
-        db = DatabaseIO().get_db()
-        query = QSqlQuery(db)
-
-        query.prepare(query_str)
-        query.bindValue(":t_start", t_start)
-        query.bindValue(":t_end", t_end)
-        query.bindValue(":mach_id", mach_id)
-
-        ok = query.exec()
-
-        if not ok:
-            DpLog.log().error("Failed to query get machine average prod: %s", query.lastError().text())
-            return []
-        else:
-            num_sts = query.size()
-            DpLog.log().debug("Found %i machine average prod", num_sts)
-
-            # start from here
-            mach_avgprod_time_dist: List[MachineAvgprodTimePOD] = []
-
-            ids_temp = []
-            names_temp = []
-            hours_temp = []
-            prod_temp = []
-            while query.next():  # iterate all the query results
-                """mach_id_query = int(query.value(1))
-                mach_name_query = ""
-                hour_query = int(query.value(0))
-                average_prod_query = int(query.value(2))
-
-                m = MachineAvgprodHourPOD(mach_id_query, mach_name_query, hour_query, average_prod_query)
-                mach_avgprod_hour_dist.append(m)"""
-                ids_temp.append(int(query.value(1)))
-                names_temp.append("")
-                hours_temp.append(int(query.value(0)))
-                prod_temp.append(float(query.value(2)))
-
-            average_window_side_hours = 50
-            filtered_speed = []
-            for row in range(len(ids_temp)):  # rolling average
-
-                # Find the row that's the average window's worth of hours before this row, limiting to row zero
-                row_start = row
-                while row_start > 0 and hours_temp[row_start] + average_window_side_hours > hours_temp[row]:
-                    row_start -= 1
-
-                # Find the row that's the average window's worth of hours after this row, limiting to the last row
-                row_end = row
-                while row_end < len(hours_temp) - 1 and hours_temp[row_end] - average_window_side_hours < hours_temp[
-                    row]:
-                    row_end += 1
-
-                # average over the range of row_start to row_end. Includes row_end.
-                cnt = 0
-                tmp_prod = 0.0
-                for ar in range(row_start, row_end + 1):
-                    cnt += 1
-                    tmp_prod += prod_temp[ar]
-
-                # Append filtered data to the output list
-                m = MachineAvgprodTimePOD(ids_temp[row],
-                                           names_temp[row],
-                                           hours_temp[row],
-                                           int(tmp_prod / cnt))
-                mach_avgprod_time_dist.append(m)
-
-            return mach_avgprod_time_dist
-
-
-
-
-
-
-
-
-
-    # hour
-    @staticmethod
-    def get_machine_avgspeed_hour(t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> List[MachineAvgspeedHourPOD]:
-        """
-        Queries a list of the average speed per hour of each machine on a certain time range
-        :param t_start: start of the range, unix time
-        :param t_end: end of the range, unix time
-        :param machines: list of all machines, for initializing the data
-        :return:
-        """
-
-        query_str = """
-SELECT 
-    DISTINCT HOUR,
-    MACHINE_ID,
-    AVG(CURRENT_SPEED) AS AVERAGE_SPEED
-FROM 
-    (
-    SELECT
-        STS_ID,
-        MACHINE_ID,
-        COUNT_PROD,
-        CURRENT_SPEED,
-        FROM_UNIXTIME(STS_TIME) AS ACTUAL_TIME,
-        HOUR(FROM_UNIXTIME(STS_TIME)) AS HOUR
-    FROM 
- 	    MACHINE_STATUS
- 	WHERE
- 	    STS_TIME>=:t_start and STS_TIME<=:t_end and MACHINE_ID=:mach_id
-    ) AS SUBQ
-GROUP BY
-    HOUR,
-    MACHINE_ID
-ORDER BY
-    HOUR ASC
-"""
-
-        db = DatabaseIO().get_db()
-        query = QSqlQuery(db)
-
-        query.prepare(query_str)
-        query.bindValue(":t_start", t_start)
-        query.bindValue(":t_end", t_end)
-        query.bindValue(":mach_id", mach_id)
-
-        ok = query.exec()
-
-        if not ok:
-            DpLog.log().error("Failed to query get machine avgsoeed per hour: %s",
-                              query.lastError().text())
-            return None
-        else:
-            num_sts = query.size()
-            DpLog.log().debug("Found %i machine avgspeed per hour", num_sts)
-
-            # start from here
-
-            m = MachineAvgspeedHourPOD(mach_id)  # create an instance of class MachineHourPOD
-
-            while query.next():  # iterate all the query results
-                mach_id_query = int(query.value(1))
-                hour = int(query.value(0))
-                avg_speed = float(query.value(2))*100.0
-
-                m.avg_speed[hour] = avg_speed
-
-            return m
-
-
-    @staticmethod
-    def get_machine_avgprod_hour(t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> List[
-        MachineAvgprodHourPOD]:
-        """
-        Queries a list of the average prod per hour of each machine on a certain time range
-        :param t_start: start of the range, unix time
-        :param t_end: end of the range, unix time
-        :param machines: list of all machines, for initializing the data
-        :return:
-        """
-
-        query_str = """
-SELECT 
-    DISTINCT HOUR,
-    MACHINE_ID,
-    AVG(COUNT_PROD) AS AVERAGE_PROD
-FROM 
-    (
-    SELECT
-        STS_ID,
-        MACHINE_ID,
-        COUNT_PROD,
-        CURRENT_SPEED,
-        FROM_UNIXTIME(STS_TIME) AS ACTUAL_TIME,
-        HOUR(FROM_UNIXTIME(STS_TIME)) AS HOUR
-    FROM 
- 	    MACHINE_STATUS
- 	WHERE
- 	    STS_TIME>=:t_start and STS_TIME<=:t_end and MACHINE_ID=:mach_id
-    ) AS SUBQ
-GROUP BY
-    HOUR,
-    MACHINE_ID
-ORDER BY
-    HOUR ASC
-"""
-
-        db = DatabaseIO().get_db()
-        query = QSqlQuery(db)
-
-        query.prepare(query_str)
-        query.bindValue(":t_start", t_start)
-        query.bindValue(":t_end", t_end)
-        query.bindValue(":mach_id", mach_id)
-
-        ok = query.exec()
-
-        if not ok:
-            DpLog.log().error("Failed to query get machine avgprod per hour: %s",
-                              query.lastError().text())
-            return None
-        else:
-            num_sts = query.size()
-            DpLog.log().debug("Found %i machine avgprod per hour", num_sts)
-
-            # start from here
-
-            m = MachineAvgprodHourPOD(mach_id)  # create an instance of class MachineHourPOD
-
-            while query.next():  # iterate all the query results
-                mach_id_query = int(query.value(1))
-                hour = int(query.value(0))
-                avg_prod = float(query.value(2))*100.0
-
-                m.avg_prod[hour] = avg_prod
-
-            return m
-
-
-    @staticmethod  # time series analysis good/bad ratio per hour
-    def get_machine_goodbadratio_hour(t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> List[
-        MachineGoodbadratioHourPOD]:
-        """
-        Queries a list of the goodbadratio per hour of each machine on a certain time range
-        :param t_start: start of the range, unix time
-        :param t_end: end of the range, unix time
-        :param machines: list of all machines, for initializing the data
-        :return:
-        """
-
-        query_str = """
-SELECT 
-	DISTINCT HOUR,
-   MACHINE_ID,
-	IFNULL(SUM(GOOD_PROD)/SUM(BAD_PROD),0) AS GOOD_BAD_RATIO
-FROM 
-	(
-	SELECT
-		STS_ID,
-		MACHINE_ID,
-		CURRENT_STATE,
-		CASE WHEN CURRENT_STATE=5 THEN COUNT_PROD ELSE 0 END AS GOOD_PROD,
-		CASE WHEN CURRENT_STATE=5 THEN 0 ELSE COUNT_PROD END AS BAD_PROD,
-		FROM_UNIXTIME(STS_TIME) AS ACTUAL_TIME,
-		HOUR(FROM_UNIXTIME(STS_TIME)) AS HOUR
-	FROM 
- 		MACHINE_STATUS
- 	WHERE
- 	    STS_TIME>=:t_start and STS_TIME<=:t_end and MACHINE_ID=:mach_id
-  	) AS SUBQ1
-GROUP BY
-	HOUR,
-   MACHINE_ID
-ORDER BY 
- 	HOUR,
-   MACHINE_ID;
-"""
-
-        db = DatabaseIO().get_db()
-        query = QSqlQuery(db)
-
-        query.prepare(query_str)
-        query.bindValue(":t_start", t_start)
-        query.bindValue(":t_end", t_end)
-        query.bindValue(":mach_id", mach_id)
-
-        ok = query.exec()
-
-        if not ok:
-            DpLog.log().error("Failed to query get machine good/bad ratio per hour: %s",
-                              query.lastError().text())
-            return None
-        else:
-            num_sts = query.size()
-            DpLog.log().debug("Found %i machine good/bad ratio per hour", num_sts)
-
-            # start from here
-
-            m = MachineGoodbadratioHourPOD(mach_id)  # create an instance of class MachineHourPOD
-
-            while query.next():  # iterate all the query results
-                mach_id_query = int(query.value(1))
-                hour = int(query.value(0))
-                good_bad_ratio = float(query.value(2))*100.0
-
-                m.good_bad_ratio[hour] = good_bad_ratio
-
-            return m
-
-    @staticmethod  # time series analysis uptime percentage per hour
-    def get_machine_uptime_hour(t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> MachineUptimeHourPOD:
-        """
-        Queries a list of the uptime percentage per hour of each machine on a certain time range
-        :param t_start: start of the range, unix time
-        :param t_end: end of the range, unix time
-        :param machines: list of all machines, for initializing the data
-        :return:
-        """
-
-        query_str = """SELECT
-	MACHINE_ID,
-    HOUR,
-    IFNULL(IFNULL(CASE WHEN CURRENT_STATE=5 THEN COUNT(DISTINCT DATE) END,0)/DATEDIFF(MAX(DATE),MIN(DATE)),0) AS UPTIME_PERCENT
-FROM
-	(
-SELECT
-	STS_ID,
-    MACHINE_ID,
-    HOUR(FROM_UNIXTIME(STS_TIME)) AS HOUR,
-	CURRENT_STATE,
-	FROM_UNIXTIME(STS_TIME) AS ACTUAL_TIME,
-    DATE(FROM_UNIXTIME(STS_TIME)) AS DATE
-FROM
-	MACHINE_STATUS
-WHERE
-    STS_TIME>=:t_start and STS_TIME<=:t_end and MACHINE_ID=:mach_id
-ORDER BY	
-	HOUR, ACTUAL_TIME
-    ) AS SUBQ
-GROUP BY	
-	HOUR
-ORDER BY	
-	HOUR"""
-
-        db = DatabaseIO().get_db()
-        query = QSqlQuery(db)
-
-        query.prepare(query_str)
-        query.bindValue(":t_start", t_start)
-        query.bindValue(":t_end", t_end)
-        query.bindValue(":mach_id", mach_id)
-
-        ok = query.exec()
-
-        if not ok:
-            DpLog.log().error("Failed to query get machine uptime per hour: %s",
-                              query.lastError().text())
-            return None
-        else:
-            num_sts = query.size()
-            DpLog.log().debug("Found %i machine uptime per hour", num_sts)
-
-            # start from here
-
-            m = MachineUptimeHourPOD(mach_id)  # create an instance of class MachineHourPOD
-
-            while query.next():  # iterate all the query results
-                mach_id_query = int(query.value(0))
-                hour = int(query.value(1))
-                uptime_percent = float(query.value(2))*100.0
-
-                m.uptime_percent[hour] = uptime_percent
-
-            return m
-
-
-
-
+from array import array
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, List, Optional, Sequence, TypeVar
+
+from PyQt6.QtSql import QSqlQuery
+
+from src.dao import MachineStatus, Alarm, Smoothing
+from src.dao.AnalyticsCache import cached_result, MACHINE_STATUS_TABLE, MACHINE_ALARM_TABLE
+from src.dao.AnalyticsRollup import MachineStatusRollupDAO, HOUR_SECONDS
+from src.dao.Machine import MachinePOD
+from src.dao.QueryFetch import fetch_columns, forward_only_query, INT64, FLOAT64
+from src.dao.QueryMetrics import instrumented
+from src.dao.TimeBuckets import bucket_start_sql, day_sql, hour_of_day, hour_of_day_sql
+from src.io import DpLog
+from src.io.ConnectionPool import current_db
+
+# CURRENT_STATE value whose production counts as good production
+GOOD_PROD_STATE = 5
+# Scale applied to the average CURRENT_SPEED in the per state speed distribution
+STATE_SPEED_SCALE = 720
+
+# Position of each state in the per state buffers of the PODs below
+MACHINE_STATES = list(MachineStatus.MachineStateType)
+STATE_INDEX = {s: i for i, s in enumerate(MACHINE_STATES)}
+GOOD_PROD_INDEX = STATE_INDEX[MachineStatus.MachineStateType(GOOD_PROD_STATE)]
+
+# Bucket sizes of the time series, in seconds: minute, 10 minutes, hour, 8 hour shift, day and week.
+# Buckets start at a multiple of their size in the plant's local time, weeks on Monday, see TimeBuckets.
+TIME_BUCKETS = (60, 600, HOUR_SECONDS, 8 * HOUR_SECONDS, 24 * HOUR_SECONDS, 7 * 24 * HOUR_SECONDS)
+# Most points a time series over a range should have when its bucket is picked automatically
+TIME_SERIES_POINTS = 1000
+
+
+def time_bucket(t_start: int, t_end: int, max_points: int = TIME_SERIES_POINTS) -> int:
+    """
+    The smallest of TIME_BUCKETS that splits a range into at most max_points buckets, so a shift
+    is drawn per minute and a year per day
+    :return: the bucket size in seconds, the largest one if none is small enough
+    """
+    for bucket in TIME_BUCKETS:
+        if (t_end - t_start) // bucket + 1 <= max_points:
+            return bucket
+    return TIME_BUCKETS[-1]
+
+
+PodT = TypeVar("PodT")
+
+
+class MachinePODIndex(Generic[PodT]):
+    """
+    Per machine result PODs in machine order, indexed by machine ID once so that filling
+    them from query rows is a dict lookup per row instead of a scan over all machines.
+    """
+    def __init__(self, pods: Iterable[PodT]):
+        self.pods: List[PodT] = list(pods)
+        self._by_id: Dict[int, PodT] = {pod.mach_id: pod for pod in self.pods}
+
+    @staticmethod
+    def for_machines(machines: List[MachinePOD], factory: Callable[[MachinePOD], PodT]) -> "MachinePODIndex[PodT]":
+        """
+        Creates one POD per machine, in the order of machines
+        :param machines: list of all machines, for initializing the data
+        :param factory: creates the empty POD of a machine
+        """
+        return MachinePODIndex(factory(m) for m in machines)
+
+    def get(self, mach_id: int) -> Optional[PodT]:
+        """
+        The POD of a machine, None if it's not one of the indexed machines
+        """
+        return self._by_id.get(mach_id)
+
+    def project(self, machines: List[MachinePOD], fn: Callable[[PodT], Any]) -> List[Any]:
+        """
+        Maps the PODs of machines through fn, in the order of machines, skipping machines that aren't indexed
+        """
+        projected = []
+        for m in machines:
+            pod = self._by_id.get(m.get_machine_id())
+            if pod is not None:
+                projected.append(fn(pod))
+        return projected
+
+# Frequency Analysis
+    # state
+class MachineStateValues(Mapping):
+    """
+    One float64 per machine state in a fixed size buffer, read like a Dict keyed by MachineStateType
+    """
+    __slots__ = ("buffer",)
+
+    def __init__(self, buffer: Optional[array] = None):
+        self.buffer = buffer if buffer is not None else array('d', [0.0]) * len(MACHINE_STATES)
+
+    def __getitem__(self, state: MachineStatus.MachineStateType) -> float:
+        return self.buffer[STATE_INDEX[state]]
+
+    def __setitem__(self, state: MachineStatus.MachineStateType, value: float) -> None:
+        self.buffer[STATE_INDEX[state]] = value
+
+    def __iter__(self) -> Iterator[MachineStatus.MachineStateType]:
+        return iter(MACHINE_STATES)
+
+    def __len__(self) -> int:
+        return len(MACHINE_STATES)
+
+    def __repr__(self):
+        return "{%s}" % ", ".join("%s: %r" % (s.name, v) for s, v in zip(MACHINE_STATES, self.buffer))
+
+class MachineStateDistributionPOD:
+    """
+    Holds state distribution data for a single machine.
+    contains the Machine ID, the Machine Name, and a MachineStateValues mapping
+    the state type to a floating point percentage of the time spent
+    in that state, between 0-1.0
+    """
+    __slots__ = ("mach_id", "mach_name", "states")
+
+    def __init__(self, mach_id: int,
+                 mach_name: str,
+                 states: MachineStateValues):
+        self.mach_id = mach_id
+        self.mach_name = mach_name
+        self.states = states
+
+class MachineGoodbadDistributionPOD:
+    """
+    Holds good/bad production distribution data for a single machine.
+    contains the Machine ID, the Machine Name, good production and bad production
+    """
+    __slots__ = ("mach_id", "mach_name", "mach_goodprod", "mach_badprod")
+
+    def __init__(self, mach_id: int,
+                 mach_name: str,
+                 mach_goodprod: float,
+                 mach_badprod: float):
+        self.mach_id = mach_id
+        self.mach_name = mach_name
+        self.mach_goodprod = mach_goodprod
+        self.mach_badprod = mach_badprod
+
+class MachineStateavgprodDistributionPOD:
+    """
+    Holds average production distribution data for a single machine for each state.
+    contains the Machine ID, the Machine Name, and a MachineStateValues mapping
+    the state type to an floating number of the average production in that state, between 0.0-1.0
+    """
+    __slots__ = ("mach_id", "mach_name", "states")
+
+    def __init__(self, mach_id: int,
+                 mach_name: str,
+                 states: MachineStateValues):
+        self.mach_id = mach_id
+        self.mach_name = mach_name
+        self.states = states
+
+class MachineStateavgspeedDistributionPOD:
+    """
+    Holds average speed distribution data for a single machine for each state.
+    contains the Machine ID, the Machine Name, and a MachineStateValues mapping
+    the state type to an floating number of the average production in that state, between 0.0-1.0
+    """
+    __slots__ = ("mach_id", "mach_name", "states")
+
+    def __init__(self, mach_id: int,
+                 mach_name: str,
+                 states: MachineStateValues):
+        self.mach_id = mach_id
+        self.mach_name = mach_name
+        self.states = states
+
+class MachineStateSnapshotPOD:
+    """
+    Holds the frequency data of every state for a single machine.
+    contains the Machine ID, the Machine Name, and per state buffers, indexed by STATE_INDEX,
+    of the number of status samples, the sum of COUNT_PROD and the sum of CURRENT_SPEED.
+    The four fleet state distributions are derived from it.
+    """
+    __slots__ = ("mach_id", "mach_name", "samples", "prod_sum", "speed_sum")
+
+    def __init__(self, mach_id: int, mach_name: str):
+        self.mach_id = mach_id
+        self.mach_name = mach_name
+        self.samples = array('q', [0]) * len(MACHINE_STATES)
+        self.prod_sum = array('d', [0.0]) * len(MACHINE_STATES)
+        self.speed_sum = array('d', [0.0]) * len(MACHINE_STATES)
+
+    def to_state_distribution(self) -> MachineStateDistributionPOD:
+        """
+        Fraction of the samples spent in each state, between 0-1.0
+        """
+        total = sum(self.samples)
+        return MachineStateDistributionPOD(self.mach_id, self.mach_name, MachineStateValues(
+            array('d', (n / total if total else 0.0 for n in self.samples))))
+
+    def to_goodbad_distribution(self) -> MachineGoodbadDistributionPOD:
+        """
+        Production in the good production state versus production in every other state
+        """
+        good = self.prod_sum[GOOD_PROD_INDEX]
+        bad = sum(self.prod_sum) - good
+        return MachineGoodbadDistributionPOD(self.mach_id, self.mach_name, good, bad)
+
+    def to_stateavgprod_distribution(self) -> MachineStateavgprodDistributionPOD:
+        """
+        Average COUNT_PROD per sample in each state
+        """
+        return MachineStateavgprodDistributionPOD(self.mach_id, self.mach_name, MachineStateValues(
+            array('d', (p / n if n else 0.0 for p, n in zip(self.prod_sum, self.samples)))))
+
+    def to_stateavgspeed_distribution(self) -> MachineStateavgspeedDistributionPOD:
+        """
+        Average CURRENT_SPEED per sample in each state, scaled the same way as the speed charts
+        """
+        return MachineStateavgspeedDistributionPOD(self.mach_id, self.mach_name, MachineStateValues(
+            array('d', (STATE_SPEED_SCALE * v / n if n else 0.0 for v, n in zip(self.speed_sum, self.samples)))))
+
+    # alarm
+class MachineAlarmCountPOD:
+    """
+    Holds count of each alarm type data for a single machine
+    contains the Machine ID, alarm_name and alarm count
+    """
+    __slots__ = ("mach_id", "alarm_counts")
+
+    def __init__(self, mach_id: int):
+        self.mach_id = mach_id
+        self.alarm_counts: Dict[Alarm.AlarmTypePOD, int] = {} # alarm_count is a dictionary where the key is with the type of alarmtypePOD and value is an int
+
+class MachineAlarmCleartimePOD:
+    """
+    Holds cleartime of each alarm type data for a single machine
+    contains the Machine ID, alarm_name and alarm count
+    """
+    __slots__ = ("mach_id", "alarm_cleartime")
+
+    def __init__(self, mach_id: int):
+        self.mach_id = mach_id
+        self.alarm_cleartime: Dict[Alarm.AlarmTypePOD, float] = {} # alarm_cleartime is a dictionary where the key is with the type of alarmtypePOD and value is a float
+
+class MachineAlarmAvgclearPOD:
+    """
+    Holds average cleartime of each alarm type data for a single machine
+    contains the Machine ID, alarm_name and alarm count
+    """
+    __slots__ = ("mach_id", "alarm_avgclear")
+
+    def __init__(self, mach_id: int):
+        self.mach_id = mach_id
+        self.alarm_avgclear: Dict[Alarm.AlarmTypePOD, float] = {} # alarm_avgclear is a dictionary where the key is with the type of alarmtypePOD and value is a float
+
+class AlarmDurationPOD:
+    """
+    Holds the clear time statistics of one alarm type on a single machine.
+    contains the number of alarms raised, and for the alarms acknowledged within the range,
+    their count and the sum and max of their clear time, in seconds
+    """
+    __slots__ = ("count", "cleared", "clear_sum", "clear_max")
+
+    def __init__(self, count: int, cleared: int, clear_sum: int, clear_max: int):
+        self.count = count
+        self.cleared = cleared
+        self.clear_sum = clear_sum
+        self.clear_max = clear_max
+
+    def clear_mean(self) -> float:
+        """
+        Mean clear time of the cleared alarms, in seconds
+        """
+        return self.clear_sum / self.cleared if self.cleared else 0.0
+
+class MachineAlarmDurationPOD:
+    """
+    Holds the clear time statistics of each alarm type for a single machine.
+    contains the Machine ID, and a Dict mapping the alarm type to its AlarmDurationPOD.
+    The alarm count, cleartime and average cleartime charts are derived from it.
+    """
+    __slots__ = ("mach_id", "alarm_durations")
+
+    def __init__(self, mach_id: int):
+        self.mach_id = mach_id
+        self.alarm_durations: Dict[Alarm.AlarmTypePOD, AlarmDurationPOD] = {}
+
+    def to_alarm_count(self) -> MachineAlarmCountPOD:
+        """
+        Number of alarms raised of each type
+        """
+        m = MachineAlarmCountPOD(self.mach_id)
+        for at, d in self.alarm_durations.items():
+            m.alarm_counts[at] = d.count
+        return m
+
+    def to_alarm_cleartime(self) -> MachineAlarmCleartimePOD:
+        """
+        Total clear time of each type, in hours
+        """
+        m = MachineAlarmCleartimePOD(self.mach_id)
+        for at, d in self.alarm_durations.items():
+            if d.cleared:
+                m.alarm_cleartime[at] = d.clear_sum / HOUR_SECONDS
+        return m
+
+    def to_alarm_avgclear(self) -> MachineAlarmAvgclearPOD:
+        """
+        Mean clear time of each type, in hours
+        """
+        m = MachineAlarmAvgclearPOD(self.mach_id)
+        for at, d in self.alarm_durations.items():
+            if d.cleared:
+                m.alarm_avgclear[at] = d.clear_mean() / HOUR_SECONDS
+        return m
+
+
+# Time Series Analysis
+
+    # time
+class MachineAvgspeedTimePOD:
+    """
+    Holds the average speed time series of a single machine.
+    contains the Machine ID, the Machine Name, and parallel arrays of the bucket start
+    (unix time of the start of the bucket) and the average speed in that bucket
+    """
+    __slots__ = ("mach_id", "mach_name", "hours", "average_speed")
+
+    def __init__(self, mach_id: int,
+                 mach_name: str,
+                 hours: Optional[array] = None,
+                 average_speed: Optional[array] = None):
+        self.mach_id = mach_id
+        self.mach_name = mach_name
+        self.hours = hours if hours is not None else array('q')
+        self.average_speed = average_speed if average_speed is not None else array('d')
+
+class MachineAvgprodTimePOD:
+    """
+    Holds the average production time series of a single machine.
+    contains the Machine ID, the Machine Name, and parallel arrays of the bucket start
+    (unix time of the start of the bucket) and the average production in that bucket
+    """
+    __slots__ = ("mach_id", "mach_name", "hours", "average_prod")
+
+    def __init__(self, mach_id: int,
+                 mach_name: str,
+                 hours: Optional[array] = None,
+                 average_prod: Optional[array] = None):
+        self.mach_id = mach_id
+        self.mach_name = mach_name
+        self.hours = hours if hours is not None else array('q')
+        self.average_prod = average_prod if average_prod is not None else array('d')
+
+
+
+
+
+
+    # hour
+class MachineAvgspeedHourPOD:
+    """
+    Holds average speed data for a single machine, hourly in one day.
+    contains the Machine ID, the Machine Name, Hour, average speed
+    """
+    __slots__ = ("mach_id", "avg_speed")
+
+    def __init__(self, mach_id: int, avg_speed: Optional[Sequence[float]] = None):
+        self.mach_id = mach_id
+        # fixed buffer of 24 float64, one per hour of the day, or a row of a MachineHourProfilePOD
+        self.avg_speed = avg_speed if avg_speed is not None else array('d', [0.0]) * 24
+
+class MachineAvgprodHourPOD:
+    """
+    Holds average speed data for a single machine, hourly in one day.
+    contains the Machine ID, the Machine Name, Hour, average speed
+    """
+    __slots__ = ("mach_id", "avg_prod")
+
+    def __init__(self, mach_id: int, avg_prod: Optional[Sequence[float]] = None):
+        self.mach_id = mach_id
+        # fixed buffer of 24 float64, one per hour of the day, or a row of a MachineHourProfilePOD
+        self.avg_prod = avg_prod if avg_prod is not None else array('d', [0.0]) * 24
+
+class MachineGoodbadratioHourPOD:
+    """
+    Holds good/bad ratio data for a single machine, hourly in one day.
+    contains the Machine ID, the Machine Name, Hour, good/bad ratio
+    """
+    __slots__ = ("mach_id", "good_bad_ratio")
+
+    def __init__(self, mach_id: int, good_bad_ratio: Optional[Sequence[float]] = None):
+        self.mach_id = mach_id
+        # fixed buffer of 24 float64, one per hour of the day, or a row of a MachineHourProfilePOD
+        self.good_bad_ratio = good_bad_ratio if good_bad_ratio is not None else array('d', [0.0]) * 24
+
+class MachineUptimeHourPOD:
+    """
+    Holds good/bad ratio data for a single machine, hourly in one day.
+    contains the Machine ID, the Machine Name, Hour, uptime percentage
+    """
+    __slots__ = ("mach_id", "uptime_percent")
+
+    def __init__(self, mach_id: int, uptime_percent: Optional[Sequence[float]] = None):
+        self.mach_id = mach_id
+        # fixed buffer of 24 float64, one per hour of the day, or a row of a MachineHourProfilePOD
+        self.uptime_percent = uptime_percent if uptime_percent is not None else array('d', [0.0]) * 24
+
+class MachineHourProfilePOD:
+    """
+    Holds one hour of day metric for a set of machines.
+    contains the Machine IDs, and a machines x 24 matrix of float64 in a single row major
+    buffer, one row per machine in the order of mach_ids. The buffer can be wrapped as a
+    NumPy array with np.frombuffer(matrix).reshape(-1, 24).
+    """
+    __slots__ = ("mach_ids", "matrix", "_rows")
+
+    def __init__(self, mach_ids: List[int]):
+        self.mach_ids = list(mach_ids)
+        self.matrix = array('d', [0.0]) * (24 * len(self.mach_ids))
+        self._rows = {mach_id: r for r, mach_id in enumerate(self.mach_ids)}
+
+    def set(self, mach_id: int, hour: int, value: float) -> None:
+        r = self._rows.get(mach_id)
+        if r is not None:  # machine not in the set we were asked about
+            self.matrix[r * 24 + hour] = value
+
+    def row(self, mach_id: int) -> Optional[memoryview]:
+        """
+        The 24 values of a machine, a view into the matrix. None if the machine is not in the set.
+        """
+        r = self._rows.get(mach_id)
+        if r is None:
+            return None
+        return memoryview(self.matrix)[r * 24:(r + 1) * 24]
+
+class AnalyticsDAO:
+
+# Frequency Analysis
+    # state distribution
+    @staticmethod
+    @cached_result(MACHINE_STATUS_TABLE)
+    @instrumented
+    def get_machines_state_snapshot(t_start: int, t_end: int, machines: List[MachinePOD]) -> List[MachineStateSnapshotPOD]:
+        """
+        Queries the per state sample count, production sum and speed sum of each machine on a certain
+        time range, in a single grouped scan. All four fleet state distributions are derived from this,
+        so when they are loaded back to back for the same range, the first one scans and the others hit the cache.
+        :param t_start: start of the range, unix time
+        :param t_end: end of the range, unix time
+        :param machines: list of all machines, for initializing the data
+        :return:
+        """
+
+        query_str = """SELECT
+    MACHINE_ID,
+    CURRENT_STATE,
+    COUNT(STS_ID) AS SAMPLE_COUNT,
+    SUM(COUNT_PROD) AS PROD_SUM,
+    SUM(CURRENT_SPEED) AS SPEED_SUM
+FROM
+    MACHINE_STATUS
+WHERE
+    STS_TIME>=:t_start and STS_TIME<=:t_end
+GROUP BY
+    MACHINE_ID,
+    CURRENT_STATE"""
+
+        db = current_db()
+        query = forward_only_query(db)
+
+        query.prepare(query_str)
+        query.bindValue(":t_start", t_start)
+        query.bindValue(":t_end", t_end)
+
+        ok = query.exec()
+
+        if not ok:
+            DpLog.log().error("Failed to query get machine state snapshot: %s", query.lastError().text())
+            return []
+        else:
+            num_sts = query.size()
+            DpLog.log().debug("Found %i machine state snapshot rows", num_sts)
+
+            snapshot = MachinePODIndex.for_machines(machines, lambda m: MachineStateSnapshotPOD(
+                mach_id=m.get_machine_id(),
+                mach_name=m.get_machine_name()
+            ))
+
+            columns = fetch_columns(query, (INT64, INT64, INT64, FLOAT64, FLOAT64), use_numpy=False)
+            for mach_id_query, state, samples, prod_sum, speed_sum in zip(*columns):
+                ss = snapshot.get(mach_id_query)
+                if ss is None:  # machine not in the list we were asked about
+                    continue
+                i = STATE_INDEX[MachineStatus.MachineStateType(state)]
+                ss.samples[i] = samples
+                ss.prod_sum[i] = prod_sum
+                ss.speed_sum[i] = speed_sum
+            return snapshot.pods
+
+    @staticmethod
+    def get_machines_state_distribution(t_start: int, t_end: int, machines: List[MachinePOD]) -> List[MachineStateDistributionPOD]:
+        """
+        Queries a list of the distribution of states of each machine on a certain time range
+        :param t_start: start of the range, unix time
+        :param t_end: end of the range, unix time
+        :param machines: list of all machines, for initializing the data
+        :return:
+        """
+        snapshot = MachinePODIndex(AnalyticsDAO.get_machines_state_snapshot(t_start, t_end, machines))
+        return snapshot.project(machines, MachineStateSnapshotPOD.to_state_distribution)
+
+    @staticmethod
+    def get_machines_goodbad_distribution(t_start: int, t_end: int, machines: List[MachinePOD]) -> List[MachineGoodbadDistributionPOD]:
+        """
+        Queries a list of the distribution of good and bad production of each machine on a certain time range
+        :param t_start: start of the range, unix time
+        :param t_end: end of the range, unix time
+        :param machines: list of all machines, for initializing the data
+        :return:
+        """
+        snapshot = MachinePODIndex(AnalyticsDAO.get_machines_state_snapshot(t_start, t_end, machines))
+        return snapshot.project(machines, MachineStateSnapshotPOD.to_goodbad_distribution)
+
+    @staticmethod
+    def get_machines_stateavgprod_distribution(t_start: int, t_end: int, machines: List[MachinePOD]) -> List[MachineStateavgprodDistributionPOD]:
+        """
+        Queries a list of the distribution of average production each states of each machine on a certain time range
+        :param t_start: start of the range, unix time
+        :param t_end: end of the range, unix time
+        :param machines: list of all machines, for initializing the data
+        :return:
+        """
+        snapshot = MachinePODIndex(AnalyticsDAO.get_machines_state_snapshot(t_start, t_end, machines))
+        return snapshot.project(machines, MachineStateSnapshotPOD.to_stateavgprod_distribution)
+
+    @staticmethod
+    def get_machines_stateavgspeed_distribution(t_start: int, t_end: int, machines: List[MachinePOD]) -> List[MachineStateavgspeedDistributionPOD]:
+        """
+        Queries a list of the distribution of average speed each states of each machine on a certain time range
+        :param t_start: start of the range, unix time
+        :param t_end: end of the range, unix time
+        :param machines: list of all machines, for initializing the data
+        :return:
+        """
+        snapshot = MachinePODIndex(AnalyticsDAO.get_machines_state_snapshot(t_start, t_end, machines))
+        return snapshot.project(machines, MachineStateSnapshotPOD.to_stateavgspeed_distribution)
+
+    # alarm
+    @staticmethod
+    @cached_result(MACHINE_ALARM_TABLE)
+    @instrumented
+    def get_machine_alarm_durations(t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> MachineAlarmDurationPOD:
+        """
+        Queries the count, and the sum, mean and max clear time of each type of alarm of a machine,
+        for the alarms raised on a certain time range, in one scan. Clear times are whole seconds
+        and only count alarms acknowledged by the end of the range.
+        :param t_start: start of the range, unix time
+        :param t_end: end of the range, unix time
+        :param mach_id: the machine to query
+        :param machines: list of all machines, for initializing the data
+        :return:
+        """
+
+        query_str = """SELECT
+    ALARM_CODE,
+    COUNT(ALARM_ID) AS ALARM_COUNT,
+    COUNT(CASE WHEN ACK_TIME<=:t_end THEN ALARM_ID END) AS CLEARED_COUNT,
+    SUM(CASE WHEN ACK_TIME<=:t_end THEN ACK_TIME - ALARM_TIME END) AS CLEAR_SUM,
+    MAX(CASE WHEN ACK_TIME<=:t_end THEN ACK_TIME - ALARM_TIME END) AS CLEAR_MAX
+FROM
+    MACHINE_ALARM
+WHERE
+    MACHINE_ID=:mach_id and ALARM_TIME>=:t_start and ALARM_TIME<=:t_end
+GROUP BY
+    ALARM_CODE
+ORDER BY
+    ALARM_CODE"""
+
+        db = current_db()
+        query = forward_only_query(db)
+
+        query.prepare(query_str)
+        query.bindValue(":t_start", t_start)
+        query.bindValue(":t_end", t_end)
+        query.bindValue(":mach_id", mach_id)
+
+        ok = query.exec()
+
+        if not ok:
+            DpLog.log().error("Failed to query get clear time of each type of alarm per machine : %s",
+                              query.lastError().text())
+            return None
+        else:
+            num_sts = query.size()
+            DpLog.log().debug("Found %i clear time of each type of alarm per machine", num_sts)
+
+            m = MachineAlarmDurationPOD(mach_id)
+
+            columns = fetch_columns(query, (INT64, INT64, INT64, INT64, INT64), use_numpy=False)
+            for alarm_code_query, count, cleared, clear_sum, clear_max in zip(*columns):
+                ap = Alarm.alarm_types.get(alarm_code_query)
+
+                m.alarm_durations[ap] = AlarmDurationPOD(count, cleared, clear_sum, clear_max)
+
+            return m
+
+    @staticmethod  # frequency analysis count of alarm type per machine
+    def get_machine_alarm_count(t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> MachineAlarmCountPOD:
+        """
+        Queries the count of each type of alarm of a machine on a certain time range
+        :param t_start: start of the range, unix time
+        :param t_end: end of the range, unix time
+        :param mach_id: the machine to query
+        :param machines: list of all machines, for initializing the data
+        :return:
+        """
+        durations = AnalyticsDAO.get_machine_alarm_durations(t_start, t_end, mach_id, machines)
+        return durations.to_alarm_count() if durations is not None else None
+
+    @staticmethod  # frequency analysis total clear time of alarm type per machine
+    def get_machine_alarm_cleartime(t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> MachineAlarmCleartimePOD:
+        """
+        Queries the total cleartime, in hours, of each type of alarm of a machine on a certain time range
+        :param t_start: start of the range, unix time
+        :param t_end: end of the range, unix time
+        :param mach_id: the machine to query
+        :param machines: list of all machines, for initializing the data
+        :return:
+        """
+        durations = AnalyticsDAO.get_machine_alarm_durations(t_start, t_end, mach_id, machines)
+        return durations.to_alarm_cleartime() if durations is not None else None
+
+    @staticmethod  # frequency analysis average clear time of alarm type per machine
+    def get_machine_alarm_avgclear(t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> MachineAlarmAvgclearPOD:
+        """
+        Queries the average cleartime, in hours, of each type of alarm of a machine on a certain time range
+        :param t_start: start of the range, unix time
+        :param t_end: end of the range, unix time
+        :param mach_id: the machine to query
+        :param machines: list of all machines, for initializing the data
+        :return:
+        """
+        durations = AnalyticsDAO.get_machine_alarm_durations(t_start, t_end, mach_id, machines)
+        return durations.to_alarm_avgclear() if durations is not None else None
+
+
+# Time Series Analysis
+    # time
+    @staticmethod
+    @cached_result(MACHINE_STATUS_TABLE)
+    @instrumented
+    def get_machine_avgspeed_time(t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD],
+                                  window_buckets: float = 1.0, bucket: Optional[int] = None) -> MachineAvgspeedTimePOD:
+        """
+        Queries the average speed series of a machine on a certain time range, one point per bucket
+        :param t_start: start of the range, unix time
+        :param t_end: end of the range, unix time
+        :param machines: list of all machines, for initializing the data
+        :param window_buckets: half width of the rolling average, in buckets, no smoothing when under one
+        :param bucket: bucket size in seconds, None to pick one of TIME_BUCKETS from the length of the range
+        :return:
+        """
+        bucket = int(bucket) if bucket else time_bucket(t_start, t_end)
+
+        # Buckets of whole hours are summed from the hourly rollup when it can be used, raw rows otherwise
+        hourly_source = MachineStatusRollupDAO.hourly_source(t_start, t_end) if bucket % HOUR_SECONDS == 0 else None
+        if hourly_source is not None:
+            query_str = """
+SELECT
+    """ + bucket_start_sql("HOUR_BUCKET", bucket) + """ AS HOUR,
+    MACHINE_ID,
+    SUM(SPEED_SUM) / SUM(SAMPLE_COUNT) AS AVERAGE_SPEED
+FROM
+    """ + hourly_source + """
+WHERE
+    CURRENT_STATE=5
+GROUP BY
+    HOUR,
+    MACHINE_ID
+ORDER BY
+    HOUR ASC
+"""
+        else:
+            query_str = """
+SELECT
+    """ + bucket_start_sql("STS_TIME", bucket) + """ AS HOUR,
+    MACHINE_ID,
+    AVG(CURRENT_SPEED) AS AVERAGE_SPEED
+FROM
+    MACHINE_STATUS
+WHERE
+    STS_TIME>=:t_start and STS_TIME<=:t_end and MACHINE_ID=:mach_id and CURRENT_STATE=5
+GROUP BY
+    HOUR,
+    MACHINE_ID
+ORDER BY
+    HOUR ASC
+"""
+
+        db = current_db()
+        query = forward_only_query(db)
+
+        query.prepare(query_str)
+        query.bindValue(":t_start", t_start)
+        query.bindValue(":t_end", t_end)
+        query.bindValue(":mach_id", mach_id)
+        MachineStatusRollupDAO.bind_rollup_range(query, t_start, t_end)
+
+        ok = query.exec()
+
+        if not ok:
+            DpLog.log().error("Failed to query get machine average speed: %s", query.lastError().text())
+            return None
+        else:
+            num_sts = query.size()
+            DpLog.log().debug("Found %i machine average speed", num_sts)
+
+            # start from here
+            hours, _, speeds = fetch_columns(query, (INT64, INT64, FLOAT64), use_numpy=False)
+
+            # centered rolling average over window_buckets either side of each bucket
+            filtered_speed = Smoothing.rolling_mean(hours, speeds, window_buckets * bucket)
+            return MachineAvgspeedTimePOD(mach_id,
+                                          "",
+                                          hours,
+                                          array('d', (int(v) for v in filtered_speed)))
+
+    @staticmethod
+    @cached_result(MACHINE_STATUS_TABLE)
+    @instrumented
+    def get_machine_avgprod_time(t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD],
+                                 window_buckets: float = 1.0, bucket: Optional[int] = None) -> MachineAvgprodTimePOD:
+        """
+        Queries the average prod series of a machine on a certain time range, one point per bucket
+        :param t_start: start of the range, unix time
+        :param t_end: end of the range, unix time
+        :param machines: list of all machines, for initializing the data
+        :param window_buckets: half width of the rolling average, in buckets, no smoothing when under one
+        :param bucket: bucket size in seconds, None to pick one of TIME_BUCKETS from the length of the range
+        :return:
+        """
+        bucket = int(bucket) if bucket else time_bucket(t_start, t_end)
+
+        # Buckets of whole hours are summed from the hourly rollup when it can be used, raw rows otherwise
+        hourly_source = MachineStatusRollupDAO.hourly_source(t_start, t_end) if bucket % HOUR_SECONDS == 0 else None
+        if hourly_source is not None:
+            query_str = """
+SELECT
+    """ + bucket_start_sql("HOUR_BUCKET", bucket) + """ AS HOUR,
+    MACHINE_ID,
+    360*SUM(PROD_SUM) / SUM(SAMPLE_COUNT) AS AVERAGE_PROD
+FROM
+    """ + hourly_source + """
+GROUP BY
+    HOUR,
+    MACHINE_ID
+ORDER BY
+    HOUR ASC
+"""
+        else:
+            query_str = """
+SELECT
+    """ + bucket_start_sql("STS_TIME", bucket) + """ AS HOUR,
+    MACHINE_ID,
+    360*AVG(COUNT_PROD) AS AVERAGE_PROD
+FROM
+    MACHINE_STATUS
+WHERE
+    STS_TIME>=:t_start and STS_TIME<=:t_end and MACHINE_ID=:mach_id
+GROUP BY
+    HOUR,
+    MACHINE_ID
+ORDER BY
+    HOUR ASC
+"""
+
+        db = current_db()
+        query = forward_only_query(db)
+
+        query.prepare(query_str)
+        query.bindValue(":t_start", t_start)
+        query.bindValue(":t_end", t_end)
+        query.bindValue(":mach_id", mach_id)
+        MachineStatusRollupDAO.bind_rollup_range(query, t_start, t_end)
+
+        ok = query.exec()
+
+        if not ok:
+            DpLog.log().error("Failed to query get machine average prod: %s", query.lastError().text())
+            return None
+        else:
+            num_sts = query.size()
+            DpLog.log().debug("Found %i machine average prod", num_sts)
+
+            # start from here
+            hours, _, prods = fetch_columns(query, (INT64, INT64, FLOAT64), use_numpy=False)
+
+            # centered rolling average over window_buckets either side of each bucket
+            filtered_prod = Smoothing.rolling_mean(hours, prods, window_buckets * bucket)
+            return MachineAvgprodTimePOD(mach_id,
+                                         "",
+                                         hours,
+                                         array('d', (int(v) for v in filtered_prod)))
+
+
+
+
+
+
+
+
+
+    # hour
+    @staticmethod
+    def _machine_set_filter(mach_ids: List[int]) -> str:
+        """
+        WHERE condition matching a set of machines, bound by _bind_machine_set
+        """
+        return "MACHINE_ID IN (%s)" % ", ".join(":mach_id_%i" % i for i in range(len(mach_ids)))
+
+    @staticmethod
+    def _bind_machine_set(query: QSqlQuery, mach_ids: List[int]) -> None:
+        for i, mach_id in enumerate(mach_ids):
+            query.bindValue(":mach_id_%i" % i, mach_id)
+
+    @staticmethod
+    def _fetch_hour_profile(query_str: str, t_start: int, t_end: int, mach_ids: List[int],
+                            description: str) -> Optional[MachineHourProfilePOD]:
+        """
+        Runs a hour of day query selecting MACHINE_ID, HOUR from hour_of_day_sql and the metric,
+        and fills a profile with the metric scaled to a percentage
+        """
+        if not mach_ids:
+            return MachineHourProfilePOD(mach_ids)
+
+        db = current_db()
+        query = forward_only_query(db)
+
+        query.prepare(query_str)
+        query.bindValue(":t_start", t_start)
+        query.bindValue(":t_end", t_end)
+        AnalyticsDAO._bind_machine_set(query, mach_ids)
+        MachineStatusRollupDAO.bind_rollup_range(query, t_start, t_end)
+
+        ok = query.exec()
+
+        if not ok:
+            DpLog.log().error("Failed to query get machines %s per hour: %s", description, query.lastError().text())
+            return None
+        else:
+            num_sts = query.size()
+            DpLog.log().debug("Found %i machines %s per hour", num_sts, description)
+
+            profile = MachineHourProfilePOD(mach_ids)
+            ids, hours, values = fetch_columns(query, (INT64, INT64, FLOAT64), use_numpy=False)
+            for mach_id_query, hour, value in zip(ids, hours, values):
+                profile.set(mach_id_query, hour_of_day(hour), value*100.0)
+            return profile
+
+    @staticmethod
+    @cached_result(MACHINE_STATUS_TABLE)
+    @instrumented
+    def get_machines_avgspeed_hour(t_start: int, t_end: int, mach_ids: List[int]) -> Optional[MachineHourProfilePOD]:
+        """
+        Queries the average speed per hour of the day of a set of machines on a certain time range, in one scan
+        :param t_start: start of the range, unix time
+        :param t_end: end of the range, unix time
+        :param mach_ids: the machines to query
+        :return: the machines x 24 profile, None if the query failed
+        """
+        mach_ids = list(dict.fromkeys(mach_ids))
+        mach_filter = AnalyticsDAO._machine_set_filter(mach_ids)
+
+        # Whole hours come from the hourly rollup when it can be used, raw rows otherwise
+        hourly_source = MachineStatusRollupDAO.hourly_source(t_start, t_end, mach_filter)
+        if hourly_source is not None:
+            query_str = """
+SELECT
+    MACHINE_ID,
+    """ + hour_of_day_sql("HOUR_BUCKET") + """ AS HOUR,
+    SUM(SPEED_SUM) / SUM(SAMPLE_COUNT) AS AVERAGE_SPEED
+FROM
+    """ + hourly_source + """
+GROUP BY
+    MACHINE_ID,
+    HOUR
+"""
+        else:
+            query_str = """
+SELECT
+    MACHINE_ID,
+    """ + hour_of_day_sql("STS_TIME") + """ AS HOUR,
+    AVG(CURRENT_SPEED) AS AVERAGE_SPEED
+FROM
+    MACHINE_STATUS
+WHERE
+    STS_TIME>=:t_start and STS_TIME<=:t_end and """ + mach_filter + """
+GROUP BY
+    MACHINE_ID,
+    HOUR
+"""
+        return AnalyticsDAO._fetch_hour_profile(query_str, t_start, t_end, mach_ids, "avgspeed")
+
+    @staticmethod
+    @cached_result(MACHINE_STATUS_TABLE)
+    @instrumented
+    def get_machines_avgprod_hour(t_start: int, t_end: int, mach_ids: List[int]) -> Optional[MachineHourProfilePOD]:
+        """
+        Queries the average prod per hour of the day of a set of machines on a certain time range, in one scan
+        :param t_start: start of the range, unix time
+        :param t_end: end of the range, unix time
+        :param mach_ids: the machines to query
+        :return: the machines x 24 profile, None if the query failed
+        """
+        mach_ids = list(dict.fromkeys(mach_ids))
+        mach_filter = AnalyticsDAO._machine_set_filter(mach_ids)
+
+        # Whole hours come from the hourly rollup when it can be used, raw rows otherwise
+        hourly_source = MachineStatusRollupDAO.hourly_source(t_start, t_end, mach_filter)
+        if hourly_source is not None:
+            query_str = """
+SELECT
+    MACHINE_ID,
+    """ + hour_of_day_sql("HOUR_BUCKET") + """ AS HOUR,
+    SUM(PROD_SUM) / SUM(SAMPLE_COUNT) AS AVERAGE_PROD
+FROM
+    """ + hourly_source + """
+GROUP BY
+    MACHINE_ID,
+    HOUR
+"""
+        else:
+            query_str = """
+SELECT
+    MACHINE_ID,
+    """ + hour_of_day_sql("STS_TIME") + """ AS HOUR,
+    AVG(COUNT_PROD) AS AVERAGE_PROD
+FROM
+    MACHINE_STATUS
+WHERE
+    STS_TIME>=:t_start and STS_TIME<=:t_end and """ + mach_filter + """
+GROUP BY
+    MACHINE_ID,
+    HOUR
+"""
+        return AnalyticsDAO._fetch_hour_profile(query_str, t_start, t_end, mach_ids, "avgprod")
+
+    @staticmethod
+    @cached_result(MACHINE_STATUS_TABLE)
+    @instrumented
+    def get_machines_goodbadratio_hour(t_start: int, t_end: int, mach_ids: List[int]) -> Optional[MachineHourProfilePOD]:
+        """
+        Queries the good/bad ratio per hour of the day of a set of machines on a certain time range, in one scan
+        :param t_start: start of the range, unix time
+        :param t_end: end of the range, unix time
+        :param mach_ids: the machines to query
+        :return: the machines x 24 profile, None if the query failed
+        """
+        mach_ids = list(dict.fromkeys(mach_ids))
+        mach_filter = AnalyticsDAO._machine_set_filter(mach_ids)
+
+        # Whole hours come from the hourly rollup when it can be used, raw rows otherwise
+        hourly_source = MachineStatusRollupDAO.hourly_source(t_start, t_end, mach_filter)
+        if hourly_source is not None:
+            query_str = """
+SELECT
+    MACHINE_ID,
+    """ + hour_of_day_sql("HOUR_BUCKET") + """ AS HOUR,
+    COALESCE(SUM(CASE WHEN CURRENT_STATE=5 THEN PROD_SUM ELSE 0 END) * 1.0
+             / SUM(CASE WHEN CURRENT_STATE=5 THEN 0 ELSE PROD_SUM END), 0) AS GOOD_BAD_RATIO
+FROM
+    """ + hourly_source + """
+GROUP BY
+    MACHINE_ID,
+    HOUR
+"""
+        else:
+            query_str = """
+SELECT
+    MACHINE_ID,
+    """ + hour_of_day_sql("STS_TIME") + """ AS HOUR,
+    COALESCE(SUM(CASE WHEN CURRENT_STATE=5 THEN COUNT_PROD ELSE 0 END) * 1.0
+             / SUM(CASE WHEN CURRENT_STATE=5 THEN 0 ELSE COUNT_PROD END), 0) AS GOOD_BAD_RATIO
+FROM
+    MACHINE_STATUS
+WHERE
+    STS_TIME>=:t_start and STS_TIME<=:t_end and """ + mach_filter + """
+GROUP BY
+    MACHINE_ID,
+    HOUR
+"""
+        return AnalyticsDAO._fetch_hour_profile(query_str, t_start, t_end, mach_ids, "good/bad ratio")
+
+    @staticmethod
+    @cached_result(MACHINE_STATUS_TABLE)
+    @instrumented
+    def get_machines_uptime_hour(t_start: int, t_end: int, mach_ids: List[int]) -> Optional[MachineHourProfilePOD]:
+        """
+        Queries the uptime percentage per hour of the day of a set of machines on a certain time range, in one scan
+        :param t_start: start of the range, unix time
+        :param t_end: end of the range, unix time
+        :param mach_ids: the machines to query
+        :return: the machines x 24 profile, None if the query failed
+        """
+        mach_ids = list(dict.fromkeys(mach_ids))
+        mach_filter = AnalyticsDAO._machine_set_filter(mach_ids)
+
+        # Whole hours come from the hourly rollup when it can be used, raw rows otherwise
+        hourly_source = MachineStatusRollupDAO.hourly_source(t_start, t_end, mach_filter)
+        if hourly_source is not None:
+            query_str = """
+SELECT
+    MACHINE_ID,
+    """ + hour_of_day_sql("HOUR_BUCKET") + """ AS HOUR,
+    COALESCE(COUNT(DISTINCT CASE WHEN CURRENT_STATE=5 THEN """ + day_sql("HOUR_BUCKET") + """ END) * 86400.0
+             / (MAX(""" + day_sql("HOUR_BUCKET") + """) - MIN(""" + day_sql("HOUR_BUCKET") + """)), 0) AS UPTIME_PERCENT
+FROM
+    """ + hourly_source + """
+GROUP BY
+    MACHINE_ID,
+    HOUR
+"""
+        else:
+            query_str = """
+SELECT
+    MACHINE_ID,
+    """ + hour_of_day_sql("STS_TIME") + """ AS HOUR,
+    COALESCE(COUNT(DISTINCT CASE WHEN CURRENT_STATE=5 THEN """ + day_sql("STS_TIME") + """ END) * 86400.0
+             / (MAX(""" + day_sql("STS_TIME") + """) - MIN(""" + day_sql("STS_TIME") + """)), 0) AS UPTIME_PERCENT
+FROM
+    MACHINE_STATUS
+WHERE
+    STS_TIME>=:t_start and STS_TIME<=:t_end and """ + mach_filter + """
+GROUP BY
+    MACHINE_ID,
+    HOUR
+"""
+        return AnalyticsDAO._fetch_hour_profile(query_str, t_start, t_end, mach_ids, "uptime")
+
+    @staticmethod
+    def get_machine_avgspeed_hour(t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> MachineAvgspeedHourPOD:
+        """
+        Queries the average speed per hour of a machine on a certain time range
+        :param t_start: start of the range, unix time
+        :param t_end: end of the range, unix time
+        :param mach_id: the machine to query
+        :param machines: list of all machines, for initializing the data
+        :return:
+        """
+        profile = AnalyticsDAO.get_machines_avgspeed_hour(t_start, t_end, [mach_id])
+        if profile is None:
+            return None
+        return MachineAvgspeedHourPOD(mach_id, profile.row(mach_id))
+
+    @staticmethod
+    def get_machine_avgprod_hour(t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> MachineAvgprodHourPOD:
+        """
+        Queries the average prod per hour of a machine on a certain time range
+        :param t_start: start of the range, unix time
+        :param t_end: end of the range, unix time
+        :param mach_id: the machine to query
+        :param machines: list of all machines, for initializing the data
+        :return:
+        """
+        profile = AnalyticsDAO.get_machines_avgprod_hour(t_start, t_end, [mach_id])
+        if profile is None:
+            return None
+        return MachineAvgprodHourPOD(mach_id, profile.row(mach_id))
+
+    @staticmethod  # time series analysis good/bad ratio per hour
+    def get_machine_goodbadratio_hour(t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> MachineGoodbadratioHourPOD:
+        """
+        Queries the goodbadratio per hour of a machine on a certain time range
+        :param t_start: start of the range, unix time
+        :param t_end: end of the range, unix time
+        :param mach_id: the machine to query
+        :param machines: list of all machines, for initializing the data
+        :return:
+        """
+        profile = AnalyticsDAO.get_machines_goodbadratio_hour(t_start, t_end, [mach_id])
+        if profile is None:
+            return None
+        return MachineGoodbadratioHourPOD(mach_id, profile.row(mach_id))
+
+    @staticmethod  # time series analysis uptime percentage per hour
+    def get_machine_uptime_hour(t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> MachineUptimeHourPOD:
+        """
+        Queries the uptime percentage per hour of a machine on a certain time range
+        :param t_start: start of the range, unix time
+        :param t_end: end of the range, unix time
+        :param mach_id: the machine to query
+        :param machines: list of all machines, for initializing the data
+        :return:
+        """
+        profile = AnalyticsDAO.get_machines_uptime_hour(t_start, t_end, [mach_id])
+        if profile is None:
+            return None
+        return MachineUptimeHourPOD(mach_id, profile.row(mach_id))
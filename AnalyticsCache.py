@@ -0,0 +1,300 @@
+import functools
+import inspect
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from PyQt6.QtSql import QSqlQuery
+
+from src.io import DpLog
+from src.io.ConnectionPool import current_db
+
+
+class WatermarkTable:
+    """
+    A table whose new rows can invalidate cached results. New rows are found with
+    the auto increment id column, and matched to a cached range with the time column.
+    """
+    def __init__(self, table: str, id_col: str, time_col: str):
+        self.table = table
+        self.id_col = id_col
+        self.time_col = time_col
+
+
+MACHINE_STATUS_TABLE = WatermarkTable("MACHINE_STATUS", "STS_ID", "STS_TIME")
+MACHINE_ALARM_TABLE = WatermarkTable("MACHINE_ALARM", "ALARM_ID", "ALARM_TIME")
+JOB_TABLE = WatermarkTable("JOB", "JOB_ID", "FINISH_DATE")
+
+
+class CacheStatsPOD:
+    """
+    Counters of an AnalyticsResultCache, for sizing it
+    """
+    def __init__(self, hits: int, misses: int, evictions: int, invalidations: int, entries: int, size_bytes: int):
+        self.hits = hits
+        self.misses = misses
+        self.evictions = evictions
+        self.invalidations = invalidations
+        self.entries = entries
+        self.size_bytes = size_bytes
+
+    def __repr__(self):
+        return "CacheStatsPOD(hits=%i, misses=%i, evictions=%i, invalidations=%i, entries=%i, size_bytes=%i)" % (
+            self.hits, self.misses, self.evictions, self.invalidations, self.entries, self.size_bytes)
+
+
+class _CacheEntry:
+    def __init__(self, value: Any, size: int, source: WatermarkTable, watermark: int,
+                 t_start: int, t_end: int, mach_id: Optional[int]):
+        self.value = value
+        self.size = size
+        self.source = source
+        self.watermark = watermark
+        self.t_start = t_start
+        self.t_end = t_end
+        self.mach_id = mach_id
+        self.created = time.monotonic()
+
+
+def _deep_sizeof(obj: Any, seen: Optional[set] = None) -> int:
+    """
+    Approximate memory held by a query result: the object, its attributes and its containers
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool, array)) or obj is None:
+        return size
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_sizeof(v, seen) for v in obj)
+    if hasattr(obj, "__dict__"):
+        size += _deep_sizeof(vars(obj), seen)
+    for slot in getattr(type(obj), "__slots__", ()):
+        if hasattr(obj, slot):
+            size += _deep_sizeof(getattr(obj, slot), seen)
+    return size
+
+
+class AnalyticsResultCache:
+    """
+    LRU cache of AnalyticsDAO results, capped by approximate memory.
+
+    Each entry remembers the max id of its source table when it was computed. On lookup, if
+    the table has grown, only the new rows are checked against the entry's time range (and
+    machine); the entry is dropped only if one of them lands inside it. Updates to existing rows
+    don't move the watermark, so entries are also recomputed once they are older than max_age.
+
+    Results are shared between callers and must not be modified.
+    """
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_age: float = 300.0, watermark_ttl: float = 1.0):
+        """
+        :param max_bytes: memory cap of all cached results
+        :param max_age: seconds after which an entry is recomputed regardless of the watermark
+        :param watermark_ttl: seconds a table watermark read is reused, so a burst of lookups reads it once
+        """
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.watermark_ttl = watermark_ttl
+
+        self._entries: "OrderedDict[Hashable, _CacheEntry]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._watermarks: Dict[str, Tuple[float, int]] = {}
+        self._computing: Dict[Hashable, threading.Event] = {}
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def stats(self) -> CacheStatsPOD:
+        with self._lock:
+            return CacheStatsPOD(self._hits, self._misses, self._evictions, self._invalidations,
+                                 len(self._entries), self._size)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._watermarks.clear()
+
+    def invalidate(self, table: str) -> None:
+        """
+        Drops the entries computed from a table, after writes that don't move its watermark,
+        such as updated rows or rows inserted below its highest id
+        :param table: the name of the source table
+        """
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry.source.table == table]:
+                self._remove(key)
+                self._invalidations += 1
+            self._watermarks.pop(table, None)
+
+    def get_or_compute(self, key: Hashable, source: WatermarkTable, t_start: int, t_end: int,
+                       mach_id: Optional[int], compute: Callable[[], Any]) -> Any:
+        """
+        Returns the cached result for key if it is still valid, otherwise computes and caches it
+        :param key: identifies the method and all of its arguments
+        :param source: the table the result is computed from
+        :param t_start: start of the range of the result, unix time
+        :param t_end: end of the range of the result, unix time
+        :param mach_id: the machine the result is restricted to, None for the whole fleet
+        :param compute: runs the query
+        """
+        watermark = self._watermark(source)
+        if watermark < 0:  # can't tell whether anything changed, so don't trust or fill the cache
+            with self._lock:
+                self._misses += 1
+            return compute()
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and self._is_valid(entry, watermark):
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                self._hits += 1
+            return entry.value
+
+        with self._lock:
+            if entry is not None and self._entries.get(key) is entry:
+                self._invalidations += 1
+                self._remove(key)
+            # Queries loaded in parallel often need the same result; only the first one computes it
+            computing = self._computing.get(key)
+            if computing is None:
+                self._computing[key] = threading.Event()
+        if computing is not None:
+            computing.wait()
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._hits += 1
+                    return entry.value
+                self._misses += 1
+            return compute()
+
+        try:
+            value = compute()
+            self._store(key, value, source, watermark, t_start, t_end, mach_id)
+        finally:
+            with self._lock:
+                self._misses += 1
+                self._computing.pop(key).set()
+        return value
+
+    def _store(self, key: Hashable, value: Any, source: WatermarkTable, watermark: int,
+               t_start: int, t_end: int, mach_id: Optional[int]) -> None:
+        # Failed queries come back as None or []; those are never cached
+        if value is None or (isinstance(value, list) and not value):
+            return
+
+        size = _deep_sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _CacheEntry(value, size, source, watermark, t_start, t_end, mach_id)
+            self._size += size
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._size -= entry.size
+
+    def _is_valid(self, entry: _CacheEntry, watermark: int) -> bool:
+        if time.monotonic() - entry.created > self.max_age:
+            return False
+        if watermark <= entry.watermark:
+            return True
+        if self._has_rows_in_range(entry, watermark):
+            return False
+        # Nothing new landed in this entry's range, so it's valid up to the new watermark
+        entry.watermark = watermark
+        return True
+
+    def _watermark(self, source: WatermarkTable) -> int:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._watermarks.get(source.table)
+        if cached is not None and now - cached[0] <= self.watermark_ttl:
+            return cached[1]
+
+        db = current_db()
+        query = QSqlQuery(db)
+        if not query.exec("SELECT MAX(%s) FROM %s" % (source.id_col, source.table)) or not query.next():
+            DpLog.log().error("Failed to query the %s watermark: %s", source.table, query.lastError().text())
+            return -1  # never matches an entry's watermark, so lookups recompute
+        watermark = int(query.value(0) or 0)
+        with self._lock:
+            self._watermarks[source.table] = (now, watermark)
+        return watermark
+
+    def _has_rows_in_range(self, entry: _CacheEntry, watermark: int) -> bool:
+        source = entry.source
+        query_str = """SELECT
+    1
+FROM
+    %s
+WHERE
+    %s>:old_id and %s<=:new_id and %s>=:t_start and %s<=:t_end%s
+LIMIT 1""" % (source.table, source.id_col, source.id_col, source.time_col, source.time_col,
+              "" if entry.mach_id is None else " and MACHINE_ID=:mach_id")
+
+        db = current_db()
+        query = QSqlQuery(db)
+        query.prepare(query_str)
+        query.bindValue(":old_id", entry.watermark)
+        query.bindValue(":new_id", watermark)
+        query.bindValue(":t_start", entry.t_start)
+        query.bindValue(":t_end", entry.t_end)
+        if entry.mach_id is not None:
+            query.bindValue(":mach_id", entry.mach_id)
+        if not query.exec():
+            DpLog.log().error("Failed to check %s for new rows: %s", source.table, query.lastError().text())
+            return True
+        return query.next()
+
+
+result_cache = AnalyticsResultCache()
+
+
+def _key_value(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        # Lists of machines are keyed by what the results are built from
+        return tuple((m.get_machine_id(), m.get_machine_name()) if hasattr(m, "get_machine_id") else _key_value(m)
+                     for m in value)
+    return value
+
+
+def cached_result(source: WatermarkTable) -> Callable:
+    """
+    Decorates an AnalyticsDAO query method taking t_start, t_end and optionally mach_id, so
+    its results go through result_cache. Apply it below @staticmethod.
+    :param source: the table the method reads
+    """
+    def decorator(fn: Callable) -> Callable:
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = bound.arguments
+            key = (fn.__qualname__,) + tuple(_key_value(v) for v in params.values())
+            return result_cache.get_or_compute(key, source, params["t_start"], params["t_end"],
+                                               params.get("mach_id"), lambda: fn(*args, **kwargs))
+        return wrapper
+    return decorator
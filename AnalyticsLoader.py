@@ -0,0 +1,140 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from PyQt6.QtCore import QObject, QRunnable, QThread, QThreadPool, Qt, pyqtSignal
+
+from src.io import DpLog
+from src.io.ConnectionPool import connection_pool
+from src.io.DatabaseIO import DatabaseIO
+
+# Pool threads idle for this long exit and close their pooled connection, in milliseconds
+THREAD_EXPIRY_MS = 60000
+
+_thread_pool: Optional[QThreadPool] = None
+# Pool threads that close their connection when they exit, by thread ID
+_closing_threads: Set[int] = set()
+_closing_threads_lock = threading.Lock()
+
+
+def analytics_thread_pool() -> QThreadPool:
+    """
+    The thread pool every AnalyticsLoader runs its queries on. It has one thread per pooled
+    connection, so however many loaders there are, at most connection_pool.max_connections
+    connections are open.
+    """
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = QThreadPool()
+        _thread_pool.setMaxThreadCount(connection_pool.max_connections)
+        _thread_pool.setExpiryTimeout(THREAD_EXPIRY_MS)
+    return _thread_pool
+
+
+def _close_connection_on_exit() -> None:
+    """
+    Makes the calling pool thread close its pooled connection when it expires
+    """
+    ident = threading.get_ident()
+    with _closing_threads_lock:
+        if ident in _closing_threads:
+            return
+        _closing_threads.add(ident)
+    # finished is emitted on the exiting thread itself, where its connection has to be closed
+    QThread.currentThread().finished.connect(_on_thread_finished, Qt.ConnectionType.DirectConnection)
+
+
+def _on_thread_finished() -> None:
+    connection_pool.close_thread_connection()
+    with _closing_threads_lock:
+        _closing_threads.discard(threading.get_ident())
+
+
+class AnalyticsQuerySignals(QObject):
+    """
+    Carries the result of an AnalyticsQueryTask back to the thread of the AnalyticsLoader
+    """
+    # load generation, job key, result (None if the query raised)
+    finished = pyqtSignal(int, str, object)
+
+
+class AnalyticsQueryTask(QRunnable):
+    """
+    Runs one analytics query on a pool thread, on the connection that thread leases from connection_pool,
+    or without a connection for a backend that doesn't use the database
+    """
+    def __init__(self, generation: int, key: str, fn: Callable, args: Tuple, uses_database: bool = True):
+        QRunnable.__init__(self)
+        self.generation = generation
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.uses_database = uses_database
+        self.signals = AnalyticsQuerySignals()
+
+    def run(self) -> None:
+        result: Any = None
+        try:
+            if not self.uses_database:
+                result = self.fn(*self.args)
+            else:
+                _close_connection_on_exit()
+                with connection_pool.connection() as db:
+                    if db is None:
+                        DpLog.log().error("No database connection for analytics query %s", self.key)
+                    else:
+                        result = self.fn(*self.args)
+        except Exception:
+            DpLog.log().exception("Analytics query %s failed", self.key)
+        self.signals.finished.emit(self.generation, self.key, result)
+
+
+class AnalyticsLoader(QObject):
+    """
+    Runs a set of analytics queries side by side on a thread pool and hands each result back
+    on the loader's thread as soon as it arrives. Starting a new load drops the results still
+    outstanding from the previous one.
+    """
+    # job key, result
+    result_ready = pyqtSignal(str, object)
+    # seconds from the start of the load until its last result arrived
+    load_finished = pyqtSignal(float)
+
+    def __init__(self, parent: QObject = None):
+        QObject.__init__(self, parent)
+        self._pool = analytics_thread_pool()
+        self._generation = 0
+        self._pending = 0
+        self._started = 0.0
+        # False when the jobs query an offline backend, which needs no connection
+        self.uses_database = True
+
+    def load(self, jobs: Dict[str, Tuple[Callable, Tuple]]) -> None:
+        """
+        Starts every job at once
+        :param jobs: maps a job key to the query function and its arguments
+        :return: None
+        """
+        self._generation += 1
+        self._pending = len(jobs)
+        self._started = time.perf_counter()
+        if self.uses_database:
+            # Pooled connections are cloned from the shared one, which has to be looked up on this thread
+            connection_pool.set_template(DatabaseIO().get_db().connectionName())
+
+        for key, (fn, args) in jobs.items():
+            task = AnalyticsQueryTask(self._generation, key, fn, args, self.uses_database)
+            task.signals.finished.connect(self._on_task_finished, Qt.ConnectionType.QueuedConnection)
+            self._pool.start(task)
+
+    def _on_task_finished(self, generation: int, key: str, result: Any) -> None:
+        if generation != self._generation:
+            DpLog.log().debug("Dropping stale analytics result %s", key)
+            return
+        self.result_ready.emit(key, result)
+
+        self._pending -= 1
+        if self._pending == 0:
+            elapsed = time.perf_counter() - self._started
+            DpLog.log().debug("Analytics load finished in %.3f s, %s", elapsed, connection_pool.stats())
+            self.load_finished.emit(elapsed)
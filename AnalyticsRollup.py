@@ -0,0 +1,307 @@
+import threading
+from typing import Optional, Tuple
+
+from PyQt6.QtSql import QSqlQuery
+
+from src.dao.TimeBuckets import HOUR_SECONDS, utc_offset
+from src.io import DpLog
+from src.io.ConnectionPool import connection_pool, current_db
+
+
+class MachineStatusRollupDAO:
+    """
+    Maintains MACHINE_STATUS_HOURLY, a rollup of MACHINE_STATUS holding one row per
+    (machine, hour bucket, state) with the sample count, the COUNT_PROD sum and the
+    CURRENT_SPEED sum of that hour. The rollup is folded forward incrementally from the
+    highest STS_ID already rolled up, which is kept in ANALYTICS_ROLLUP_STATE.
+
+    A fold recomputes every (machine, hour) its rows fall in from all of MACHINE_STATUS, so
+    folding rows again is harmless. Each refresh folds the last REFOLD_MARGIN_IDS rows below the
+    watermark again, which picks up rows that committed after rows with higher STS_IDs. A row
+    committed later than that, or a changed or deleted row, is only picked up by rebuild.
+
+    Queries don't wait for a large backlog such as the first build: it is folded by a background
+    thread, and they read MACHINE_STATUS until the rollup has caught up.
+
+    Hour buckets are the unix time of the start of the hour.
+    """
+    ROLLUP_NAME = "MACHINE_STATUS_HOURLY"
+    # Span of STS_IDs folded per transaction, so the first build is not one huge transaction
+    REFRESH_BATCH_IDS = 500000
+    # Largest backlog of STS_IDs a query folds in itself, a larger one is folded in the background
+    INLINE_REFRESH_IDS = 50000
+    # STS_IDs below the watermark folded again by every fold
+    REFOLD_MARGIN_IDS = 10000
+
+    _lock = threading.Lock()
+    _tables_ready = False
+    _background_refresh: Optional[threading.Thread] = None
+
+    @staticmethod
+    def create_tables() -> bool:
+        """
+        Creates the rollup table and its state row if they don't exist yet
+        :return: True if the tables are usable
+        """
+        query_strs = ["""
+CREATE TABLE IF NOT EXISTS MACHINE_STATUS_HOURLY (
+    MACHINE_ID INT NOT NULL,
+    HOUR_BUCKET BIGINT NOT NULL,
+    CURRENT_STATE INT NOT NULL,
+    SAMPLE_COUNT BIGINT NOT NULL,
+    PROD_SUM DOUBLE NOT NULL,
+    SPEED_SUM DOUBLE NOT NULL,
+    PRIMARY KEY (MACHINE_ID, HOUR_BUCKET, CURRENT_STATE)
+)""", """
+CREATE TABLE IF NOT EXISTS ANALYTICS_ROLLUP_STATE (
+    ROLLUP_NAME VARCHAR(64) NOT NULL PRIMARY KEY,
+    LAST_STS_ID BIGINT NOT NULL
+)"""]
+
+        db = current_db()
+        query = QSqlQuery(db)
+        for query_str in query_strs:
+            if not query.exec(query_str):
+                DpLog.log().error("Failed to create analytics rollup table: %s", query.lastError().text())
+                return False
+
+        ignore = "INSERT OR IGNORE" if db.driverName() == "QSQLITE" else "INSERT IGNORE"
+        query.prepare(ignore + " INTO ANALYTICS_ROLLUP_STATE (ROLLUP_NAME, LAST_STS_ID) VALUES (:name, 0)")
+        query.bindValue(":name", MachineStatusRollupDAO.ROLLUP_NAME)
+        if not query.exec():
+            DpLog.log().error("Failed to initialize analytics rollup state: %s", query.lastError().text())
+            return False
+        return True
+
+    @staticmethod
+    def refresh(blocking: bool = True) -> bool:
+        """
+        Folds the MACHINE_STATUS rows added since the last refresh into the rollup.
+        Only reads MAX(STS_ID) when nothing is new.
+        :param blocking: False to return at once when another refresh is running, and to leave a
+            backlog of more than INLINE_REFRESH_IDS to a background thread
+        :return: True when the rollup is up to date with MACHINE_STATUS
+        """
+        if not MachineStatusRollupDAO._lock.acquire(blocking):
+            return False
+        try:
+            if not MachineStatusRollupDAO._tables_ready:
+                MachineStatusRollupDAO._tables_ready = MachineStatusRollupDAO.create_tables()
+                if not MachineStatusRollupDAO._tables_ready:
+                    return False
+
+            db = current_db()
+            query = QSqlQuery(db)
+
+            if not query.exec("SELECT MAX(STS_ID) FROM MACHINE_STATUS") or not query.next():
+                DpLog.log().error("Failed to query the machine status watermark: %s", query.lastError().text())
+                return False
+            max_id = int(query.value(0) or 0)
+
+            query.prepare("SELECT LAST_STS_ID FROM ANALYTICS_ROLLUP_STATE WHERE ROLLUP_NAME=:name")
+            query.bindValue(":name", MachineStatusRollupDAO.ROLLUP_NAME)
+            if not query.exec() or not query.next():
+                DpLog.log().error("Failed to query the analytics rollup state: %s", query.lastError().text())
+                return False
+            last_id = int(query.value(0))
+
+            if not blocking and max_id - last_id > MachineStatusRollupDAO.INLINE_REFRESH_IDS:
+                MachineStatusRollupDAO._start_background_refresh()
+                return False
+            while last_id < max_id:
+                to_id = min(max_id, last_id + MachineStatusRollupDAO.REFRESH_BATCH_IDS)
+                if not MachineStatusRollupDAO._fold(last_id, to_id):
+                    return False
+                last_id = to_id
+            return True
+        finally:
+            MachineStatusRollupDAO._lock.release()
+
+    @staticmethod
+    def _start_background_refresh() -> None:
+        """
+        Starts a refresh on a thread of its own, unless one is running. Called with _lock held.
+        """
+        running = MachineStatusRollupDAO._background_refresh
+        if running is not None and running.is_alive():
+            return
+        DpLog.log().info("Building the analytics rollup in the background")
+        MachineStatusRollupDAO._background_refresh = threading.Thread(
+            target=MachineStatusRollupDAO._run_background_refresh, name="analytics-rollup", daemon=True)
+        MachineStatusRollupDAO._background_refresh.start()
+
+    @staticmethod
+    def _run_background_refresh() -> None:
+        try:
+            with connection_pool.connection() as db:
+                if db is None:
+                    DpLog.log().error("No database connection to build the analytics rollup")
+                elif MachineStatusRollupDAO.refresh():
+                    DpLog.log().info("Analytics rollup is up to date")
+        finally:
+            connection_pool.close_thread_connection()
+
+    @staticmethod
+    def rebuild() -> bool:
+        """
+        Empties the rollup and folds all of MACHINE_STATUS again, e.g. after rows were changed,
+        deleted or committed out of STS_ID order past REFOLD_MARGIN_IDS
+        :return: True when the rollup is up to date with MACHINE_STATUS
+        """
+        with MachineStatusRollupDAO._lock:
+            if not MachineStatusRollupDAO._tables_ready:
+                MachineStatusRollupDAO._tables_ready = MachineStatusRollupDAO.create_tables()
+                if not MachineStatusRollupDAO._tables_ready:
+                    return False
+
+            db = current_db()
+            if not db.transaction():
+                DpLog.log().error("Failed to start the analytics rollup transaction: %s", db.lastError().text())
+                return False
+            query = QSqlQuery(db)
+            query.prepare("UPDATE ANALYTICS_ROLLUP_STATE SET LAST_STS_ID=0 WHERE ROLLUP_NAME=:name")
+            query.bindValue(":name", MachineStatusRollupDAO.ROLLUP_NAME)
+            if not query.exec() or not query.exec("DELETE FROM MACHINE_STATUS_HOURLY"):
+                DpLog.log().error("Failed to empty the analytics rollup: %s", query.lastError().text())
+                db.rollback()
+                return False
+            if not db.commit():
+                DpLog.log().error("Failed to commit the analytics rollup: %s", db.lastError().text())
+                return False
+        return MachineStatusRollupDAO.refresh()
+
+    @staticmethod
+    def _fold(from_id: int, to_id: int) -> bool:
+        """
+        Recomputes the hours of the MACHINE_STATUS rows with from_id - REFOLD_MARGIN_IDS < STS_ID <= to_id,
+        in one transaction. The state row is moved first and only if it still reads from_id, so of two
+        refreshes racing on different connections or processes only one folds.
+        """
+        db = current_db()
+        if not db.transaction():
+            DpLog.log().error("Failed to start the analytics rollup transaction: %s", db.lastError().text())
+            return False
+
+        query = QSqlQuery(db)
+        query.prepare("""
+UPDATE ANALYTICS_ROLLUP_STATE
+SET LAST_STS_ID=:to_id
+WHERE ROLLUP_NAME=:name and LAST_STS_ID=:from_id""")
+        query.bindValue(":to_id", to_id)
+        query.bindValue(":name", MachineStatusRollupDAO.ROLLUP_NAME)
+        query.bindValue(":from_id", from_id)
+        if not query.exec() or query.numRowsAffected() != 1:
+            DpLog.log().debug("Analytics rollup was moved past STS_ID %i by someone else", from_id)
+            db.rollback()
+            return False
+
+        # the (machine, hour) pairs the rows fall in
+        hours_str = """
+SELECT DISTINCT
+    MACHINE_ID,
+    STS_TIME - STS_TIME % 3600 AS HOUR_BUCKET
+FROM
+    MACHINE_STATUS
+WHERE
+    STS_ID>:scan_from_id and STS_ID<=:to_id"""
+        query_strs = ["""
+DELETE FROM MACHINE_STATUS_HOURLY
+WHERE
+    (MACHINE_ID, HOUR_BUCKET) IN (""" + hours_str + """)""", """
+INSERT INTO MACHINE_STATUS_HOURLY
+    (MACHINE_ID, HOUR_BUCKET, CURRENT_STATE, SAMPLE_COUNT, PROD_SUM, SPEED_SUM)
+SELECT
+    S.MACHINE_ID,
+    H.HOUR_BUCKET,
+    S.CURRENT_STATE,
+    COUNT(S.STS_ID),
+    IFNULL(SUM(S.COUNT_PROD), 0),
+    IFNULL(SUM(S.CURRENT_SPEED), 0)
+FROM
+    (""" + hours_str + """) AS H
+    JOIN MACHINE_STATUS AS S
+        ON S.MACHINE_ID=H.MACHINE_ID and S.STS_TIME>=H.HOUR_BUCKET and S.STS_TIME<H.HOUR_BUCKET + 3600
+GROUP BY
+    S.MACHINE_ID,
+    H.HOUR_BUCKET,
+    S.CURRENT_STATE"""]
+        for query_str in query_strs:
+            query.prepare(query_str)
+            query.bindValue(":scan_from_id", max(0, from_id - MachineStatusRollupDAO.REFOLD_MARGIN_IDS))
+            query.bindValue(":to_id", to_id)
+            if not query.exec():
+                DpLog.log().error("Failed to fold machine status into the analytics rollup: %s",
+                                  query.lastError().text())
+                db.rollback()
+                return False
+
+        if not db.commit():
+            DpLog.log().error("Failed to commit the analytics rollup: %s", db.lastError().text())
+            return False
+        DpLog.log().debug("Folded machine status %i-%i into the analytics rollup", from_id + 1, to_id)
+        return True
+
+    @staticmethod
+    def rollup_range(t_start: int, t_end: int) -> Tuple[int, int]:
+        """
+        The whole hours inside [t_start, t_end], as [r_start, r_end)
+        """
+        r_start = -(-t_start // HOUR_SECONDS) * HOUR_SECONDS
+        r_end = (t_end + 1) // HOUR_SECONDS * HOUR_SECONDS
+        return r_start, r_end
+
+    @staticmethod
+    def hourly_source(t_start: int, t_end: int, mach_filter: str = "MACHINE_ID=:mach_id") -> Optional[str]:
+        """
+        A derived table with the rollup columns (MACHINE_ID, HOUR_BUCKET, CURRENT_STATE, SAMPLE_COUNT,
+        PROD_SUM, SPEED_SUM) for the machines matching mach_filter over [t_start, t_end]. The whole
+        hours are read from the rollup and the partial hours at either end are grouped from
+        MACHINE_STATUS, so the result is exact for any range. Binds :t_start, :t_end, the binds of
+        mach_filter, and :r_start / :r_end through bind_rollup_range.
+        :param mach_filter: condition on MACHINE_ID, one machine by default
+        :return: the SQL, or None when the range has no whole hour, the plant's UTC offset isn't whole hours
+            so local buckets would split the rollup hours, or the rollup isn't up to date yet
+        """
+        r_start, r_end = MachineStatusRollupDAO.rollup_range(t_start, t_end)
+        if (r_start >= r_end or utc_offset() % HOUR_SECONDS != 0
+                or not MachineStatusRollupDAO.refresh(blocking=False)):
+            return None
+
+        return """(
+    SELECT
+        MACHINE_ID,
+        HOUR_BUCKET,
+        CURRENT_STATE,
+        SAMPLE_COUNT,
+        PROD_SUM,
+        SPEED_SUM
+    FROM
+        MACHINE_STATUS_HOURLY
+    WHERE
+        HOUR_BUCKET>=:r_start and HOUR_BUCKET<:r_end and """ + mach_filter + """
+    UNION ALL
+    SELECT
+        MACHINE_ID,
+        STS_TIME - STS_TIME % 3600 AS HOUR_BUCKET,
+        CURRENT_STATE,
+        COUNT(STS_ID) AS SAMPLE_COUNT,
+        IFNULL(SUM(COUNT_PROD), 0) AS PROD_SUM,
+        IFNULL(SUM(CURRENT_SPEED), 0) AS SPEED_SUM
+    FROM
+        MACHINE_STATUS
+    WHERE
+        ((STS_TIME>=:t_start and STS_TIME<:r_start) or (STS_TIME>=:r_end and STS_TIME<=:t_end)) and """ + mach_filter + """
+    GROUP BY
+        MACHINE_ID,
+        HOUR_BUCKET,
+        CURRENT_STATE
+    ) AS HOURLY"""
+
+    @staticmethod
+    def bind_rollup_range(query: QSqlQuery, t_start: int, t_end: int) -> None:
+        """
+        Binds :r_start and :r_end for a query built on hourly_source
+        """
+        r_start, r_end = MachineStatusRollupDAO.rollup_range(t_start, t_end)
+        query.bindValue(":r_start", r_start)
+        query.bindValue(":r_end", r_end)
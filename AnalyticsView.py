@@ -1,873 +1,821 @@
-from typing import List
-
-from PyQt6 import QtGui
-from PyQt6.QtCharts import QBarSet, QBarSeries, QChart, QBarCategoryAxis, QValueAxis, QStackedBarSeries, \
-    QHorizontalStackedBarSeries, QLineSeries, QDateTimeAxis
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QFont
-from PyQt6.QtWidgets import QWidget
-
-from src.dao.Analytics import MachineGoodbadDistributionPOD
-from src.dao.Machine import MachinePOD
-from src.dao.MachineStatus import MachineStateType
-from src.io import DpLog
-from src.io.BackgroundThreads import DatabaseThread
-from src.uic.ui_AnalyticsView import Ui_AnalyticsView
-
-
-class AnalyticsView(Ui_AnalyticsView, QWidget):
-    """
-
-    """
-    # signal for frequency analysis
-        # state distribution
-    query_machine_state_distribution = pyqtSignal(int, int)  # add a signal for gfxView_statetime_machine
-    query_machine_goodbad_distribution = pyqtSignal(int, int)  # add a signal for gfxView_goodbadprod_machine
-    query_machine_stateavgprod_distribution = pyqtSignal(int, int)  # add a signal for gfxView_avgprod_state_machine
-    query_machine_stateavgspeed_distribution = pyqtSignal(int, int)  # add a signal for gfxView_avgprod_state_machine
-        # alarm
-    query_machine_alarm_count = pyqtSignal(int, int, int)  # add a signal for gfxView_alarm_count_machine
-    query_machine_alarm_cleartime = pyqtSignal(int, int, int)  # add a signal for gfxView_alarm_cleartime
-    query_machine_alarm_avgclear = pyqtSignal(int, int, int)  # add a signal for gfxView_alarm_avgclear
-
-    # signal for time series analysis
-        # time
-    query_machine_avgspeed_time = pyqtSignal(int, int, int)  # add a signal for gfxview_avgspeed_time
-    query_machine_avgprod_time = pyqtSignal(int, int, int)  # add a signal for gfxview_avgprod_time
-        # hour
-    query_machine_avgspeed_hour = pyqtSignal(int, int, int)  # add a signal for gfxview_avgspeed_hour
-    query_machine_avgprod_hour = pyqtSignal(int, int, int)  # add a signal for gfxview_avgprod_hour
-    query_machine_goodbadratio_hour = pyqtSignal(int, int, int)  # add a signal for gfxview_goodbadratio_hour
-
-    query_machine_uptime_hour = pyqtSignal(int, int, int)  # add a signal for gfxview_uptime_hour
-
-    def __init__(self, parent=None):
-        QWidget.__init__(self, parent=parent)
-        DpLog.log().debug("Initializing AnalyticsView")
-        self.setupUi(self)
-
-        # For drop down machine list
-        self._machines: List[MachinePOD] = []  # create a copy of list of MachinePOD
-        # Only load machine data once, either immediately or from a signal
-        if DatabaseThread().machine_data:
-            self._set_machines(DatabaseThread().machine_data)
-        else:
-            DatabaseThread().machine_receiveData.connect(self._set_machines,
-                                                         Qt.ConnectionType.SingleShotConnection)
-        self.cmbMachine.currentIndexChanged.connect(self._on_machine_selected_change)  # connect signal
-
-        # onModelInit should run only once, after the model was correctly initialized.
-        # This could be before or after this JobView is initialized. The modelInitialized
-        # signal should only run once so if we miss that, then we have to call onModelInit
-        # manually.
-        if DatabaseThread().machine_speed_model_is_initialized():
-            self.on_mach_speed_model_init()
-        else:
-            DatabaseThread().machinespeed_tblmodel.model_is_initialized.connect(self.on_mach_speed_model_init)
-            DatabaseThread().analytic_view_enable_general_update(True)
-
-        if DatabaseThread().machine_prod_model_is_initialized():
-            self.on_mach_prod_model_init()
-        else:
-#            DatabaseThread().machineprod_tblmodel.model_is_initialized.connect(self.on_mach_prod_model_init)
-            DatabaseThread().analytic_view_enable_general_update(True)
-
-        self.pbLoad.pressed.connect(DatabaseThread().analytic_view_general_update,
-                                    Qt.ConnectionType.QueuedConnection)
-        self.pbLoad.pressed.connect(self.on_load_pressed)
-
-        # Frequency analysis signal
-            # state distribution
-        self.query_machine_state_distribution.connect(DatabaseThread().analyticView_get_machines_state_distribution,
-                                                      Qt.ConnectionType.BlockingQueuedConnection)
-        self.query_machine_goodbad_distribution.connect(DatabaseThread().analyticView_get_machines_goodbad_distribution,
-                                                      Qt.ConnectionType.BlockingQueuedConnection)
-        self.query_machine_stateavgprod_distribution.connect(DatabaseThread().analyticView_get_machines_stateavgprod_distribution,
-                                                        Qt.ConnectionType.BlockingQueuedConnection)
-        self.query_machine_stateavgspeed_distribution.connect(DatabaseThread().analyticView_get_machines_stateavgspeed_distribution,
-                                                        Qt.ConnectionType.BlockingQueuedConnection)
-            # alarm
-        self.query_machine_alarm_count.connect(DatabaseThread().analyticView_get_machine_alarm_count,
-                                                        Qt.ConnectionType.BlockingQueuedConnection)
-        self.query_machine_alarm_cleartime.connect(DatabaseThread().analyticView_get_machine_alarm_cleartime,
-                                               Qt.ConnectionType.BlockingQueuedConnection)
-        self.query_machine_alarm_avgclear.connect(DatabaseThread().analyticView_get_machine_alarm_avgclear,
-                                               Qt.ConnectionType.BlockingQueuedConnection)
-
-        # Time Series analysis signal
-            # time
-        self.query_machine_avgspeed_time.connect(DatabaseThread().analyticView_get_machine_avgspeed_time,
-                                                 Qt.ConnectionType.BlockingQueuedConnection)
-        self.query_machine_avgprod_time.connect(DatabaseThread().analyticView_get_machine_avgprod_time,
-                                                 Qt.ConnectionType.BlockingQueuedConnection)
-            # hour
-        self.query_machine_avgspeed_hour.connect(DatabaseThread().analyticView_get_machine_avgspeed_hour,
-                                                      Qt.ConnectionType.BlockingQueuedConnection)
-        self.query_machine_avgprod_hour.connect(DatabaseThread().analyticView_get_machine_avgprod_hour,
-                                                      Qt.ConnectionType.BlockingQueuedConnection)
-        self.query_machine_goodbadratio_hour.connect(DatabaseThread().analyticView_get_machine_goodbadratio_hour,
-                                                      Qt.ConnectionType.BlockingQueuedConnection)
-        self.query_machine_uptime_hour.connect(DatabaseThread().analyticView_get_machine_uptime_hour,
-                                                      Qt.ConnectionType.BlockingQueuedConnection)
-
-    #  function for machine drop down list
-    def _set_machines(self, machines: List[MachinePOD]) -> None:
-        """
-        Make a record of the machine data to use and add the names to
-        the machine selector dropdown
-        :param machines: The machines to use
-        :return: None
-        """
-        DpLog.log().debug("Setting machine names / info")
-        self._machines = machines
-        mach_names = [m.get_machine_name() for m in machines]
-        self.cmbMachine.clear()
-        self.cmbMachine.addItems(mach_names)
-
-    def _on_machine_selected_change(self, index: int) -> None:
-        """
-        For now just clear the charts data
-        :param index:
-        :return:
-        """
-        DpLog.log().debug("Changing to machine '%s', index %i",
-                          self._machines[index].get_machine_name(),
-                          index)
-        # Frequency Analysis
-        self.gfxview_alarm_count_machine.chart().removeAllSeries()
-        self.gfxview_alarm_cleartime.chart().removeAllSeries()
-        self.gfxview_avgclear.chart().removeAllSeries()
-
-
-        # Time Series Analysis
-            # time
-        self.gfxview_avgspeed_time.chart().removeAllSeries()
-        self.gfxview_avgprod_time.chart().removeAllSeries()
-
-            # hour
-        self.gfxview_avgspeed_hour.chart().removeAllSeries()
-        self.gfxview_avgprod_hour.chart().removeAllSeries()
-        self.gfxview_goodbadratio_hour.chart().removeAllSeries()
-
-        self.gfxview_uptime_hour.chart().removeAllSeries()
-
-
-
-
-
-    # page 1, machine speed and production table
-    def on_mach_speed_model_init(self):
-        DpLog.log().debug("Initializing MachineSpeedTableModel...")
-        self.tblvMachineSpeed.setModel(DatabaseThread().machinespeed_tblmodel)
-    def on_mach_prod_model_init(self):
-        DpLog.log().debug("Initializing MachineProdTableModel...")
-        self.tblvMachineProd.setModel(DatabaseThread().machineprod_tblmodel)
-
-    # for press button
-    def on_load_pressed(self):
-    # Frequency Analysis
-        # state
-        self.initialize_test_bar_chart()
-        self.initialize_goodbad_distribution_bar_chart()
-        self.initialize_stateavgprod_bar_chart()
-        self.initialize_stateavgspeed_bar_chart()
-        # alarm
-        self.initialize_machinealarmcount_bar_chart()
-        self.initialize_machinealarmcleartime_bar_chart()
-        self.initialize_machinealarmavgclear_bar_chart()
-
-    # Time Series Analysis
-        # time
-        self.initialize_machineavgspeed_time_line_chart()
-        self.initialize_machineavgprod_time_line_chart()
-
-        # hour
-        self.initialize_machineavgspeed_hour_line_chart()
-        self.initialize_machineavgprod_hour_line_chart()
-        self.initialize_machinegoodbadratio_hour_line_chart()
-
-        self.initialize_machineuptime_hour_bar_chart()
-
-# Frequency Analysis
-    # state
-
-    # page 2 test bar chart (machine state time distribution)
-    def initialize_test_bar_chart(self) -> None:
-        """
-        Initializes the testing bar chart
-        :return:
-        """
-        DpLog.log().debug("Reading test bar chart...")
-        t_start = self.dteStartTime.dateTime().toSecsSinceEpoch()
-        t_end = self.dteEndTime.dateTime().toSecsSinceEpoch()
-
-        self.query_machine_state_distribution.emit(t_start, t_end)
-        data = DatabaseThread().analyticView_machine_state_distribution
-        DpLog.log().debug("Got %i machines of data", len(data))
-        for d in data:
-            DpLog.log().debug("Got state data for machine %i: %s", d.mach_id, str(d.states))
-
-        # draw chart
-        bar_sets = QBarSeries()  # crate an instance for QBarSeries class
-        for s in MachineStateType:  # loop all instances in enum MachineStateType
-            bs = QBarSet(s.name)  # create a variable to get the state name
-            for machine in data:  # loop machine in dataset 'data'
-                bs.append(machine.states[s])  # add time data to bs
-            bar_sets.append(bs)  # add bs to bar_set instance
-
-        test_chart = QChart()  # create an instance for class QChart
-        test_chart.addSeries(bar_sets)  # implement method addSeries on the instance test_chart
-        test_chart.setTitle("Total time for each state per machine")
-        test_chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
-
-        self.gfxview_statetime_machine.setChart(test_chart)
-
-        # x axis
-        bar_categories = []
-        for machine in data:
-            bar_categories.append(machine.mach_name)
-
-        test_axisX = QBarCategoryAxis()
-        test_axisX.append(bar_categories)
-
-        # Set rotation so we can fit many x-axis labels nicely
-        test_axisX.setLabelsAngle(90)
-        test_axisX.setTruncateLabels(False)
-
-        test_chart.addAxis(test_axisX, Qt.AlignmentFlag.AlignBottom)
-        bar_sets.attachAxis(test_axisX)
-        # y axis
-        test_axisY = QValueAxis()
-        # test_axisY.setRange(0,200000)
-        test_chart.addAxis(test_axisY, Qt.AlignmentFlag.AlignLeft)
-        bar_sets.attachAxis(test_axisY)
-
-    # page 2 machine good/bad distribution bar chart
-    def initialize_goodbad_distribution_bar_chart(self) -> None:
-        """
-        Initializes the testing bar chart
-        :return:
-        """
-        DpLog.log().debug("Reading test bar chart...")
-        t_start = self.dteStartTime.dateTime().toSecsSinceEpoch()
-        t_end = self.dteEndTime.dateTime().toSecsSinceEpoch()
-
-        self.query_machine_goodbad_distribution.emit(t_start, t_end)
-        data = DatabaseThread().analyticView_machine_goodbad_distribution
-        DpLog.log().debug("Got %i machines of data", len(data))
-        #for d in data:
-        #    DpLog.log().debug("Got machine good/bad production data for machine %i: good %s, bad %s", d.mach_id, str(d.mach_goodprod), str(d.mach_badprod))
-
-        # draw chart
-        bar_sets = QHorizontalStackedBarSeries()  # crate an instance for QBarSeries class
-        bs1 = QBarSet("good production")  # create a variable to get the state name
-        bs2 = QBarSet("bad production")  # create a variable to get the state name
-        for machine in data:  # loop machine in dataset 'data'
-            bs1.append(machine.mach_goodprod)  # add time data to bs
-            bs2.append(machine.mach_badprod)  # add time data to bs
-        bar_sets.append(bs1)  # add bs to bar_set instance
-        bar_sets.append(bs2)
-
-
-        bar_chart = QChart()  # create an instance for class QChart
-        bar_chart.addSeries(bar_sets)  # implement method addSeries on the instance test_chart
-        bar_chart.setTitle("good/bad production for each state per machine")
-        bar_chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
-
-        self.gfxview_goodbadprod_machine.setChart(bar_chart)
-
-        # y axis
-        bar_categories = []
-        for machine in data:
-            bar_categories.append(machine.mach_name)
-
-        bar_axisY = QBarCategoryAxis()
-        bar_axisY.append(bar_categories)
-
-        # Set rotation so we can fit many Y-axis labels nicely
-        bar_axisY.setLabelsAngle(0)
-        bar_axisY.setTruncateLabels(False)
-        font = QFont()
-        font.setPointSizeF(7.5)
-        bar_axisY.setLabelsFont(font)
-
-        bar_chart.addAxis(bar_axisY, Qt.AlignmentFlag.AlignLeft)
-        bar_sets.attachAxis(bar_axisY)
-
-        # X axis
-        bar_axisX = QValueAxis()
-        bar_chart.addAxis(bar_axisX, Qt.AlignmentFlag.AlignBottom)
-        bar_sets.attachAxis(bar_axisX)
-
-    # page 2 machine average production per state distribution
-    def initialize_stateavgprod_bar_chart(self) -> None:
-        """
-        Initializes the stateavgprod bar chart
-        :return:
-        """
-        DpLog.log().debug("Reading test bar chart...")
-        t_start = self.dteStartTime.dateTime().toSecsSinceEpoch()
-        t_end = self.dteEndTime.dateTime().toSecsSinceEpoch()
-
-        self.query_machine_stateavgprod_distribution.emit(t_start, t_end)
-        data = DatabaseThread().analyticView_machine_stateavgprod_distribution
-        DpLog.log().debug("Got %i machines of data", len(data))
-        #for d in data:
-        #    DpLog.log().debug("Got average production per state data for machine %i: %s", d.mach_id, str(d.states))
-
-        # draw chart
-        bar_sets = QBarSeries()  # crate an instance for QBarSeries class
-        for s in MachineStateType:  # loop all instances in enum MachineStateType
-            bs = QBarSet(s.name)  # create a variable to get the state name
-            for machine in data:  # loop machine in dataset 'data'
-                bs.append(machine.states[s])  # add time data to bs
-            bar_sets.append(bs)  # add bs to bar_set instance
-
-        bar_chart = QChart()  # create an instance for class QChart
-        bar_chart.addSeries(bar_sets)  # implement method addSeries on the instance test_chart
-        bar_chart.setTitle("Average Production for each state per machine")
-        bar_chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
-
-        self.gfxview_avgprod_state_machine.setChart(bar_chart)
-
-        # x axis
-        bar_categories = []
-        for machine in data:
-            bar_categories.append(machine.mach_name)
-
-        bar_axisX = QBarCategoryAxis()
-        bar_axisX.append(bar_categories)
-
-        # Set rotation so we can fit many x-axis labels nicely
-        bar_axisX.setLabelsAngle(90)
-        bar_axisX.setTruncateLabels(False)
-
-        bar_chart.addAxis(bar_axisX, Qt.AlignmentFlag.AlignBottom)
-        bar_sets.attachAxis(bar_axisX)
-        # y axis
-        bar_axisY = QValueAxis()
-        # test_axisY.setRange(0,200000)
-        bar_chart.addAxis(bar_axisY, Qt.AlignmentFlag.AlignLeft)
-        bar_sets.attachAxis(bar_axisY)
-
-
-    # page 2 machine average speed per state distribution
-    def initialize_stateavgspeed_bar_chart(self) -> None:
-        """
-        Initializes the stateavgspeed bar chart
-        :return:
-        """
-        DpLog.log().debug("Reading test bar chart...")
-        t_start = self.dteStartTime.dateTime().toSecsSinceEpoch()
-        t_end = self.dteEndTime.dateTime().toSecsSinceEpoch()
-
-        self.query_machine_stateavgspeed_distribution.emit(t_start, t_end)
-        data = DatabaseThread().analyticView_machine_stateavgspeed_distribution
-        DpLog.log().debug("Got %i machines of data", len(data))
-        #for d in data:
-        #    DpLog.log().debug("Got average speed per state data for machine %i: %s", d.mach_id, str(d.states))
-
-        # draw chart
-        bar_sets = QBarSeries()  # crate an instance for QBarSeries class
-        for s in MachineStateType:  # loop all instances in enum MachineStateType
-            bs = QBarSet(s.name)  # create a variable to get the state name
-            for machine in data:  # loop machine in dataset 'data'
-                bs.append(machine.states[s])  # add time data to bs
-            bar_sets.append(bs)  # add bs to bar_set instance
-
-        bar_chart = QChart()  # create an instance for class QChart
-        bar_chart.addSeries(bar_sets)  # implement method addSeries on the instance test_chart
-        bar_chart.setTitle("Average Speed for each state per machine")
-        bar_chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
-
-        self.gfxview_avgspeed_state_machine.setChart(bar_chart)
-
-        # x axis
-        bar_categories = []
-        for machine in data:
-            bar_categories.append(machine.mach_name)
-
-        bar_axisX = QBarCategoryAxis()
-        bar_axisX.append(bar_categories)
-
-        # Set rotation so we can fit many x-axis labels nicely
-        bar_axisX.setLabelsAngle(90)
-        bar_axisX.setTruncateLabels(False)
-
-        bar_chart.addAxis(bar_axisX, Qt.AlignmentFlag.AlignBottom)
-        bar_sets.attachAxis(bar_axisX)
-        # y axis
-        bar_axisY = QValueAxis()
-        # test_axisY.setRange(0,200000)
-        bar_chart.addAxis(bar_axisY, Qt.AlignmentFlag.AlignLeft)
-        bar_sets.attachAxis(bar_axisY)
-
-    # alarm
-
-    # page 2 count of each alarm type per machine
-    def initialize_machinealarmcount_bar_chart(self) -> None:
-        """
-        Initializes the testing bar chart
-        :return:
-        """
-        DpLog.log().debug("Reading test bar chart...")
-        t_start = self.dteStartTime.dateTime().toSecsSinceEpoch()
-        t_end = self.dteEndTime.dateTime().toSecsSinceEpoch()
-        mach_id = self._machines[self.cmbMachine.currentIndex()].get_machine_id()
-
-        self.query_machine_alarm_count.emit(t_start, t_end, mach_id)
-        data = DatabaseThread().analyticView_machine_alarm_count
-
-
-        # draw chart
-        bar_sets = QBarSeries()  # crate an instance for QBarSeries class
-        bs = QBarSet("alarm count")
-        bar_categories = []
-        for at,count in data.alarm_counts.items():
-            #DpLog.log().debug("Got count of each alarm type per machine %i: alarm type=%s, count=%i", data.mach_id, at.alarm_desc, count)
-            bs.append(count)
-            bar_categories.append(at.alarm_desc)
-        bar_sets.append(bs)
-
-
-        bar_chart = QChart()  # create an instance for class QChart
-        bar_chart.addSeries(bar_sets)  # implement method addSeries on the instance test_chart
-        bar_chart.setTitle("count of each alarm type")
-        bar_chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
-
-        self.gfxview_alarm_count_machine.setChart(bar_chart)
-
-        # x axis
-
-
-        bar_axisX = QBarCategoryAxis()
-        bar_axisX.append(bar_categories)
-
-        # Set rotation so we can fit many X-axis labels nicely
-        bar_axisX.setLabelsAngle(0)
-        bar_axisX.setTruncateLabels(False)
-        font = QFont()
-        font.setPointSizeF(7.5)
-        bar_axisX.setLabelsFont(font)
-
-        bar_chart.addAxis(bar_axisX, Qt.AlignmentFlag.AlignBottom)
-        bar_sets.attachAxis(bar_axisX)
-
-        # Y axis
-        bar_axisY = QValueAxis()
-        bar_chart.addAxis(bar_axisY, Qt.AlignmentFlag.AlignLeft)
-        bar_sets.attachAxis(bar_axisY)
-
-    # page 2 bar chart for alarm time per alarm per machine
-    def initialize_machinealarmcleartime_bar_chart(self) -> None:
-        """
-        Initializes the testing bar chart
-        :return:
-        """
-        DpLog.log().debug("Reading test bar chart...")
-        t_start = self.dteStartTime.dateTime().toSecsSinceEpoch()
-        t_end = self.dteEndTime.dateTime().toSecsSinceEpoch()
-        mach_id = self._machines[self.cmbMachine.currentIndex()].get_machine_id()
-
-        self.query_machine_alarm_cleartime.emit(t_start, t_end, mach_id)
-        data = DatabaseThread().analyticView_machine_alarm_cleartime
-
-
-        # draw chart
-        bar_sets = QBarSeries()  # crate an instance for QBarSeries class
-        bs = QBarSet("alarm cleartime")
-        bar_categories = []
-        for at,cleartime in data.alarm_cleartime.items():
-            #DpLog.log().debug("Got cleartime of each alarm type per machine %i: alarm type=%s, cleartime=%i", data.mach_id, at.alarm_desc, cleartime)
-            bs.append(cleartime)
-            bar_categories.append(at.alarm_desc)
-        bar_sets.append(bs)
-
-
-        bar_chart = QChart()  # create an instance for class QChart
-        bar_chart.addSeries(bar_sets)  # implement method addSeries on the instance test_chart
-        bar_chart.setTitle("clear time of each alarm type")
-        bar_chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
-
-        self.gfxview_alarm_cleartime.setChart(bar_chart)
-
-        # x axis
-        bar_axisX = QBarCategoryAxis()
-        bar_axisX.append(bar_categories)
-
-        # Set rotation so we can fit many X-axis labels nicely
-        bar_axisX.setLabelsAngle(0)
-        bar_axisX.setTruncateLabels(False)
-        font = QFont()
-        font.setPointSizeF(7.5)
-        bar_axisX.setLabelsFont(font)
-
-        bar_chart.addAxis(bar_axisX, Qt.AlignmentFlag.AlignBottom)
-        bar_sets.attachAxis(bar_axisX)
-
-        # Y axis
-        bar_axisY = QValueAxis()
-        bar_chart.addAxis(bar_axisY, Qt.AlignmentFlag.AlignLeft)
-        bar_sets.attachAxis(bar_axisY)
-
-
-    # page 2 bar chart for average alarm time per alarm per machine
-    def initialize_machinealarmavgclear_bar_chart(self) -> None:
-        """
-        Initializes the testing bar chart
-        :return:
-        """
-        DpLog.log().debug("Reading test bar chart...")
-        t_start = self.dteStartTime.dateTime().toSecsSinceEpoch()
-        t_end = self.dteEndTime.dateTime().toSecsSinceEpoch()
-        mach_id = self._machines[self.cmbMachine.currentIndex()].get_machine_id()
-
-        self.query_machine_alarm_avgclear.emit(t_start, t_end, mach_id)
-        data = DatabaseThread().analyticView_machine_alarm_avgclear
-
-
-        # draw chart
-        bar_sets = QBarSeries()  # crate an instance for QBarSeries class
-        bs = QBarSet("alarm average cleartime")
-        bar_categories = []
-        for at,avgclear in data.alarm_avgclear.items():
-            #DpLog.log().debug("Got average cleartime of each alarm type per machine %i: alarm type=%s, cleartime=%i", data.mach_id, at.alarm_desc, avgclear)
-            bs.append(avgclear)
-            bar_categories.append(at.alarm_desc)
-        bar_sets.append(bs)
-
-
-        bar_chart = QChart()  # create an instance for class QChart
-        bar_chart.addSeries(bar_sets)  # implement method addSeries on the instance test_chart
-        bar_chart.setTitle("clear time of each alarm type")
-        bar_chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
-
-        self.gfxview_avgclear.setChart(bar_chart)
-
-        # x axis
-        bar_axisX = QBarCategoryAxis()
-        bar_axisX.append(bar_categories)
-
-        # Set rotation so we can fit many X-axis labels nicely
-        bar_axisX.setLabelsAngle(0)
-        bar_axisX.setTruncateLabels(False)
-        font = QFont()
-        font.setPointSizeF(7.5)
-        bar_axisX.setLabelsFont(font)
-
-        bar_chart.addAxis(bar_axisX, Qt.AlignmentFlag.AlignBottom)
-        bar_sets.attachAxis(bar_axisX)
-
-        # Y axis
-        bar_axisY = QValueAxis()
-        bar_chart.addAxis(bar_axisY, Qt.AlignmentFlag.AlignLeft)
-        bar_sets.attachAxis(bar_axisY)
-
-
-
-    # Time Series Analysis
-        # time
-    def initialize_machineavgspeed_time_line_chart(self) -> None:
-        """
-        Initializes the avgspeed line chart
-        :return:
-        """
-        DpLog.log().debug("Reading line chart...")
-        t_start = self.dteStartTime.dateTime().toSecsSinceEpoch()
-        t_end = self.dteEndTime.dateTime().toSecsSinceEpoch()
-        mach_id = self._machines[self.cmbMachine.currentIndex()].get_machine_id()
-
-        self.query_machine_avgspeed_time.emit(t_start, t_end, mach_id)
-        data = DatabaseThread().analyticView_machine_avgspeed_time
-        DpLog.log().debug("Got %i machines of data", len(data))
-
-        # draw chart
-        line_sets = QLineSeries()  # crate an instance for QLineSeries class
-        for d in data:
-            #DpLog.log().debug("Got average speed for machine %i: hour=%i, spd=%i", d.mach_id, d.hour, d.average_speed)
-            line_sets.append(d.hour*1000, d.average_speed)
-
-
-        line_chart = QChart()  # create an instance for class QChart
-        line_chart.addSeries(line_sets)  # implement method addSeries on the instance test_chart
-        line_chart.setTitle("Average Speed per machine")
-        line_chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
-        self.gfxview_avgspeed_time.setChart(line_chart)
-
-        # x axis , y axis
-        axis_x = QDateTimeAxis() # change the unix time into real time
-        axis_x.setFormat("MM.dd.yyyy hh:mm:ss ap")
-        # axis_x.setLabelFormat("%d")
-        line_chart.addAxis(axis_x, Qt.AlignmentFlag.AlignBottom)
-        line_sets.attachAxis(axis_x)
-
-        axis_y = QValueAxis()
-        axis_y.setLabelFormat("%d")
-        line_chart.addAxis(axis_y, Qt.AlignmentFlag.AlignLeft)
-        line_sets.attachAxis(axis_y)
-
-
-    # page 3 machine average prod per hour
-    def initialize_machineavgprod_time_line_chart(self) -> None:
-        """
-        Initializes the avgprod line chart
-        :return:
-        """
-        DpLog.log().debug("Reading line chart...")
-        t_start = self.dteStartTime.dateTime().toSecsSinceEpoch()
-        t_end = self.dteEndTime.dateTime().toSecsSinceEpoch()
-        mach_id = self._machines[self.cmbMachine.currentIndex()].get_machine_id()
-
-        self.query_machine_avgprod_time.emit(t_start, t_end, mach_id)
-        data = DatabaseThread().analyticView_machine_avgprod_time
-        DpLog.log().debug("Got %i machines of data", len(data))
-
-        # draw chart
-        line_sets = QLineSeries()  # crate an instance for QLineSeries class
-        for d in data:
-            #DpLog.log().debug("Got average prod for machine %i: hour=%i, prod=%i", d.mach_id, d.hour, d.average_prod)
-            line_sets.append(d.hour*1000, d.average_prod)
-
-
-        line_chart = QChart()  # create an instance for class QChart
-        line_chart.addSeries(line_sets)  # implement method addSeries on the instance test_chart
-        line_chart.setTitle("Average Prod per machine")
-        line_chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
-        self.gfxview_avgprod_time.setChart(line_chart)
-
-        # x axis , y axis
-        axis_x = QDateTimeAxis() # change the unix time into real time
-        axis_x.setFormat("MM.dd.yyyy hh:mm:ss ap")
-        # axis_x.setLabelFormat("%d")
-        line_chart.addAxis(axis_x, Qt.AlignmentFlag.AlignBottom)
-        line_sets.attachAxis(axis_x)
-
-        axis_y = QValueAxis()
-        axis_y.setLabelFormat("%d")
-        line_chart.addAxis(axis_y, Qt.AlignmentFlag.AlignLeft)
-        line_sets.attachAxis(axis_y)
-
-
-
-
-        # hour
-    def initialize_machineavgspeed_hour_line_chart(self) -> None:
-        """
-        Initializes the hour avgspeed line chart
-        :return:
-        """
-        DpLog.log().debug("Reading test bar chart...")
-        t_start = self.dteStartTime.dateTime().toSecsSinceEpoch()
-        t_end = self.dteEndTime.dateTime().toSecsSinceEpoch()
-        mach_id = self._machines[self.cmbMachine.currentIndex()].get_machine_id()
-
-        self.query_machine_avgspeed_hour.emit(t_start, t_end, mach_id)
-        data = DatabaseThread().analyticView_machine_avgspeed_hour
-
-        # draw chart
-        bar_sets = QBarSeries()  # crate an instance for QBarSeries class
-        bs = QBarSet("average speed")
-        for i in range(24):
-                        #DpLog.log().debug("Got avgspeed per hour for machine %i: hour=%i, avgspeed percentage=%i", data.mach_id, i, data.avg_speed[i])
-                        bs.append(data.avg_speed[i])
-        bar_sets.append(bs)
-
-        bar_chart = QChart()  # create an instance for class QChart
-        bar_chart.addSeries(bar_sets)  # implement method addSeries on the instance test_chart
-        bar_chart.setTitle("average speed per hour per machine")
-        bar_chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
-
-        self.gfxview_avgspeed_hour.setChart(bar_chart)
-
-        # x axis
-        bar_categories = ["12-1AM", "1-2AM", "2-3AM", "3-4AM", "4-5AM", "5-6AM",
-                          "6-7AM", "7-8AM", "8-9AM", "9-10AM", "10-11AM", "11-12PM",
-                          "12-1PM", "1-2PM", "2-3PM", "3-4PM", "4-5PM", "5-6PM",
-                          "6-7PM", "7-8PM", "8-9PM", "9-10PM", "10-11PM", "11-12AM"]
-
-        bar_axisX = QBarCategoryAxis()
-        bar_axisX.append(bar_categories)
-
-        # Set rotation so we can fit many X-axis labels nicely
-        bar_axisX.setLabelsAngle(0)
-        bar_axisX.setTruncateLabels(False)
-        font = QFont()
-        font.setPointSizeF(7.5)
-        bar_axisX.setLabelsFont(font)
-
-        bar_chart.addAxis(bar_axisX, Qt.AlignmentFlag.AlignBottom)
-        bar_sets.attachAxis(bar_axisX)
-
-        # Y axis
-        bar_axisY = QValueAxis()
-        bar_chart.addAxis(bar_axisY, Qt.AlignmentFlag.AlignLeft)
-        bar_sets.attachAxis(bar_axisY)
-
-    # page 3 machine average prod per hour
-    def initialize_machineavgprod_hour_line_chart(self) -> None:
-        """
-        Initializes the hour avgprod line chart
-        :return:
-        """
-        DpLog.log().debug("Reading test bar chart...")
-        t_start = self.dteStartTime.dateTime().toSecsSinceEpoch()
-        t_end = self.dteEndTime.dateTime().toSecsSinceEpoch()
-        mach_id = self._machines[self.cmbMachine.currentIndex()].get_machine_id()
-
-        self.query_machine_avgprod_hour.emit(t_start, t_end, mach_id)
-        data = DatabaseThread().analyticView_machine_avgprod_hour
-
-        # draw chart
-        bar_sets = QBarSeries()  # crate an instance for QBarSeries class
-        bs = QBarSet("average production")
-        for i in range(24):
-                        #DpLog.log().debug("Got avgerage prod per hour for machine %i: hour=%i, avgprod=%i", data.mach_id, i, data.avg_prod[i])
-                        bs.append(data.avg_prod[i])
-        bar_sets.append(bs)
-
-        bar_chart = QChart()  # create an instance for class QChart
-        bar_chart.addSeries(bar_sets)  # implement method addSeries on the instance test_chart
-        bar_chart.setTitle("average production per hour per machine")
-        bar_chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
-
-        self.gfxview_avgprod_hour.setChart(bar_chart)
-
-        # x axis
-        bar_categories = ["12-1AM", "1-2AM", "2-3AM", "3-4AM", "4-5AM", "5-6AM",
-                          "6-7AM", "7-8AM", "8-9AM", "9-10AM", "10-11AM", "11-12PM",
-                          "12-1PM", "1-2PM", "2-3PM", "3-4PM", "4-5PM", "5-6PM",
-                          "6-7PM", "7-8PM", "8-9PM", "9-10PM", "10-11PM", "11-12AM"]
-
-        bar_axisX = QBarCategoryAxis()
-        bar_axisX.append(bar_categories)
-
-        # Set rotation so we can fit many X-axis labels nicely
-        bar_axisX.setLabelsAngle(0)
-        bar_axisX.setTruncateLabels(False)
-        font = QFont()
-        font.setPointSizeF(7.5)
-        bar_axisX.setLabelsFont(font)
-
-        bar_chart.addAxis(bar_axisX, Qt.AlignmentFlag.AlignBottom)
-        bar_sets.attachAxis(bar_axisX)
-
-        # Y axis
-        bar_axisY = QValueAxis()
-        bar_chart.addAxis(bar_axisY, Qt.AlignmentFlag.AlignLeft)
-        bar_sets.attachAxis(bar_axisY)
-
-    # page 3 machine good/bad ratio per hour
-    def initialize_machinegoodbadratio_hour_line_chart(self) -> None:
-        """
-        Initializes the good/bad ratio per hour line chart
-        :return:
-        """
-        DpLog.log().debug("Reading test bar chart...")
-        t_start = self.dteStartTime.dateTime().toSecsSinceEpoch()
-        t_end = self.dteEndTime.dateTime().toSecsSinceEpoch()
-        mach_id = self._machines[self.cmbMachine.currentIndex()].get_machine_id()
-
-        self.query_machine_goodbadratio_hour.emit(t_start, t_end, mach_id)
-        data = DatabaseThread().analyticView_machine_goodbadratio_hour
-
-        # draw chart
-        bar_sets = QBarSeries()  # crate an instance for QBarSeries class
-        bs = QBarSet("good/bad ratio")
-        for i in range(24):
-                        #DpLog.log().debug("Got good/bad ratio per hour for machine %i: hour=%i, good/bad ratio=%i", data.mach_id, i, data.good_bad_ratio[i])
-                        bs.append(data.good_bad_ratio[i])
-        bar_sets.append(bs)
-
-        bar_chart = QChart()  # create an instance for class QChart
-        bar_chart.addSeries(bar_sets)  # implement method addSeries on the instance test_chart
-        bar_chart.setTitle("good/bad ratio per hour per machine")
-        bar_chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
-
-        self.gfxview_goodbadratio_hour.setChart(bar_chart)
-
-        # x axis
-        bar_categories = ["12-1AM", "1-2AM", "2-3AM", "3-4AM", "4-5AM", "5-6AM",
-                          "6-7AM", "7-8AM", "8-9AM", "9-10AM", "10-11AM", "11-12PM",
-                          "12-1PM", "1-2PM", "2-3PM", "3-4PM", "4-5PM", "5-6PM",
-                          "6-7PM", "7-8PM", "8-9PM", "9-10PM", "10-11PM", "11-12AM"]
-
-        bar_axisX = QBarCategoryAxis()
-        bar_axisX.append(bar_categories)
-
-        # Set rotation so we can fit many X-axis labels nicely
-        bar_axisX.setLabelsAngle(0)
-        bar_axisX.setTruncateLabels(False)
-        font = QFont()
-        font.setPointSizeF(7.5)
-        bar_axisX.setLabelsFont(font)
-
-        bar_chart.addAxis(bar_axisX, Qt.AlignmentFlag.AlignBottom)
-        bar_sets.attachAxis(bar_axisX)
-
-        # Y axis
-        bar_axisY = QValueAxis()
-        bar_chart.addAxis(bar_axisY, Qt.AlignmentFlag.AlignLeft)
-        bar_sets.attachAxis(bar_axisY)
-
-    # page 3 machine uptime percentage per hour
-    def initialize_machineuptime_hour_bar_chart(self) -> None:
-        """
-        Initializes the testing bar chart
-        :return:
-        """
-        DpLog.log().debug("Reading test bar chart...")
-        t_start = self.dteStartTime.dateTime().toSecsSinceEpoch()
-        t_end = self.dteEndTime.dateTime().toSecsSinceEpoch()
-        mach_id = self._machines[self.cmbMachine.currentIndex()].get_machine_id()
-
-        self.query_machine_uptime_hour.emit(t_start, t_end, mach_id)
-        data = DatabaseThread().analyticView_machine_uptime_hour
-
-
-        # draw chart
-        bar_sets = QBarSeries()  # crate an instance for QBarSeries class
-        bs = QBarSet("uptime percentage")
-        for i in range(24):
-#            DpLog.log().debug("Got uptime percentage per hour for machine %i: hour=%i, uptime percentage=%i", data.mach_id, i, data.uptime_percent[i])
-            bs.append(data.uptime_percent[i])
-        bar_sets.append(bs)
-
-
-        bar_chart = QChart()  # create an instance for class QChart
-        bar_chart.addSeries(bar_sets)  # implement method addSeries on the instance test_chart
-        bar_chart.setTitle("uptime percentage per hour per machine")
-        bar_chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
-
-        self.gfxview_uptime_hour.setChart(bar_chart)
-
-        # x axis
-        bar_categories = ["12-1AM","1-2AM","2-3AM","3-4AM","4-5AM","5-6AM",
-                          "6-7AM","7-8AM","8-9AM","9-10AM","10-11AM","11-12PM",
-                          "12-1PM","1-2PM","2-3PM","3-4PM","4-5PM","5-6PM",
-                          "6-7PM","7-8PM","8-9PM","9-10PM","10-11PM","11-12AM"]
-
-        bar_axisX = QBarCategoryAxis()
-        bar_axisX.append(bar_categories)
-
-        # Set rotation so we can fit many X-axis labels nicely
-        bar_axisX.setLabelsAngle(0)
-        bar_axisX.setTruncateLabels(False)
-        font = QFont()
-        font.setPointSizeF(7.5)
-        bar_axisX.setLabelsFont(font)
-
-        bar_chart.addAxis(bar_axisX, Qt.AlignmentFlag.AlignBottom)
-        bar_sets.attachAxis(bar_axisX)
-
-        # Y axis
-        bar_axisY = QValueAxis()
-        bar_axisY.setRange(0.0, 100.0)
-        bar_chart.addAxis(bar_axisY, Qt.AlignmentFlag.AlignLeft)
-        bar_sets.attachAxis(bar_axisY)
-
-
-
-
-
-
-
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from PyQt6 import QtGui
+from PyQt6.QtCharts import QBarSet, QBarSeries, QChart, QBarCategoryAxis, QValueAxis, QStackedBarSeries, \
+    QHorizontalStackedBarSeries, QLineSeries, QDateTimeAxis, QChartView, QAbstractBarSeries
+from PyQt6.QtCore import Qt, QDateTime, QPointF, QTimer
+from PyQt6.QtGui import QFont
+from PyQt6.QtWidgets import QWidget, QCheckBox
+
+from src.dao import Downsampling
+from src.dao.Analytics import AnalyticsDAO, MachineGoodbadDistributionPOD, MachineHourProfilePOD, \
+    MachineAvgspeedHourPOD, MachineAvgprodHourPOD, MachineGoodbadratioHourPOD, MachineUptimeHourPOD, \
+    MachinePODIndex, MachineStateSnapshotPOD, MachineAlarmDurationPOD
+from src.dao.LiveAnalytics import LiveAnalyticsAggregator, LiveUpdatePOD
+from src.dao.Machine import MachinePOD
+from src.dao.MachineStatus import MachineStateType
+from src.io import DpLog
+from src.io.AnalyticsLoader import AnalyticsLoader
+from src.io.BackgroundThreads import DatabaseThread
+from src.uic.ui_AnalyticsView import Ui_AnalyticsView
+
+# Time series are drawn with about one point per pixel of the chart, but never fewer than this
+LOD_MIN_POINTS = 200
+# Quiet time after the last zoom step before the visible range is re-queried
+ZOOM_DEBOUNCE_MS = 250
+# Time between two polls of the live window
+LIVE_POLL_MS = 10000
+
+HOUR_CATEGORIES = ["12-1AM", "1-2AM", "2-3AM", "3-4AM", "4-5AM", "5-6AM",
+                   "6-7AM", "7-8AM", "8-9AM", "9-10AM", "10-11AM", "11-12PM",
+                   "12-1PM", "1-2PM", "2-3PM", "3-4PM", "4-5PM", "5-6PM",
+                   "6-7PM", "7-8PM", "8-9PM", "9-10PM", "10-11PM", "11-12AM"]
+
+
+class BarChartBinding:
+    """
+    A bar chart built once, with its series and axes, for a chart view. Loads swap the values of
+    the bar sets in bulk, the category axis is only rebuilt when the categories changed, and the
+    value axis is fitted to the new values, as Qt Charts doesn't rescale axes for changed data.
+    """
+    def __init__(self, view: QChartView, series: QAbstractBarSeries, title: str,
+                 category_alignment: Qt.AlignmentFlag = Qt.AlignmentFlag.AlignBottom,
+                 labels_angle: int = 0, labels_font_size: Optional[float] = None,
+                 value_range: Optional[Tuple[float, float]] = None):
+        """
+        :param view: the chart view showing the chart
+        :param series: an empty bar series of the wanted kind
+        :param title: the chart title
+        :param category_alignment: side of the category axis, the value axis takes the adjacent side
+        :param labels_angle: rotation of the category labels
+        :param labels_font_size: point size of the category labels, None for the default font
+        :param value_range: fixed range of the value axis, None to fit it to each load
+        """
+        self.series = series
+        self.chart = QChart()
+        self.chart.addSeries(series)
+        self.chart.setTitle(title)
+        self.chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
+
+        self.category_axis = QBarCategoryAxis()
+        self.category_axis.setLabelsAngle(labels_angle)
+        self.category_axis.setTruncateLabels(False)
+        if labels_font_size is not None:
+            font = QFont()
+            font.setPointSizeF(labels_font_size)
+            self.category_axis.setLabelsFont(font)
+        self.chart.addAxis(self.category_axis, category_alignment)
+        series.attachAxis(self.category_axis)
+
+        self.value_axis = QValueAxis()
+        self._value_range = value_range
+        if value_range is not None:
+            self.value_axis.setRange(*value_range)
+        value_alignment = Qt.AlignmentFlag.AlignLeft if category_alignment == Qt.AlignmentFlag.AlignBottom \
+            else Qt.AlignmentFlag.AlignBottom
+        self.chart.addAxis(self.value_axis, value_alignment)
+        series.attachAxis(self.value_axis)
+
+        self._stacked = isinstance(series, (QStackedBarSeries, QHorizontalStackedBarSeries))
+        self._categories: List[str] = []
+        view.setChart(self.chart)
+
+    def set_data(self, categories: Sequence[str], sets: Sequence[Tuple[str, Sequence[float]]]) -> None:
+        """
+        Shows new data. Bar sets are kept and refilled when their labels are unchanged, and when
+        their length is unchanged too, only the bars whose value changed are replaced.
+        :param categories: the category labels, one per bar of each set
+        :param sets: (label, values) of each bar set, in drawing order
+        :return:
+        """
+        sets = [(label, [float(v) for v in values]) for label, values in sets]
+        bar_sets = self.series.barSets()
+        if [bs.label() for bs in bar_sets] == [label for label, _ in sets]:
+            for bs, (_, values) in zip(bar_sets, sets):
+                if bs.count() == len(values):
+                    for i, v in enumerate(values):
+                        if bs.at(i) != v:
+                            bs.replace(i, v)
+                else:
+                    bs.remove(0, bs.count())
+                    bs.append(values)
+        else:
+            self.series.clear()
+            new_sets = []
+            for label, values in sets:
+                bs = QBarSet(label)
+                bs.append(values)
+                new_sets.append(bs)
+            self.series.append(new_sets)
+
+        categories = list(categories)
+        if categories != self._categories:
+            self.category_axis.setCategories(categories)
+            self._categories = categories
+        self._fit_value_axis(sets)
+
+    def clear(self) -> None:
+        """
+        Empties the chart, keeping its bar sets and axes for the next load
+        """
+        for bs in self.series.barSets():
+            bs.remove(0, bs.count())
+        self.category_axis.clear()
+        self._categories = []
+
+    def _fit_value_axis(self, sets: List[Tuple[str, List[float]]]) -> None:
+        if self._value_range is not None:
+            return
+        values = [v for _, set_values in sets for v in set_values]
+        if self._stacked:
+            v_max = max((sum(column) for column in zip(*(set_values for _, set_values in sets))), default=0.0)
+        else:
+            v_max = max(values, default=0.0)
+        v_min = min(0.0, min(values, default=0.0))
+        self.value_axis.setRange(v_min, v_max if v_max > v_min else v_min + 1.0)
+        self.value_axis.applyNiceNumbers()
+
+
+class LineChartBinding:
+    """
+    A line chart over time built once, with its series and axes, for a chart view. Loads replace
+    all points of the series in one call and fit the axes to them. Range changes of the time axis
+    made by zooming are passed on, those made by fitting are not.
+    """
+    def __init__(self, view: QChartView, title: str,
+                 on_range_changed: Optional[Callable[[QDateTime, QDateTime], None]] = None):
+        """
+        :param view: the chart view showing the chart
+        :param title: the chart title
+        :param on_range_changed: called with the new visible time range after a zoom step
+        """
+        self.series = QLineSeries()
+        self.chart = QChart()
+        self.chart.addSeries(self.series)
+        self.chart.setTitle(title)
+        self.chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
+
+        self.axis_x = QDateTimeAxis()  # change the unix time into real time
+        self.axis_x.setFormat("MM.dd.yyyy hh:mm:ss ap")
+        self.chart.addAxis(self.axis_x, Qt.AlignmentFlag.AlignBottom)
+        self.series.attachAxis(self.axis_x)
+
+        self.axis_y = QValueAxis()
+        self.axis_y.setLabelFormat("%d")
+        self.chart.addAxis(self.axis_y, Qt.AlignmentFlag.AlignLeft)
+        self.series.attachAxis(self.axis_y)
+
+        self._fitting = False
+        self._on_range_changed = on_range_changed
+        self.axis_x.rangeChanged.connect(self._range_changed)
+        view.setChart(self.chart)
+
+    def set_points(self, points: List[QPointF], fit: bool = True) -> None:
+        """
+        Replaces all points of the series
+        :param points: the new points sorted by x, x in milliseconds since the epoch
+        :param fit: reset any zoom and fit the axes to the points, False keeps the visible range
+        :return:
+        """
+        self.series.replace(points)
+        if fit and points:
+            self._fit(points)
+
+    def clear(self) -> None:
+        self.series.clear()
+
+    def _fit(self, points: List[QPointF]) -> None:
+        self._fitting = True
+        try:
+            if self.chart.isZoomed():
+                self.chart.zoomReset()
+            self.axis_x.setRange(QDateTime.fromMSecsSinceEpoch(int(points[0].x())),
+                                 QDateTime.fromMSecsSinceEpoch(int(points[-1].x())))
+            ys = [p.y() for p in points]
+            y_min = min(ys)
+            y_max = max(ys)
+            self.axis_y.setRange(y_min, y_max if y_max > y_min else y_min + 1.0)
+            self.axis_y.applyNiceNumbers()
+        finally:
+            self._fitting = False
+
+    def _range_changed(self, t_min: QDateTime, t_max: QDateTime) -> None:
+        if not self._fitting and self._on_range_changed is not None:
+            self._on_range_changed(t_min, t_max)
+
+
+class AnalyticsView(Ui_AnalyticsView, QWidget):
+    """
+
+    """
+    def __init__(self, parent=None):
+        QWidget.__init__(self, parent=parent)
+        DpLog.log().debug("Initializing AnalyticsView")
+        self.setupUi(self)
+
+        # For drop down machine list
+        self._machines: List[MachinePOD] = []  # create a copy of list of MachinePOD
+        # Only load machine data once, either immediately or from a signal
+        if DatabaseThread().machine_data:
+            self._set_machines(DatabaseThread().machine_data)
+        else:
+            DatabaseThread().machine_receiveData.connect(self._set_machines,
+                                                         Qt.ConnectionType.SingleShotConnection)
+        self.cmbMachine.currentIndexChanged.connect(self._on_machine_selected_change)  # connect signal
+
+        # onModelInit should run only once, after the model was correctly initialized.
+        # This could be before or after this JobView is initialized. The modelInitialized
+        # signal should only run once so if we miss that, then we have to call onModelInit
+        # manually.
+        if DatabaseThread().machine_speed_model_is_initialized():
+            self.on_mach_speed_model_init()
+        else:
+            DatabaseThread().machinespeed_tblmodel.model_is_initialized.connect(self.on_mach_speed_model_init)
+            DatabaseThread().analytic_view_enable_general_update(True)
+
+        if DatabaseThread().machine_prod_model_is_initialized():
+            self.on_mach_prod_model_init()
+        else:
+#            DatabaseThread().machineprod_tblmodel.model_is_initialized.connect(self.on_mach_prod_model_init)
+            DatabaseThread().analytic_view_enable_general_update(True)
+
+        self.pbLoad.pressed.connect(DatabaseThread().analytic_view_general_update,
+                                    Qt.ConnectionType.QueuedConnection)
+        self.pbLoad.pressed.connect(self.on_load_pressed)
+
+        # Not in the designer file, the live toggle sits next to the load controls
+        self.chkLive = QCheckBox("Live, last 24h", self)
+        self.horizontalLayout.addWidget(self.chkLive)
+        self.chkLive.toggled.connect(self._on_live_toggled)
+
+        self._init_charts()
+
+    def _init_charts(self) -> None:
+        """
+        Builds the charts, and the loaders and state that feed them. Needs no database, so the
+        chart builders can also be set up and timed on their own, e.g. by the benchmarks.
+        :return:
+        """
+        # Every chart and its axes are built once, loads only swap the data of their series
+        font_size = 7.5
+        self._bar_charts: Dict[str, BarChartBinding] = {
+            # Frequency Analysis
+            "state_distribution": BarChartBinding(
+                self.gfxview_statetime_machine, QBarSeries(), "Total time for each state per machine",
+                labels_angle=90),  # Set rotation so we can fit many x-axis labels nicely
+            "goodbad_distribution": BarChartBinding(
+                self.gfxview_goodbadprod_machine, QHorizontalStackedBarSeries(),
+                "good/bad production for each state per machine",
+                category_alignment=Qt.AlignmentFlag.AlignLeft, labels_font_size=font_size),
+            "stateavgprod_distribution": BarChartBinding(
+                self.gfxview_avgprod_state_machine, QBarSeries(), "Average Production for each state per machine",
+                labels_angle=90),
+            "stateavgspeed_distribution": BarChartBinding(
+                self.gfxview_avgspeed_state_machine, QBarSeries(), "Average Speed for each state per machine",
+                labels_angle=90),
+            "alarm_count": BarChartBinding(
+                self.gfxview_alarm_count_machine, QBarSeries(), "count of each alarm type",
+                labels_font_size=font_size),
+            "alarm_cleartime": BarChartBinding(
+                self.gfxview_alarm_cleartime, QBarSeries(), "clear time of each alarm type",
+                labels_font_size=font_size),
+            "alarm_avgclear": BarChartBinding(
+                self.gfxview_avgclear, QBarSeries(), "clear time of each alarm type",
+                labels_font_size=font_size),
+            # Time Series Analysis
+            "avgspeed_hour": BarChartBinding(
+                self.gfxview_avgspeed_hour, QBarSeries(), "average speed per hour per machine",
+                labels_font_size=font_size),
+            "avgprod_hour": BarChartBinding(
+                self.gfxview_avgprod_hour, QBarSeries(), "average production per hour per machine",
+                labels_font_size=font_size),
+            "goodbadratio_hour": BarChartBinding(
+                self.gfxview_goodbadratio_hour, QBarSeries(), "good/bad ratio per hour per machine",
+                labels_font_size=font_size),
+            "uptime_hour": BarChartBinding(
+                self.gfxview_uptime_hour, QBarSeries(), "uptime percentage per hour per machine",
+                labels_font_size=font_size, value_range=(0.0, 100.0)),
+        }
+        self._line_charts: Dict[str, LineChartBinding] = {
+            "avgspeed_time": LineChartBinding(
+                self.gfxview_avgspeed_time, "Average Speed per machine",
+                lambda t_min, t_max: self._on_time_range_changed("avgspeed_time", t_min, t_max)),
+            "avgprod_time": LineChartBinding(
+                self.gfxview_avgprod_time, "Average Prod per machine",
+                lambda t_min, t_max: self._on_time_range_changed("avgprod_time", t_min, t_max)),
+        }
+
+        # The chart queries go to AnalyticsDAO, or to an offline engine with the same methods
+        self._dao = AnalyticsDAO
+
+        # Chart queries run side by side on worker threads, each chart is drawn when its result arrives
+        self._loader = AnalyticsLoader(self)
+        self._loader.result_ready.connect(self._on_query_result)
+        self._chart_drawers = {
+            # Frequency Analysis
+            "state_distribution": self.initialize_test_bar_chart,
+            "goodbad_distribution": self.initialize_goodbad_distribution_bar_chart,
+            "stateavgprod_distribution": self.initialize_stateavgprod_bar_chart,
+            "stateavgspeed_distribution": self.initialize_stateavgspeed_bar_chart,
+            "alarm_count": self.initialize_machinealarmcount_bar_chart,
+            "alarm_cleartime": self.initialize_machinealarmcleartime_bar_chart,
+            "alarm_avgclear": self.initialize_machinealarmavgclear_bar_chart,
+            # Time Series Analysis
+            "avgspeed_time": self.initialize_machineavgspeed_time_line_chart,
+            "avgprod_time": self.initialize_machineavgprod_time_line_chart,
+        }
+        # Charts of the selected machine, their results are dropped when another machine was
+        # selected since the load so they never draw one machine's data under another's name
+        self._machine_charts = {"alarm_count", "alarm_cleartime", "alarm_avgclear", "avgspeed_time", "avgprod_time"}
+        self._load_mach_id: Optional[int] = None
+        # Hour of day profiles are loaded for every machine at once, so changing the selected
+        # machine redraws these charts from the stored profiles without querying again
+        self._hour_profiles: Dict[str, MachineHourProfilePOD] = {}
+        self._hour_profile_drawers = {
+            "avgspeed_hour": (MachineAvgspeedHourPOD, self.initialize_machineavgspeed_hour_line_chart),
+            "avgprod_hour": (MachineAvgprodHourPOD, self.initialize_machineavgprod_hour_line_chart),
+            "goodbadratio_hour": (MachineGoodbadratioHourPOD, self.initialize_machinegoodbadratio_hour_line_chart),
+            "uptime_hour": (MachineUptimeHourPOD, self.initialize_machineuptime_hour_bar_chart),
+        }
+
+        # Time series are downsampled to the chart width. Zooming in with the rubber band
+        # re-queries the visible range, whose shorter length picks a finer time bucket.
+        self._time_charts = {
+            "avgspeed_time": (self.gfxview_avgspeed_time, "get_machine_avgspeed_time", "average_speed"),
+            "avgprod_time": (self.gfxview_avgprod_time, "get_machine_avgprod_time", "average_prod"),
+        }
+        self._time_args: Dict[str, Tuple] = {}  # query arguments of the loaded, unzoomed range
+        self._time_data = {}  # result of the unzoomed range, redrawn when zooming back out to it
+        self._zoom_ranges: Dict[str, Tuple[int, int]] = {}
+        self._zoom_timer = QTimer(self)
+        self._zoom_timer.setSingleShot(True)
+        self._zoom_timer.setInterval(ZOOM_DEBOUNCE_MS)
+        self._zoom_timer.timeout.connect(self._on_zoom_settled)
+        self._zoom_loaders: Dict[str, AnalyticsLoader] = {}
+        for key, (view, _, _) in self._time_charts.items():
+            view.setRubberBand(QChartView.RubberBand.HorizontalRubberBand)
+            self._zoom_loaders[key] = AnalyticsLoader(self)
+            self._zoom_loaders[key].result_ready.connect(self._on_zoom_result)
+
+        # Live mode polls for new rows and folds them into the last 24 hours, redrawing only what changed
+        self._live = LiveAnalyticsAggregator()
+        self._live_alarms: Dict[int, MachineAlarmDurationPOD] = {}
+        self._live_projections = {
+            "state_distribution": MachineStateSnapshotPOD.to_state_distribution,
+            "goodbad_distribution": MachineStateSnapshotPOD.to_goodbad_distribution,
+            "stateavgprod_distribution": MachineStateSnapshotPOD.to_stateavgprod_distribution,
+            "stateavgspeed_distribution": MachineStateSnapshotPOD.to_stateavgspeed_distribution,
+        }
+        self._live_polling = False
+        self._live_loader = AnalyticsLoader(self)
+        self._live_loader.result_ready.connect(self._on_live_result)
+        self._live_timer = QTimer(self)
+        self._live_timer.setInterval(LIVE_POLL_MS)
+        self._live_timer.timeout.connect(self._poll_live)
+
+    def set_backend(self, dao=None) -> None:
+        """
+        Points the charts at a query backend, e.g. an OfflineAnalyticsDAO over exported files
+        :param dao: an object with the query methods of AnalyticsDAO, None for the database
+        :return: None
+        """
+        if dao is not None:
+            self.chkLive.setChecked(False)  # live mode polls the database
+        self._dao = dao if dao is not None else AnalyticsDAO
+        uses_database = dao is None
+        self._loader.uses_database = uses_database
+        for zoom_loader in self._zoom_loaders.values():
+            zoom_loader.uses_database = uses_database
+
+    #  function for machine drop down list
+    def _set_machines(self, machines: List[MachinePOD]) -> None:
+        """
+        Make a record of the machine data to use and add the names to
+        the machine selector dropdown
+        :param machines: The machines to use
+        :return: None
+        """
+        DpLog.log().debug("Setting machine names / info")
+        self._machines = machines
+        mach_names = [m.get_machine_name() for m in machines]
+        self.cmbMachine.clear()
+        self.cmbMachine.addItems(mach_names)
+
+    def _on_machine_selected_change(self, index: int) -> None:
+        """
+        For now just clear the charts data
+        :param index:
+        :return:
+        """
+        DpLog.log().debug("Changing to machine '%s', index %i",
+                          self._machines[index].get_machine_name(),
+                          index)
+        # Results of the previous machine still on their way are dropped, see _on_query_result
+        self._zoom_ranges.clear()
+        self._zoom_timer.stop()
+        for zoom_loader in self._zoom_loaders.values():
+            zoom_loader.load({})  # drops zoom results still on their way
+
+        # Frequency Analysis
+        self._bar_charts["alarm_count"].clear()
+        self._bar_charts["alarm_cleartime"].clear()
+        self._bar_charts["alarm_avgclear"].clear()
+
+
+        # Time Series Analysis
+            # time
+        for line_chart in self._line_charts.values():
+            line_chart.clear()
+        self._time_data.clear()
+        if self.chkLive.isChecked():
+            self._draw_live_alarms(self._machines[index].get_machine_id())
+
+            # hour, already loaded for every machine
+        for key in self._hour_profiles:
+            self._draw_hour_profile(key)
+
+
+
+
+
+    # page 1, machine speed and production table
+    def on_mach_speed_model_init(self):
+        DpLog.log().debug("Initializing MachineSpeedTableModel...")
+        self.tblvMachineSpeed.setModel(DatabaseThread().machinespeed_tblmodel)
+    def on_mach_prod_model_init(self):
+        DpLog.log().debug("Initializing MachineProdTableModel...")
+        self.tblvMachineProd.setModel(DatabaseThread().machineprod_tblmodel)
+
+    # for press button
+    def on_load_pressed(self):
+        """
+        Sends every chart query to the loader at once. The charts fill in as results arrive.
+        :return:
+        """
+        if not self._machines:
+            DpLog.log().debug("No machine data yet, nothing to load")
+            return
+        self.chkLive.setChecked(False)  # the loaded range replaces the live window
+
+        t_start = self.dteStartTime.dateTime().toSecsSinceEpoch()
+        t_end = self.dteEndTime.dateTime().toSecsSinceEpoch()
+        mach_id = self._machines[self.cmbMachine.currentIndex()].get_machine_id()
+        machines = list(self._machines)
+        mach_ids = [m.get_machine_id() for m in machines]
+
+        fleet_args = (t_start, t_end, machines)
+        machine_args = (t_start, t_end, mach_id, machines)
+        profile_args = (t_start, t_end, mach_ids)
+        self._hour_profiles.clear()
+        self._load_mach_id = mach_id
+
+        self._time_args = {key: machine_args for key in self._time_charts}
+        self._time_data.clear()
+        self._zoom_ranges.clear()
+        self._zoom_timer.stop()
+        for zoom_loader in self._zoom_loaders.values():
+            zoom_loader.load({})  # drops zoom results still on their way
+        self._loader.load({
+            # Frequency Analysis
+            "state_distribution": (self._dao.get_machines_state_distribution, fleet_args),
+            "goodbad_distribution": (self._dao.get_machines_goodbad_distribution, fleet_args),
+            "stateavgprod_distribution": (self._dao.get_machines_stateavgprod_distribution, fleet_args),
+            "stateavgspeed_distribution": (self._dao.get_machines_stateavgspeed_distribution, fleet_args),
+            "alarm_count": (self._dao.get_machine_alarm_count, machine_args),
+            "alarm_cleartime": (self._dao.get_machine_alarm_cleartime, machine_args),
+            "alarm_avgclear": (self._dao.get_machine_alarm_avgclear, machine_args),
+            # Time Series Analysis
+            "avgspeed_time": (self._dao.get_machine_avgspeed_time, machine_args),
+            "avgprod_time": (self._dao.get_machine_avgprod_time, machine_args),
+            "avgspeed_hour": (self._dao.get_machines_avgspeed_hour, profile_args),
+            "avgprod_hour": (self._dao.get_machines_avgprod_hour, profile_args),
+            "goodbadratio_hour": (self._dao.get_machines_goodbadratio_hour, profile_args),
+            "uptime_hour": (self._dao.get_machines_uptime_hour, profile_args),
+        })
+
+    def _on_query_result(self, key: str, data) -> None:
+        """
+        Draws the chart of a query as soon as its result arrives
+        :param key: the job key of the query
+        :param data: the query result, None if the query failed
+        :return:
+        """
+        if data is None:
+            DpLog.log().error("No data for analytics chart %s", key)
+            return
+        if key in self._machine_charts and self._load_mach_id != self._selected_mach_id():
+            DpLog.log().debug("Dropping analytics result %s of machine %s, no longer selected", key, self._load_mach_id)
+            return
+        if key in self._hour_profile_drawers:
+            self._hour_profiles[key] = data
+            self._draw_hour_profile(key)
+            return
+        self._chart_drawers[key](data)
+
+    def _selected_mach_id(self) -> Optional[int]:
+        """
+        The ID of the machine selected in the dropdown, None if there is none
+        """
+        index = self.cmbMachine.currentIndex()
+        if index < 0 or index >= len(self._machines):
+            return None
+        return self._machines[index].get_machine_id()
+
+    def _draw_hour_profile(self, key: str) -> None:
+        """
+        Draws the hour of day chart of the selected machine from its loaded profile
+        :param key: the job key of the profile
+        :return:
+        """
+        mach_id = self._selected_mach_id()
+        if mach_id is None:
+            return
+        row = self._hour_profiles[key].row(mach_id)
+        if row is None:  # machine list changed since the profile was loaded
+            return
+        pod_type, drawer = self._hour_profile_drawers[key]
+        drawer(pod_type(mach_id, row))
+
+    def _lod_points(self, key: str, data) -> List[QPointF]:
+        """
+        The points of a time series result downsampled to the width of its chart
+        :param key: the job key of the time chart
+        :param data: the query result for this chart
+        :return: the points, x in milliseconds for the QDateTimeAxis
+        """
+        view, _, values_attr = self._time_charts[key]
+        threshold = max(LOD_MIN_POINTS, view.viewport().width())
+        times, values = Downsampling.lttb(data.hours, getattr(data, values_attr), threshold)
+        return [QPointF(t * 1000, v) for t, v in zip(times, values)]
+
+    def _on_time_range_changed(self, key: str, t_min: QDateTime, t_max: QDateTime) -> None:
+        """
+        Remembers the visible range of a time chart after a zoom step, and waits for the zooming to settle
+        """
+        self._zoom_ranges[key] = (t_min.toSecsSinceEpoch(), t_max.toSecsSinceEpoch())
+        self._zoom_timer.start()
+
+    def _on_zoom_settled(self) -> None:
+        """
+        Redraws each zoomed time chart at the detail of its visible range
+        :return:
+        """
+        for key, (z_start, z_end) in self._zoom_ranges.items():
+            args = self._time_args.get(key)
+            if key not in self._time_data or args is None:
+                continue
+            t_start, t_end = args[0], args[1]
+            if z_start <= t_start and z_end >= t_end:
+                # back out to the loaded range, which is still in memory
+                self._line_charts[key].set_points(self._lod_points(key, self._time_data[key]), fit=False)
+                continue
+            _, method, _ = self._time_charts[key]
+            self._zoom_loaders[key].load({key: (getattr(self._dao, method), (max(z_start, t_start), min(z_end, t_end)) + tuple(args[2:]))})
+        self._zoom_ranges.clear()
+
+    def _on_zoom_result(self, key: str, data) -> None:
+        """
+        Swaps the points of a zoomed time chart for those of its visible range, keeping the zoom
+        :param key: the job key of the time chart
+        :param data: the query result for the visible range, None if the query failed
+        :return:
+        """
+        if data is None or key not in self._time_data:
+            return
+        self._line_charts[key].set_points(self._lod_points(key, data), fit=False)
+
+    def _on_live_toggled(self, checked: bool) -> None:
+        """
+        Starts polling the live window, reading it whole on the first poll, or stops polling
+        """
+        if not checked:
+            self._live_timer.stop()
+            self._live_loader.load({})  # drops a poll still on its way
+            self._live_polling = False
+            return
+        if self._dao is not AnalyticsDAO:
+            DpLog.log().warning("Live analytics need the database backend")
+            self.chkLive.setChecked(False)
+            return
+        self._live.reset()
+        self._live_alarms.clear()
+        self._poll_live()
+        self._live_timer.start()
+
+    def _poll_live(self) -> None:
+        if self._live_polling or not self._machines:
+            return
+        self._live_polling = True
+        self._live_loader.load({"live": (self._live.poll, (list(self._machines),))})
+
+    def _on_live_result(self, key: str, update: Optional[LiveUpdatePOD]) -> None:
+        """
+        Redraws the charts whose values changed since the previous poll
+        :param key: the job key of the poll
+        :param update: the changes, None if the poll failed
+        :return:
+        """
+        self._live_polling = False
+        if update is None or not self.chkLive.isChecked():
+            return
+        if update.snapshot is not None:
+            snapshot = MachinePODIndex(update.snapshot)
+            for chart_key, projection in self._live_projections.items():
+                self._chart_drawers[chart_key](snapshot.project(self._machines, projection))
+            for profile_key, profile in update.hour_profiles.items():
+                self._hour_profiles[profile_key] = profile
+                self._draw_hour_profile(profile_key)
+
+        self._live_alarms.update(update.alarm_durations)
+        index = self.cmbMachine.currentIndex()
+        if 0 <= index < len(self._machines) and self._machines[index].get_machine_id() in update.alarm_durations:
+            self._draw_live_alarms(self._machines[index].get_machine_id())
+
+    def _draw_live_alarms(self, mach_id: int) -> None:
+        durations = self._live_alarms.get(mach_id)
+        if durations is None:
+            return
+        self.initialize_machinealarmcount_bar_chart(durations.to_alarm_count())
+        self.initialize_machinealarmcleartime_bar_chart(durations.to_alarm_cleartime())
+        self.initialize_machinealarmavgclear_bar_chart(durations.to_alarm_avgclear())
+
+# Frequency Analysis
+    # state
+
+    # page 2 test bar chart (machine state time distribution)
+    def initialize_test_bar_chart(self, data) -> None:
+        """
+        Fills the testing bar chart
+        :param data: the query result for this chart
+        :return:
+        """
+        DpLog.log().debug("Reading test bar chart...")
+        DpLog.log().debug("Got %i machines of data", len(data))
+        for d in data:
+            DpLog.log().debug("Got state data for machine %i: %s", d.mach_id, str(d.states))
+
+        # one bar set per state, one bar per machine
+        self._bar_charts["state_distribution"].set_data(
+            [machine.mach_name for machine in data],
+            [(s.name, [machine.states[s] for machine in data]) for s in MachineStateType])
+
+    # page 2 machine good/bad distribution bar chart
+    def initialize_goodbad_distribution_bar_chart(self, data) -> None:
+        """
+        Fills the good/bad production bar chart
+        :param data: the query result for this chart
+        :return:
+        """
+        DpLog.log().debug("Reading test bar chart...")
+        DpLog.log().debug("Got %i machines of data", len(data))
+        #for d in data:
+        #    DpLog.log().debug("Got machine good/bad production data for machine %i: good %s, bad %s", d.mach_id, str(d.mach_goodprod), str(d.mach_badprod))
+
+        self._bar_charts["goodbad_distribution"].set_data(
+            [machine.mach_name for machine in data],
+            [("good production", [machine.mach_goodprod for machine in data]),
+             ("bad production", [machine.mach_badprod for machine in data])])
+
+    # page 2 machine average production per state distribution
+    def initialize_stateavgprod_bar_chart(self, data) -> None:
+        """
+        Fills the stateavgprod bar chart
+        :param data: the query result for this chart
+        :return:
+        """
+        DpLog.log().debug("Reading test bar chart...")
+        DpLog.log().debug("Got %i machines of data", len(data))
+        #for d in data:
+        #    DpLog.log().debug("Got average production per state data for machine %i: %s", d.mach_id, str(d.states))
+
+        self._bar_charts["stateavgprod_distribution"].set_data(
+            [machine.mach_name for machine in data],
+            [(s.name, [machine.states[s] for machine in data]) for s in MachineStateType])
+
+    # page 2 machine average speed per state distribution
+    def initialize_stateavgspeed_bar_chart(self, data) -> None:
+        """
+        Fills the stateavgspeed bar chart
+        :param data: the query result for this chart
+        :return:
+        """
+        DpLog.log().debug("Reading test bar chart...")
+        DpLog.log().debug("Got %i machines of data", len(data))
+        #for d in data:
+        #    DpLog.log().debug("Got average speed per state data for machine %i: %s", d.mach_id, str(d.states))
+
+        self._bar_charts["stateavgspeed_distribution"].set_data(
+            [machine.mach_name for machine in data],
+            [(s.name, [machine.states[s] for machine in data]) for s in MachineStateType])
+
+    # alarm
+
+    # page 2 count of each alarm type per machine
+    def initialize_machinealarmcount_bar_chart(self, data) -> None:
+        """
+        Fills the alarm count bar chart
+        :param data: the query result for this chart
+        :return:
+        """
+        DpLog.log().debug("Reading test bar chart...")
+
+        self._bar_charts["alarm_count"].set_data(
+            [at.alarm_desc for at in data.alarm_counts],
+            [("alarm count", list(data.alarm_counts.values()))])
+
+    # page 2 bar chart for alarm time per alarm per machine
+    def initialize_machinealarmcleartime_bar_chart(self, data) -> None:
+        """
+        Fills the alarm clear time bar chart
+        :param data: the query result for this chart
+        :return:
+        """
+        DpLog.log().debug("Reading test bar chart...")
+
+        self._bar_charts["alarm_cleartime"].set_data(
+            [at.alarm_desc for at in data.alarm_cleartime],
+            [("alarm cleartime", list(data.alarm_cleartime.values()))])
+
+    # page 2 bar chart for average alarm time per alarm per machine
+    def initialize_machinealarmavgclear_bar_chart(self, data) -> None:
+        """
+        Fills the average alarm clear time bar chart
+        :param data: the query result for this chart
+        :return:
+        """
+        DpLog.log().debug("Reading test bar chart...")
+
+        self._bar_charts["alarm_avgclear"].set_data(
+            [at.alarm_desc for at in data.alarm_avgclear],
+            [("alarm average cleartime", list(data.alarm_avgclear.values()))])
+
+
+
+    # Time Series Analysis
+        # time
+    def initialize_machineavgspeed_time_line_chart(self, data) -> None:
+        """
+        Fills the avgspeed line chart
+        :param data: the query result for this chart
+        :return:
+        """
+        DpLog.log().debug("Reading line chart...")
+        DpLog.log().debug("Got %i hours of data", len(data.hours))
+
+        self._time_data["avgspeed_time"] = data
+        self._line_charts["avgspeed_time"].set_points(self._lod_points("avgspeed_time", data))
+
+    # page 3 machine average prod per hour
+    def initialize_machineavgprod_time_line_chart(self, data) -> None:
+        """
+        Fills the avgprod line chart
+        :param data: the query result for this chart
+        :return:
+        """
+        DpLog.log().debug("Reading line chart...")
+        DpLog.log().debug("Got %i hours of data", len(data.hours))
+
+        self._time_data["avgprod_time"] = data
+        self._line_charts["avgprod_time"].set_points(self._lod_points("avgprod_time", data))
+
+
+
+        # hour
+    def initialize_machineavgspeed_hour_line_chart(self, data) -> None:
+        """
+        Fills the hour avgspeed chart
+        :param data: the query result for this chart
+        :return:
+        """
+        DpLog.log().debug("Reading test bar chart...")
+        self._bar_charts["avgspeed_hour"].set_data(HOUR_CATEGORIES, [("average speed", data.avg_speed)])
+
+    # page 3 machine average prod per hour
+    def initialize_machineavgprod_hour_line_chart(self, data) -> None:
+        """
+        Fills the hour avgprod chart
+        :param data: the query result for this chart
+        :return:
+        """
+        DpLog.log().debug("Reading test bar chart...")
+        self._bar_charts["avgprod_hour"].set_data(HOUR_CATEGORIES, [("average production", data.avg_prod)])
+
+    # page 3 machine good/bad ratio per hour
+    def initialize_machinegoodbadratio_hour_line_chart(self, data) -> None:
+        """
+        Fills the good/bad ratio per hour chart
+        :param data: the query result for this chart
+        :return:
+        """
+        DpLog.log().debug("Reading test bar chart...")
+        self._bar_charts["goodbadratio_hour"].set_data(HOUR_CATEGORIES, [("good/bad ratio", data.good_bad_ratio)])
+
+    # page 3 machine uptime percentage per hour
+    def initialize_machineuptime_hour_bar_chart(self, data) -> None:
+        """
+        Fills the uptime percentage per hour chart
+        :param data: the query result for this chart
+        :return:
+        """
+        DpLog.log().debug("Reading test bar chart...")
+        self._bar_charts["uptime_hour"].set_data(HOUR_CATEGORIES, [("uptime percentage", data.uptime_percent)])
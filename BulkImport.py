@@ -0,0 +1,167 @@
+"""
+Bulk import of exported spreadsheets into the database.
+
+Alarm type (ALARM_TYPE), alarm (MACHINE_ALARM) and job (JOB) exports, CSV or XLSX with openpyxl,
+are streamed a chunk of rows at a time, each cell checked against its column type, and written
+with multi-row prepared INSERTs in a single transaction, so a file lands completely or not at all.
+Rows are upserted on the key of their table, so importing the same file again leaves the table
+as it was. Upserted rows don't move the table's watermark, so a successful import drops the
+cached analytics results of that table.
+"""
+import time
+from typing import Any, List, Optional, Sequence
+
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from src.dao import Alarm
+from src.dao.AnalyticsCache import result_cache
+from src.dao.OfflineAnalytics import CELL_CONVERTERS, TABLE_SCHEMAS, open_export
+from src.io import DpLog
+from src.io.ConnectionPool import current_db
+
+# Tables that can be imported, and the key their rows are upserted on
+IMPORT_KEYS = {"ALARM_TYPE": "AT_ID", "MACHINE_ALARM": "ALARM_ID", "JOB": "JOB_ID"}
+# Source table of the cached results an import of each table makes stale, alarm results name their types
+CACHE_SOURCES = {"ALARM_TYPE": "MACHINE_ALARM", "MACHINE_ALARM": "MACHINE_ALARM", "JOB": "JOB"}
+# Rows written per INSERT statement
+CHUNK_ROWS = 1000
+# Bound values allowed in one statement. SQLite before 3.32 allows no more than 999.
+MAX_BIND_VALUES = {"QSQLITE": 999}
+DEFAULT_MAX_BIND_VALUES = 65535
+# Invalid rows logged per file, the rest are only counted
+MAX_LOGGED_ERRORS = 10
+
+
+class ImportReportPOD:
+    """
+    Outcome of the import of one file
+    """
+    def __init__(self, path: str, table: str, rows: int, skipped: int, seconds: float, ok: bool):
+        self.path = path
+        self.table = table
+        self.rows = rows
+        self.skipped = skipped
+        self.seconds = seconds
+        self.ok = ok
+
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def __repr__(self):
+        return "ImportReportPOD(path=%s, table=%s, rows=%i, skipped=%i, seconds=%.3f, rows/s=%.0f, ok=%s)" % (
+            self.path, self.table, self.rows, self.skipped, self.seconds, self.rows_per_second(), self.ok)
+
+
+class BulkImportDAO:
+
+    @staticmethod
+    def import_file(path: str, table: Optional[str] = None, chunk_rows: int = CHUNK_ROWS) -> ImportReportPOD:
+        """
+        Upserts the rows of an export into its table. Rows with a cell that doesn't fit its column,
+        or without a key, are skipped and counted; empty cells are written as NULL.
+        :param path: a .csv or .xlsx file with a header row of column names, e.g. job.csv or alarm.xlsx
+        :param table: the table the file holds, None to tell it from the header
+        :param chunk_rows: rows written per INSERT statement, lowered to fit the driver's bind value limit
+        :return: the report, with ok False if nothing was written
+        """
+        t = time.perf_counter()
+        table, positions, rows = open_export(path, table)
+        if table not in IMPORT_KEYS:
+            raise ValueError("%s holds %s rows, which can't be imported" % (path, table))
+        schema = TABLE_SCHEMAS[table]
+        columns = list(schema)
+        key_position = columns.index(IMPORT_KEYS[table])
+        cells = list(zip(positions, (CELL_CONVERTERS[dtype] for dtype in schema.values())))
+
+        db = current_db()
+        max_bind = MAX_BIND_VALUES.get(db.driverName(), DEFAULT_MAX_BIND_VALUES)
+        chunk_rows = max(1, min(chunk_rows, max_bind // len(columns)))
+
+        if not db.transaction():
+            DpLog.log().error("Failed to start the import transaction: %s", db.lastError().text())
+            return ImportReportPOD(path, table, 0, 0, time.perf_counter() - t, False)
+
+        statements = {}  # prepared INSERT per row count, the full chunk one is reused
+        chunk: List[List[Any]] = []
+        imported = 0
+        skipped = 0
+        for line, row in enumerate(rows, start=2):
+            if all(v is None or v == "" for v in row):
+                continue
+            try:
+                values = [None if i >= len(row) or row[i] is None or row[i] == "" else convert(row[i])
+                          for i, convert in cells]
+                if values[key_position] is None:
+                    raise ValueError("no %s" % columns[key_position])
+            except ValueError as e:
+                skipped += 1
+                if skipped <= MAX_LOGGED_ERRORS:
+                    DpLog.log().warning("Skipping line %i of %s: %s", line, path, e)
+                continue
+
+            chunk.append(values)
+            if len(chunk) == chunk_rows:
+                if not BulkImportDAO._write(db, statements, table, columns, chunk):
+                    db.rollback()
+                    return ImportReportPOD(path, table, 0, skipped, time.perf_counter() - t, False)
+                imported += len(chunk)
+                chunk = []
+
+        if chunk and not BulkImportDAO._write(db, statements, table, columns, chunk):
+            db.rollback()
+            return ImportReportPOD(path, table, 0, skipped, time.perf_counter() - t, False)
+        imported += len(chunk)
+
+        if not db.commit():
+            DpLog.log().error("Failed to commit the import of %s: %s", path, db.lastError().text())
+            db.rollback()
+            return ImportReportPOD(path, table, 0, skipped, time.perf_counter() - t, False)
+
+        if table == "ALARM_TYPE":  # descriptions of existing types may have changed
+            Alarm.alarm_types.refresh(force=True)
+        result_cache.invalidate(CACHE_SOURCES[table])
+
+        report = ImportReportPOD(path, table, imported, skipped, time.perf_counter() - t, True)
+        DpLog.log().info("Imported %r", report)
+        return report
+
+    @staticmethod
+    def import_files(paths: Sequence[str]) -> List[ImportReportPOD]:
+        """
+        Imports each file in order, in its own transaction
+        """
+        return [BulkImportDAO.import_file(path) for path in paths]
+
+    @staticmethod
+    def _write(db: QSqlDatabase, statements: dict, table: str, columns: List[str], chunk: List[List[Any]]) -> bool:
+        query = statements.get(len(chunk))
+        if query is None:
+            query = statements[len(chunk)] = QSqlQuery(db)
+            if not query.prepare(BulkImportDAO._upsert_sql(db, table, columns, len(chunk))):
+                DpLog.log().error("Failed to prepare the %s import: %s", table, query.lastError().text())
+                return False
+
+        pos = 0
+        for values in chunk:
+            for v in values:
+                query.bindValue(pos, v)
+                pos += 1
+        if not query.exec():
+            DpLog.log().error("Failed to import %i %s rows: %s", len(chunk), table, query.lastError().text())
+            return False
+        return True
+
+    @staticmethod
+    def _upsert_sql(db: QSqlDatabase, table: str, columns: List[str], num_rows: int) -> str:
+        """
+        A multi-row INSERT that updates the rows whose key already exists, in the driver's dialect
+        """
+        key = IMPORT_KEYS[table]
+        placeholders = "(" + ", ".join("?" * len(columns)) + ")"
+        updated = [c for c in columns if c != key]
+        if db.driverName() == "QSQLITE":
+            conflict = "ON CONFLICT(%s) DO UPDATE SET %s" % (key, ", ".join("%s=excluded.%s" % (c, c) for c in updated))
+        else:
+            conflict = "ON DUPLICATE KEY UPDATE %s" % ", ".join("%s=VALUES(%s)" % (c, c) for c in updated)
+        return "INSERT INTO %s (%s) VALUES %s %s" % (table, ", ".join(columns),
+                                                    ", ".join([placeholders] * num_rows), conflict)
@@ -0,0 +1,202 @@
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from src.io import DpLog
+from src.io.DatabaseIO import DatabaseIO
+
+
+class ConnectionPoolStatsPOD:
+    """
+    Counters of a ConnectionPool
+    """
+    def __init__(self, max_connections: int, open_connections: int, leased: int, leases: int,
+                 total_wait: float, max_wait: float, health_check_failures: int):
+        self.max_connections = max_connections
+        self.open_connections = open_connections
+        self.leased = leased
+        self.leases = leases
+        self.total_wait = total_wait
+        self.max_wait = max_wait
+        self.health_check_failures = health_check_failures
+
+    def mean_wait(self) -> float:
+        return self.total_wait / self.leases if self.leases else 0.0
+
+    def __repr__(self):
+        return ("ConnectionPoolStatsPOD(max_connections=%i, open_connections=%i, leased=%i, leases=%i, "
+                "mean_wait=%.4f, max_wait=%.4f, health_check_failures=%i)" % (
+                    self.max_connections, self.open_connections, self.leased, self.leases,
+                    self.mean_wait(), self.max_wait, self.health_check_failures))
+
+
+class _ThreadConnection:
+    """
+    The pooled connection of one thread
+    """
+    def __init__(self):
+        self.db: Optional[QSqlDatabase] = None
+        self.name: Optional[str] = None
+        self.leased = False
+        self.last_used = 0.0
+
+
+class ConnectionPool:
+    """
+    Bounded pool of database connections for running analytics queries side by side.
+
+    QtSql connections may only be used on the thread that opened them, so the pool hands each
+    worker thread its own connection, cloned from the shared DatabaseIO connection, and keeps it
+    open for that thread's later leases. At most max_connections leases are out at once; a lease
+    past that waits, and the wait is recorded. A connection that sat idle longer than
+    idle_check_seconds is checked with a trivial query before it is handed out, and reopened if
+    the server dropped it.
+
+    Threads leasing connections should be long lived or call close_thread_connection before they
+    end. AnalyticsLoader's pool threads close theirs when they expire.
+    """
+    def __init__(self, max_connections: int = 4, idle_check_seconds: float = 30.0):
+        self.max_connections = max_connections
+        self.idle_check_seconds = idle_check_seconds
+
+        self._template_name: Optional[str] = None
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+        # By thread ID rather than in a threading.local: Python drops the thread locals of a Qt pool
+        # thread between the tasks it runs, which would leave its connection open and unreachable.
+        self._threads: Dict[int, _ThreadConnection] = {}
+
+        self._open = 0
+        self._leased = 0
+        self._leases = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._health_check_failures = 0
+
+    def set_template(self, connection_name: str) -> None:
+        """
+        Sets the connection that pooled connections are cloned from. Defaults to the DatabaseIO connection.
+        """
+        self._template_name = connection_name
+
+    def stats(self) -> ConnectionPoolStatsPOD:
+        with self._lock:
+            return ConnectionPoolStatsPOD(self.max_connections, self._open, self._leased, self._leases,
+                                          self._total_wait, self._max_wait, self._health_check_failures)
+
+    def leased_db(self) -> Optional[QSqlDatabase]:
+        """
+        The connection leased by the calling thread, None if it holds no lease
+        """
+        thread = self._threads.get(threading.get_ident())
+        if thread is not None and thread.leased:
+            return thread.db
+        return None
+
+    @contextmanager
+    def connection(self) -> Iterator[Optional[QSqlDatabase]]:
+        """
+        Leases the calling thread's connection for the duration of the with block
+        :return: the open connection, or None if it couldn't be opened
+        """
+        thread = self._thread()
+        if thread.leased:  # nested lease on the same thread
+            yield thread.db
+            return
+
+        t_wait = time.perf_counter()
+        self._slots.acquire()
+        wait = time.perf_counter() - t_wait
+        with self._lock:
+            self._leased += 1
+            self._leases += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+
+        try:
+            db = self._thread_db(thread)
+            thread.leased = db is not None
+            yield db
+        finally:
+            thread.leased = False
+            thread.last_used = time.monotonic()
+            with self._lock:
+                self._leased -= 1
+            self._slots.release()
+
+    def close_thread_connection(self) -> None:
+        """
+        Closes the calling thread's connection, if it has one
+        """
+        with self._lock:
+            thread = self._threads.pop(threading.get_ident(), None)
+        if thread is not None and thread.name is not None:
+            self._close(thread)
+
+    def _thread(self) -> _ThreadConnection:
+        ident = threading.get_ident()
+        with self._lock:
+            thread = self._threads.get(ident)
+            if thread is None:
+                thread = self._threads[ident] = _ThreadConnection()
+            return thread
+
+    def _close(self, thread: _ThreadConnection) -> None:
+        name = thread.name
+        thread.db.close()
+        thread.db = None
+        thread.name = None
+        QSqlDatabase.removeDatabase(name)
+        with self._lock:
+            self._open -= 1
+
+    def _thread_db(self, thread: _ThreadConnection) -> Optional[QSqlDatabase]:
+        db = thread.db
+        if db is not None:
+            idle = time.monotonic() - thread.last_used
+            if idle < self.idle_check_seconds or self._is_healthy(db):
+                return db
+            with self._lock:
+                self._health_check_failures += 1
+            DpLog.log().debug("Pooled connection %s failed its health check, reopening", thread.name)
+            self._close(thread)
+
+        template_name = self._template_name or DatabaseIO().get_db().connectionName()
+        name = "analytics-pool-%s" % uuid.uuid4().hex
+        db = QSqlDatabase.cloneDatabase(template_name, name)
+        if not db.open():
+            DpLog.log().error("Failed to open pooled connection: %s", db.lastError().text())
+            del db
+            QSqlDatabase.removeDatabase(name)
+            return None
+
+        thread.db = db
+        thread.name = name
+        with self._lock:
+            self._open += 1
+        return db
+
+    @staticmethod
+    def _is_healthy(db: QSqlDatabase) -> bool:
+        if not db.isOpen():
+            return False
+        query = QSqlQuery(db)
+        return query.exec("SELECT 1") and query.next()
+
+
+connection_pool = ConnectionPool()
+
+
+def current_db() -> QSqlDatabase:
+    """
+    The connection analytics queries should use on the calling thread: the connection it leased
+    from connection_pool, or the shared DatabaseIO connection when it holds no lease.
+    """
+    db = connection_pool.leased_db()
+    if db is not None:
+        return db
+    return DatabaseIO().get_db()
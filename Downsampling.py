@@ -0,0 +1,52 @@
+"""
+Downsampling of the analytics time series for drawing.
+
+A chart can't show more points than it is wide in pixels, so long series are reduced to
+about one point per pixel before they are handed to a QLineSeries, keeping their visual shape.
+"""
+from typing import List, Sequence, Tuple
+
+
+def lttb(times: Sequence[float], values: Sequence[float], threshold: int) -> Tuple[List[float], List[float]]:
+    """
+    Largest-Triangle-Three-Buckets: keeps the first and last point, and from each of threshold - 2
+    equal buckets in between the point forming the largest triangle with the point kept from the
+    previous bucket and the mean of the next bucket. Peaks and dips survive, flat runs are thinned.
+    :param times: sample times, sorted ascending
+    :param values: sample values, same length as times
+    :param threshold: number of points to keep
+    :return: the kept times and values
+    """
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return [float(t) for t in times], [float(v) for v in values]
+
+    every = (n - 2) / (threshold - 2)
+    kept_times = [float(times[0])]
+    kept_values = [float(values[0])]
+    a = 0
+    for i in range(threshold - 2):
+        # Mean of the next bucket, the third corner of the triangle
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_count = avg_end - avg_start
+        avg_t = sum(times[avg_start:avg_end]) / avg_count
+        avg_v = sum(values[avg_start:avg_end]) / avg_count
+
+        at = times[a]
+        av = values[a]
+        best_area = -1.0
+        best = range_start = int(i * every) + 1
+        for j in range(range_start, int((i + 1) * every) + 1):
+            area = abs((at - avg_t) * (values[j] - av) - (at - times[j]) * (avg_v - av))
+            if area > best_area:
+                best_area = area
+                best = j
+        kept_times.append(float(times[best]))
+        kept_values.append(float(values[best]))
+        a = best
+
+    kept_times.append(float(times[n - 1]))
+    kept_values.append(float(values[n - 1]))
+    return kept_times, kept_values
+
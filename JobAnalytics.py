@@ -0,0 +1,128 @@
+from typing import List
+
+from src.dao.Analytics import MachinePODIndex
+from src.dao.AnalyticsCache import cached_result, JOB_TABLE
+from src.dao.Machine import MachinePOD
+from src.dao.QueryFetch import fetch_columns, forward_only_query, INT64
+from src.dao.QueryMetrics import instrumented
+from src.io import DpLog
+from src.io.ConnectionPool import current_db
+
+
+class MachineJobStatsPOD:
+    """
+    Holds the statistics of the jobs a single machine finished on a time range.
+    contains the Machine ID, the Machine Name, the number of jobs, and the sums the job metrics
+    are derived from. Run time is START_DATE to FINISH_DATE and lead time MATERIAL_DATE to
+    FINISH_DATE, in seconds, each only over the jobs that have the start date.
+    """
+    __slots__ = ("mach_id", "mach_name", "jobs", "run_jobs", "run_time_sum", "run_qty_sum", "on_time_jobs",
+                 "lead_jobs", "lead_time_sum", "order_qty_sum", "yield_qty_sum")
+
+    def __init__(self, mach_id: int, mach_name: str):
+        self.mach_id = mach_id
+        self.mach_name = mach_name
+        self.jobs = 0
+        self.run_jobs = 0
+        self.run_time_sum = 0
+        self.run_qty_sum = 0
+        self.on_time_jobs = 0
+        self.lead_jobs = 0
+        self.lead_time_sum = 0
+        self.order_qty_sum = 0
+        self.yield_qty_sum = 0
+
+    def cycle_time(self) -> float:
+        """
+        Mean run time of a job, in seconds
+        """
+        return self.run_time_sum / self.run_jobs if self.run_jobs else 0.0
+
+    def run_rate(self) -> float:
+        """
+        Ordered parts per second of run time
+        """
+        return self.run_qty_sum / self.run_time_sum if self.run_time_sum else 0.0
+
+    def on_time_percentage(self) -> float:
+        """
+        Percentage of the jobs finished by their due date, between 0-100
+        """
+        return 100.0 * self.on_time_jobs / self.jobs if self.jobs else 0.0
+
+    def lead_time(self) -> float:
+        """
+        Mean time from material to finished job, in seconds
+        """
+        return self.lead_time_sum / self.lead_jobs if self.lead_jobs else 0.0
+
+    def yield_ratio(self) -> float:
+        """
+        Yielded parts per ordered part
+        """
+        return self.yield_qty_sum / self.order_qty_sum if self.order_qty_sum else 0.0
+
+
+class JobAnalyticsDAO:
+
+    @staticmethod
+    @cached_result(JOB_TABLE)
+    @instrumented
+    def get_machines_job_stats(t_start: int, t_end: int, machines: List[MachinePOD]) -> List[MachineJobStatsPOD]:
+        """
+        Queries the job statistics of each machine, over the jobs finished on a certain time range,
+        in a single grouped scan. Cycle time, run rate, on time percentage, lead time and yield
+        ratio are all derived from the sums of MachineJobStatsPOD.
+        :param t_start: start of the range, unix time
+        :param t_end: end of the range, unix time
+        :param machines: list of all machines, for initializing the data
+        :return:
+        """
+
+        query_str = """SELECT
+    MACHINE_ID,
+    COUNT(JOB_ID) AS JOB_COUNT,
+    COUNT(START_DATE) AS RUN_JOBS,
+    SUM(FINISH_DATE - START_DATE) AS RUN_TIME_SUM,
+    SUM(CASE WHEN START_DATE IS NOT NULL THEN ORDER_QTY END) AS RUN_QTY_SUM,
+    COUNT(CASE WHEN FINISH_DATE<=DUE_DATE THEN JOB_ID END) AS ON_TIME_JOBS,
+    COUNT(MATERIAL_DATE) AS LEAD_JOBS,
+    SUM(FINISH_DATE - MATERIAL_DATE) AS LEAD_TIME_SUM,
+    SUM(ORDER_QTY) AS ORDER_QTY_SUM,
+    SUM(YIELD_QTY) AS YIELD_QTY_SUM
+FROM
+    JOB
+WHERE
+    FINISH_DATE>=:t_start and FINISH_DATE<=:t_end
+GROUP BY
+    MACHINE_ID"""
+
+        db = current_db()
+        query = forward_only_query(db)
+
+        query.prepare(query_str)
+        query.bindValue(":t_start", t_start)
+        query.bindValue(":t_end", t_end)
+
+        ok = query.exec()
+
+        if not ok:
+            DpLog.log().error("Failed to query get machine job stats: %s", query.lastError().text())
+            return []
+        else:
+            num_jobs = query.size()
+            DpLog.log().debug("Found %i machine job stats rows", num_jobs)
+
+            stats = MachinePODIndex.for_machines(machines, lambda m: MachineJobStatsPOD(
+                mach_id=m.get_machine_id(),
+                mach_name=m.get_machine_name()
+            ))
+
+            columns = fetch_columns(query, (INT64,) * 10, use_numpy=False)
+            for mach_id_query, *sums in zip(*columns):
+                js = stats.get(mach_id_query)
+                if js is None:  # machine not in the list we were asked about
+                    continue
+                (js.jobs, js.run_jobs, js.run_time_sum, js.run_qty_sum, js.on_time_jobs,
+                 js.lead_jobs, js.lead_time_sum, js.order_qty_sum, js.yield_qty_sum) = sums
+            return stats.pods
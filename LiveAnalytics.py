@@ -0,0 +1,322 @@
+"""
+Incremental aggregation of the analytics over a live, sliding window.
+
+LiveAnalyticsAggregator keeps the MACHINE_STATUS rows of the window folded into per hour
+(machine, state) accumulators, and the window's MACHINE_ALARM rows by machine. Each poll only
+reads the rows past the highest STS_ID and ALARM_ID it has seen, plus the acknowledgement of
+the alarms still open, so its cost follows the new rows and not the size of the window. Hours
+leaving the window are subtracted from the running totals as a whole.
+
+The window is whole hours: the current hour and the window_hours before it. Its hours are local
+hours at the UTC offset, bucketed as AnalyticsDAO buckets them, so offsets of a fraction of an
+hour are exact too.
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from PyQt6.QtSql import QSqlQuery
+
+from src.dao import Alarm
+from src.dao.Analytics import MachinePODIndex, MachineStateSnapshotPOD, MachineAlarmDurationPOD, AlarmDurationPOD, \
+    MachineHourProfilePOD, GOOD_PROD_STATE, STATE_INDEX
+from src.dao.AnalyticsRollup import HOUR_SECONDS
+from src.dao.Machine import MachinePOD
+from src.dao.MachineStatus import MachineStateType
+from src.dao.QueryFetch import fetch_columns, forward_only_query, INT64, FLOAT64
+from src.dao.TimeBuckets import DAY_SECONDS, bucket_start_sql, utc_offset as plant_utc_offset
+from src.io import DpLog
+from src.io.ConnectionPool import current_db
+
+# Open alarms whose acknowledgement is checked per query
+OPEN_ALARMS_PER_QUERY = 1000
+
+
+class LiveUpdatePOD:
+    """
+    What changed in the live window since the previous poll.
+    contains the window, the state snapshot and the hour profiles of every machine if any status
+    sample was added or left the window (None / empty otherwise), and the alarm durations of each
+    machine whose alarms changed
+    """
+    def __init__(self, t_start: int, t_end: int):
+        self.t_start = t_start
+        self.t_end = t_end
+        self.snapshot: Optional[List[MachineStateSnapshotPOD]] = None
+        self.hour_profiles: Dict[str, MachineHourProfilePOD] = {}
+        self.alarm_durations: Dict[int, MachineAlarmDurationPOD] = {}
+
+    def is_empty(self) -> bool:
+        return self.snapshot is None and not self.alarm_durations
+
+
+class LiveAnalyticsAggregator:
+    """
+    Holds the accumulators of the live window and folds new rows into them on each poll
+    """
+    def __init__(self, window_hours: int = 24, utc_offset: Optional[int] = None):
+        """
+        :param window_hours: full hours kept before the current one
+        :param utc_offset: seconds east of UTC of the hour of day buckets, the plant's offset by default
+        """
+        self.window_hours = window_hours
+        self.utc_offset = utc_offset if utc_offset is not None else plant_utc_offset()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Forgets everything, the next poll reads the whole window again
+        """
+        with self._lock:
+            self._last_sts_id = -1
+            self._last_alarm_id = -1
+            # hour bucket -> (machine, state) -> [samples, prod sum, speed sum]
+            self._buckets: Dict[int, Dict[Tuple[int, int], List[float]]] = {}
+            self._totals: Dict[Tuple[int, int], List[float]] = {}
+            # machine -> alarm id -> [alarm code, alarm time, ack time or 0]
+            self._alarms: Dict[int, Dict[int, List[int]]] = {}
+            self._open_alarms: Dict[int, int] = {}  # alarm id -> machine
+
+    def poll(self, machines: List[MachinePOD]) -> Optional[LiveUpdatePOD]:
+        """
+        Folds in the rows added since the last poll, drops the hours that left the window,
+        and returns what changed. Runs on the calling thread's connection.
+        :param machines: list of all machines, for initializing the data
+        :return: the changes, None if the tables couldn't be read
+        """
+        with self._lock:
+            t_end = int(time.time())
+            t_start = t_end - (t_end + self.utc_offset) % HOUR_SECONDS - self.window_hours * HOUR_SECONDS
+            update = LiveUpdatePOD(t_start, t_end)
+
+            status_changed = self._expire_status(t_start)
+            folded = self._fold_status(t_start)
+            if folded is None:
+                return None
+            status_changed |= folded
+
+            changed_machines = self._expire_alarms(t_start)
+            folded_alarms = self._fold_alarms(t_start)
+            if folded_alarms is None:
+                return None
+            changed_machines |= folded_alarms
+
+            if status_changed:
+                update.snapshot = self._snapshot(machines)
+                update.hour_profiles = self._hour_profiles([m.get_machine_id() for m in machines])
+            for mach_id in changed_machines:
+                update.alarm_durations[mach_id] = self._alarm_durations(mach_id, t_end)
+            return update
+
+    @staticmethod
+    def _watermark(table: str, id_col: str) -> Optional[int]:
+        query = QSqlQuery(current_db())
+        if not query.exec("SELECT MAX(%s) FROM %s" % (id_col, table)) or not query.next():
+            DpLog.log().error("Failed to query the %s watermark: %s", table, query.lastError().text())
+            return None
+        return int(query.value(0) or 0)
+
+    def _expire_status(self, t_start: int) -> bool:
+        expired = [bucket for bucket in self._buckets if bucket < t_start]
+        for bucket in expired:
+            for key, acc in self._buckets.pop(bucket).items():
+                total = self._totals[key]
+                for i, v in enumerate(acc):
+                    total[i] -= v
+                if total[0] <= 0:
+                    del self._totals[key]
+        return bool(expired)
+
+    def _fold_status(self, t_start: int) -> Optional[bool]:
+        """
+        Adds the status rows past the last seen STS_ID, grouped per local hour by the database
+        :return: whether anything was added, None on failure
+        """
+        max_id = self._watermark("MACHINE_STATUS", "STS_ID")
+        if max_id is None:
+            return None
+        if max_id <= self._last_sts_id:
+            return False
+
+        # The first poll reads the window by time, later ones only the new ids
+        seed = self._last_sts_id < 0
+        query_str = """SELECT
+    MACHINE_ID,
+    %s AS HOUR_BUCKET,
+    CURRENT_STATE,
+    COUNT(STS_ID) AS SAMPLE_COUNT,
+    SUM(COUNT_PROD) AS PROD_SUM,
+    SUM(CURRENT_SPEED) AS SPEED_SUM
+FROM
+    MACHINE_STATUS
+WHERE
+    %s and STS_ID<=:to_id
+GROUP BY
+    MACHINE_ID,
+    HOUR_BUCKET,
+    CURRENT_STATE""" % (bucket_start_sql("STS_TIME", HOUR_SECONDS, self.utc_offset),
+                        "STS_TIME>=:t_start" if seed else "STS_ID>:from_id")
+
+        query = forward_only_query(current_db())
+        query.prepare(query_str)
+        if seed:
+            query.bindValue(":t_start", t_start)
+        else:
+            query.bindValue(":from_id", self._last_sts_id)
+        query.bindValue(":to_id", max_id)
+        if not query.exec():
+            DpLog.log().error("Failed to query the live machine status: %s", query.lastError().text())
+            return None
+
+        changed = False
+        columns = fetch_columns(query, (INT64, INT64, INT64, INT64, FLOAT64, FLOAT64), use_numpy=False)
+        for mach_id, bucket, state, samples, prod_sum, speed_sum in zip(*columns):
+            if bucket < t_start:  # late row for an hour that already left the window
+                continue
+            key = (mach_id, state)
+            acc = self._buckets.setdefault(bucket, {}).setdefault(key, [0.0, 0.0, 0.0])
+            total = self._totals.setdefault(key, [0.0, 0.0, 0.0])
+            for a in (acc, total):
+                a[0] += samples
+                a[1] += prod_sum
+                a[2] += speed_sum
+            changed = True
+        self._last_sts_id = max_id
+        return changed
+
+    def _expire_alarms(self, t_start: int) -> Set[int]:
+        changed = set()
+        for mach_id, alarms in self._alarms.items():
+            expired = [alarm_id for alarm_id, (_, alarm_time, _) in alarms.items() if alarm_time < t_start]
+            for alarm_id in expired:
+                del alarms[alarm_id]
+                self._open_alarms.pop(alarm_id, None)
+            if expired:
+                changed.add(mach_id)
+        return changed
+
+    def _fold_alarms(self, t_start: int) -> Optional[Set[int]]:
+        """
+        Adds the alarms past the last seen ALARM_ID, and the acknowledgements of the open ones
+        :return: the machines whose alarms changed, None on failure
+        """
+        changed = set()
+        max_id = self._watermark("MACHINE_ALARM", "ALARM_ID")
+        if max_id is None:
+            return None
+
+        if max_id > self._last_alarm_id:
+            seed = self._last_alarm_id < 0
+            query_str = """SELECT
+    ALARM_ID,
+    MACHINE_ID,
+    ALARM_CODE,
+    ALARM_TIME,
+    ACK_TIME
+FROM
+    MACHINE_ALARM
+WHERE
+    %s and ALARM_ID<=:to_id""" % ("ALARM_TIME>=:t_start" if seed else "ALARM_ID>:from_id")
+
+            query = forward_only_query(current_db())
+            query.prepare(query_str)
+            if seed:
+                query.bindValue(":t_start", t_start)
+            else:
+                query.bindValue(":from_id", self._last_alarm_id)
+            query.bindValue(":to_id", max_id)
+            if not query.exec():
+                DpLog.log().error("Failed to query the live machine alarms: %s", query.lastError().text())
+                return None
+
+            columns = fetch_columns(query, (INT64, INT64, INT64, INT64, INT64), use_numpy=False)
+            for alarm_id, mach_id, alarm_code, alarm_time, ack_time in zip(*columns):
+                if alarm_time < t_start:
+                    continue
+                self._alarms.setdefault(mach_id, {})[alarm_id] = [alarm_code, alarm_time, ack_time]
+                if not ack_time:
+                    self._open_alarms[alarm_id] = mach_id
+                changed.add(mach_id)
+            self._last_alarm_id = max_id
+
+        # Acknowledging updates the row in place, so open alarms are looked up by id
+        open_ids = list(self._open_alarms)
+        for i in range(0, len(open_ids), OPEN_ALARMS_PER_QUERY):
+            ids = open_ids[i:i + OPEN_ALARMS_PER_QUERY]
+            query = forward_only_query(current_db())
+            if not query.exec("SELECT ALARM_ID, ACK_TIME FROM MACHINE_ALARM WHERE ACK_TIME IS NOT NULL and ALARM_ID IN (%s)"
+                              % ",".join(str(int(alarm_id)) for alarm_id in ids)):
+                DpLog.log().error("Failed to query the live alarm acknowledgements: %s", query.lastError().text())
+                return None
+            for alarm_id, ack_time in zip(*fetch_columns(query, (INT64, INT64), use_numpy=False)):
+                mach_id = self._open_alarms.pop(alarm_id)
+                self._alarms[mach_id][alarm_id][2] = ack_time
+                changed.add(mach_id)
+        return changed
+
+    def _snapshot(self, machines: List[MachinePOD]) -> List[MachineStateSnapshotPOD]:
+        snapshot = MachinePODIndex.for_machines(machines, lambda m: MachineStateSnapshotPOD(
+            mach_id=m.get_machine_id(),
+            mach_name=m.get_machine_name()
+        ))
+        for (mach_id, state), (samples, prod_sum, speed_sum) in self._totals.items():
+            ss = snapshot.get(mach_id)
+            if ss is None:  # machine not in the list we were asked about
+                continue
+            i = STATE_INDEX[MachineStateType(state)]
+            ss.samples[i] = int(samples)
+            ss.prod_sum[i] = prod_sum
+            ss.speed_sum[i] = speed_sum
+        return snapshot.pods
+
+    def _hour_profiles(self, mach_ids: List[int]) -> Dict[str, MachineHourProfilePOD]:
+        """
+        The four hour of day profiles, as AnalyticsDAO computes them, from the hour accumulators
+        """
+        # (machine, hour of day) -> [samples, prod sum, speed sum, good prod sum], and the dates seen
+        groups: Dict[Tuple[int, int], List[float]] = {}
+        dates: Dict[Tuple[int, int], Set[int]] = {}
+        running_dates: Dict[Tuple[int, int], Set[int]] = {}
+        for bucket, accs in self._buckets.items():
+            hour = (bucket + self.utc_offset) // HOUR_SECONDS % 24
+            date = (bucket + self.utc_offset) // DAY_SECONDS
+            for (mach_id, state), (samples, prod_sum, speed_sum) in accs.items():
+                key = (mach_id, hour)
+                acc = groups.setdefault(key, [0.0, 0.0, 0.0, 0.0])
+                acc[0] += samples
+                acc[1] += prod_sum
+                acc[2] += speed_sum
+                dates.setdefault(key, set()).add(date)
+                if state == GOOD_PROD_STATE:
+                    acc[3] += prod_sum
+                    running_dates.setdefault(key, set()).add(date)
+
+        profiles = {key: MachineHourProfilePOD(mach_ids)
+                    for key in ("avgspeed_hour", "avgprod_hour", "goodbadratio_hour", "uptime_hour")}
+        for (mach_id, hour), (samples, prod_sum, speed_sum, good_sum) in groups.items():
+            bad_sum = prod_sum - good_sum
+            day_span = max(dates[(mach_id, hour)]) - min(dates[(mach_id, hour)])
+            profiles["avgspeed_hour"].set(mach_id, hour, speed_sum / samples * 100.0)
+            profiles["avgprod_hour"].set(mach_id, hour, prod_sum / samples * 100.0)
+            profiles["goodbadratio_hour"].set(mach_id, hour, good_sum / bad_sum * 100.0 if bad_sum else 0.0)
+            profiles["uptime_hour"].set(mach_id, hour, len(running_dates.get((mach_id, hour), ())) / day_span * 100.0
+                                        if day_span else 0.0)
+        return profiles
+
+    def _alarm_durations(self, mach_id: int, t_end: int) -> MachineAlarmDurationPOD:
+        # alarm code -> [count, cleared, clear sum, clear max]
+        codes: Dict[int, List[int]] = {}
+        for alarm_code, alarm_time, ack_time in self._alarms.get(mach_id, {}).values():
+            acc = codes.setdefault(alarm_code, [0, 0, 0, 0])
+            acc[0] += 1
+            if ack_time and ack_time <= t_end:
+                clear_time = ack_time - alarm_time
+                acc[1] += 1
+                acc[2] += clear_time
+                acc[3] = max(acc[3], clear_time)
+
+        m = MachineAlarmDurationPOD(mach_id)
+        for alarm_code in sorted(codes):
+            m.alarm_durations[Alarm.alarm_types.get(alarm_code)] = AlarmDurationPOD(*codes[alarm_code])
+        return m
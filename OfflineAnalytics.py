@@ -0,0 +1,659 @@
+"""
+Offline analytics over file exports of the plant database.
+
+MACHINE_STATUS, MACHINE_ALARM, ALARM_TYPE and JOB exports, and MACHINE exports naming the
+machines (CSV, or XLSX when openpyxl is installed), are loaded into columnar in-memory tables, and OfflineAnalyticsDAO computes every
+AnalyticsDAO result from them with group-bys over whole columns, returning the same POD types.
+The group-bys are vectorized with NumPy when it is installed, and single pass pure Python
+otherwise. Empty cells read as 0, except ACK_TIME, where they mean never acknowledged, so a JOB
+date of 0 means the date isn't set.
+"""
+import csv
+import os
+import threading
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.dao import Smoothing
+from src.dao.Alarm import AlarmTypePOD
+from src.dao.Analytics import MachinePODIndex, MachineStateSnapshotPOD, MachineStateDistributionPOD, \
+    MachineGoodbadDistributionPOD, MachineStateavgprodDistributionPOD, MachineStateavgspeedDistributionPOD, \
+    MachineAlarmDurationPOD, AlarmDurationPOD, MachineAlarmCountPOD, MachineAlarmCleartimePOD, \
+    MachineAlarmAvgclearPOD, MachineAvgspeedTimePOD, MachineAvgprodTimePOD, MachineHourProfilePOD, \
+    MachineAvgspeedHourPOD, MachineAvgprodHourPOD, MachineGoodbadratioHourPOD, MachineUptimeHourPOD, \
+    GOOD_PROD_STATE, STATE_INDEX, time_bucket
+from src.dao.AnalyticsRollup import HOUR_SECONDS
+from src.dao.JobAnalytics import MachineJobStatsPOD
+from src.dao.Machine import MachinePOD
+from src.dao.MachineStatus import MachineStateType
+from src.dao.QueryFetch import INT64, FLOAT64, TEXT
+from src.dao.TimeBuckets import DAY_SECONDS, bucket_offset, utc_offset as plant_utc_offset
+from src.io import DpLog
+
+try:
+    import numpy as np
+except ImportError:  # optional, everything here also works without it
+    np = None
+
+try:
+    import openpyxl
+except ImportError:  # optional, only needed for .xlsx exports
+    openpyxl = None
+
+# ACK_TIME of an alarm that was never acknowledged, later than the end of any range
+NEVER_ACKED = 2 ** 62
+
+# Columns read from each export, the other columns of a file are ignored
+TABLE_SCHEMAS: Dict[str, Dict[str, str]] = {
+    "MACHINE_STATUS": {"MACHINE_ID": INT64, "STS_TIME": INT64, "CURRENT_STATE": INT64,
+                       "COUNT_PROD": INT64, "CURRENT_SPEED": FLOAT64},
+    "MACHINE_ALARM": {"ALARM_ID": INT64, "ALARM_CODE": INT64, "MACHINE_ID": INT64, "ACTIVE_JOB": INT64,
+                      "ALARM_TIME": INT64, "ACK_TIME": INT64},
+    "ALARM_TYPE": {"AT_ID": INT64, "ALARM_DESC": TEXT},
+    "JOB": {"JOB_ID": INT64, "MACHINE_ID": INT64, "JOB_DESC": TEXT, "DUE_DATE": INT64, "CUSTOMER": INT64,
+            "GLOBE_JOB_NUM": TEXT, "FINISH_DATE": INT64, "YIELD_QTY": INT64, "ORDER_QTY": INT64,
+            "START_DATE": INT64, "MATERIAL_DATE": INT64},
+    "MACHINE": {"MACHINE_ID": INT64, "MACHINE_NAME": TEXT},
+}
+_NULLS = {INT64: 0, FLOAT64: 0.0, TEXT: ""}
+_COLUMN_NULLS = {("MACHINE_ALARM", "ACK_TIME"): NEVER_ACKED}
+
+# Strides of composite group keys, key = a * stride + b with 0 <= b < stride
+STATE_STRIDE = 1 << 8
+DAY_STRIDE = 1 << 24
+
+
+def _to_int(value: Any) -> int:
+    if isinstance(value, int):
+        return value
+    f = float(value)
+    if not f.is_integer():
+        raise ValueError("%r is not an integer" % (value,))
+    return int(f)
+
+
+# Converts a non empty cell to the column type, raising ValueError if it isn't one
+CELL_CONVERTERS = {INT64: _to_int, FLOAT64: float, TEXT: str}
+
+
+class ColumnTable:
+    """
+    An in-memory table with one typed column per field: NumPy arrays when NumPy is installed,
+    array('q') / array('d') otherwise, and lists for text
+    """
+    def __init__(self, name: str, columns: Dict[str, Any]):
+        self.name = name
+        self.columns = columns
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, column: str) -> Any:
+        return self.columns[column]
+
+
+def _read_rows(path: str) -> Iterator[Sequence[Any]]:
+    """
+    The rows of a CSV file, or of the first sheet of an XLSX file, header first
+    """
+    if os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm"):
+        if openpyxl is None:
+            raise ImportError("openpyxl is needed to read %s" % path)
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            yield from workbook.worksheets[0].iter_rows(values_only=True)
+        finally:
+            workbook.close()
+    else:
+        with open(path, newline="") as f:
+            yield from csv.reader(f)
+
+
+def _detect_table(header: List[str], path: str) -> str:
+    matches = [name for name, schema in TABLE_SCHEMAS.items() if all(c in header for c in schema)]
+    if not matches:
+        raise ValueError("%s has the columns of none of %s" % (path, ", ".join(TABLE_SCHEMAS)))
+    return max(matches, key=lambda name: len(TABLE_SCHEMAS[name]))
+
+
+def open_export(path: str, table: Optional[str] = None) -> Tuple[str, List[int], Iterator[Sequence[Any]]]:
+    """
+    Opens an export and checks its header against the table schema
+    :param path: a .csv or .xlsx file with a header row of column names
+    :param table: the table the file holds, None to tell it from the header
+    :return: the table, the position in a row of each schema column, and the remaining rows
+    """
+    rows = _read_rows(path)
+    header = [str(h).strip().upper() if h is not None else "" for h in next(rows, [])]
+    if table is None:
+        table = _detect_table(header, path)
+    schema = TABLE_SCHEMAS[table]
+    missing = [c for c in schema if c not in header]
+    if missing:
+        raise ValueError("%s is missing the %s columns %s" % (path, table, ", ".join(missing)))
+    return table, [header.index(c) for c in schema], rows
+
+
+def load_table(path: str, table: Optional[str] = None) -> ColumnTable:
+    """
+    Reads an export into a ColumnTable
+    :param path: a .csv or .xlsx file with a header row of column names
+    :param table: the table the file holds, None to tell it from the header
+    :return: the table
+    """
+    table, positions, rows = open_export(path, table)
+    schema = TABLE_SCHEMAS[table]
+
+    columns = {c: [] if dtype == TEXT else array(dtype) for c, dtype in schema.items()}
+    cells = [(i, columns[c].append, CELL_CONVERTERS[dtype], _COLUMN_NULLS.get((table, c), _NULLS[dtype]))
+             for i, (c, dtype) in zip(positions, schema.items())]
+    for row in rows:
+        if all(v is None or v == "" for v in row):
+            continue
+        for i, append, convert, null in cells:
+            value = row[i] if i < len(row) else None
+            append(null if value is None or value == "" else convert(value))
+
+    if np is not None:
+        columns = {c: _as_numpy(column, schema[c]) for c, column in columns.items()}
+    DpLog.log().debug("Loaded %i %s rows from %s", len(next(iter(columns.values()))), table, path)
+    return ColumnTable(table, columns)
+
+
+def _as_numpy(column: Any, dtype: str) -> Any:
+    if dtype == TEXT:
+        return column
+    np_dtype = np.int64 if dtype == INT64 else np.float64
+    if not column:
+        return np.empty(0, dtype=np_dtype)
+    return np.frombuffer(column, dtype=np_dtype)
+
+
+# Column kernels, each with a NumPy and a pure Python path
+
+def _range_index(times: Any, t_start: int, t_end: int, ids: Any = None, mach_ids: Optional[List[int]] = None) -> Any:
+    """
+    Positions of the rows with t_start <= time <= t_end, and MACHINE_ID in mach_ids if given
+    """
+    if np is not None:
+        mask = (times >= t_start) & (times <= t_end)
+        if mach_ids is not None:
+            mask &= np.isin(ids, np.asarray(mach_ids, dtype=np.int64))
+        return np.flatnonzero(mask)
+    if mach_ids is None:
+        return [i for i, t in enumerate(times) if t_start <= t <= t_end]
+    wanted = set(mach_ids)
+    return [i for i, t in enumerate(times) if t_start <= t <= t_end and ids[i] in wanted]
+
+
+def _take(column: Any, index: Any) -> Any:
+    if np is not None:
+        return column[index]
+    return [column[i] for i in index]
+
+
+def _combine(a: Any, b: Any, stride: int) -> Any:
+    if np is not None:
+        return a * stride + b
+    return [x * stride + y for x, y in zip(a, b)]
+
+
+def _floor(times: Any, offset: int, unit: int, modulo: Optional[int] = None) -> Any:
+    """
+    (time + offset) // unit, then % modulo if given
+    """
+    if np is not None:
+        values = (times + offset) // unit
+        return values % modulo if modulo is not None else values
+    if modulo is None:
+        return [(t + offset) // unit for t in times]
+    return [(t + offset) // unit % modulo for t in times]
+
+
+def _truncate(times: Any, unit: int, offset: int) -> Any:
+    """
+    time - (time + offset) % unit, the start of the local unit of each time as in TimeBuckets.bucket_start_sql
+    """
+    offset = bucket_offset(unit, offset)
+    if np is not None:
+        return times - (times + offset) % unit
+    return [t - (t + offset) % unit for t in times]
+
+
+def _equals(column: Any, value: int) -> Any:
+    """
+    1.0 where column == value, 0.0 elsewhere
+    """
+    if np is not None:
+        return (column == value).astype(np.float64)
+    return [1.0 if x == value else 0.0 for x in column]
+
+
+def _at_most(column: Any, value: int) -> Any:
+    """
+    1.0 where column <= value, 0.0 elsewhere
+    """
+    if np is not None:
+        return (column <= value).astype(np.float64)
+    return [1.0 if x <= value else 0.0 for x in column]
+
+
+def _above(column: Any, value: int) -> Any:
+    """
+    1.0 where column > value, 0.0 elsewhere
+    """
+    if np is not None:
+        return (column > value).astype(np.float64)
+    return [1.0 if x > value else 0.0 for x in column]
+
+
+def _product(a: Any, b: Any) -> Any:
+    if np is not None:
+        return a * b
+    return [x * y for x, y in zip(a, b)]
+
+
+def _difference(a: Any, b: Any) -> Any:
+    if np is not None:
+        return a - b
+    return [x - y for x, y in zip(a, b)]
+
+
+def _nonzero(column: Any) -> Any:
+    if np is not None:
+        return np.flatnonzero(column)
+    return [i for i, x in enumerate(column) if x]
+
+
+def _group_sum(keys: Any, *values: Any) -> Tuple[List[int], List[int], List[List[float]]]:
+    """
+    Groups rows by key
+    :return: the keys in ascending order, the row count of each, and the sum of each values column per key
+    """
+    if np is not None:
+        uniq, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(uniq))
+        sums = [np.bincount(inverse, weights=v, minlength=len(uniq)) for v in values]
+        return uniq.tolist(), counts.tolist(), [s.tolist() for s in sums]
+
+    groups: Dict[int, List[float]] = {}
+    for i, key in enumerate(keys):
+        acc = groups.get(key)
+        if acc is None:
+            acc = groups[key] = [0] + [0.0] * len(values)
+        acc[0] += 1
+        for j, v in enumerate(values, start=1):
+            acc[j] += v[i]
+    uniq = sorted(groups)
+    return uniq, [groups[k][0] for k in uniq], [[groups[k][j] for k in uniq] for j in range(1, len(values) + 1)]
+
+
+def _group_extrema(keys: Any, values: Any) -> Tuple[List[int], List[float], List[float]]:
+    """
+    Groups rows by key
+    :return: the keys in ascending order, and the min and the max of values per key
+    """
+    if np is not None:
+        uniq, inverse = np.unique(keys, return_inverse=True)
+        lows = np.full(len(uniq), np.inf)
+        highs = np.full(len(uniq), -np.inf)
+        np.minimum.at(lows, inverse, values)
+        np.maximum.at(highs, inverse, values)
+        return uniq.tolist(), lows.tolist(), highs.tolist()
+
+    groups: Dict[int, List[float]] = {}
+    for key, v in zip(keys, values):
+        acc = groups.get(key)
+        if acc is None:
+            groups[key] = [v, v]
+        elif v < acc[0]:
+            acc[0] = v
+        elif v > acc[1]:
+            acc[1] = v
+    uniq = sorted(groups)
+    return uniq, [groups[k][0] for k in uniq], [groups[k][1] for k in uniq]
+
+
+def _unique(keys: Any) -> List[int]:
+    if np is not None:
+        return np.unique(keys).tolist()
+    return sorted(set(keys))
+
+
+class OfflineAnalyticsDAO:
+    """
+    AnalyticsDAO over exported tables instead of the database. Every query method of AnalyticsDAO
+    and JobAnalyticsDAO is here, with the same arguments and result types, so they can be used
+    interchangeably.
+    A method whose table wasn't loaded fails like its query would, returning None or [].
+
+    Hour of day, date and time series buckets are taken at utc_offset seconds east of UTC, as
+    AnalyticsDAO takes them at the plant's offset of TimeBuckets.
+    """
+    def __init__(self, tables: Dict[str, ColumnTable], utc_offset: Optional[int] = None):
+        """
+        :param tables: the loaded tables, by table name
+        :param utc_offset: seconds east of UTC of the buckets, the plant's offset by default
+        """
+        self.tables = tables
+        self.utc_offset = utc_offset if utc_offset is not None else plant_utc_offset()
+        self._alarm_types: Dict[int, AlarmTypePOD] = {}
+        if "ALARM_TYPE" in tables:
+            at = tables["ALARM_TYPE"]
+            for at_id, alarm_desc in zip(at["AT_ID"], at["ALARM_DESC"]):
+                self._alarm_types[int(at_id)] = AlarmTypePOD(int(at_id), alarm_desc)
+        # The four fleet distributions of a load share one snapshot
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_key: Optional[Tuple] = None
+        self._snapshot: List[MachineStateSnapshotPOD] = []
+
+    @staticmethod
+    def from_files(paths: Iterable[str]) -> "OfflineAnalyticsDAO":
+        """
+        Loads a set of exports, telling the table of each file from its header
+        :param paths: .csv or .xlsx exports, e.g. job.csv and alarm.xlsx
+        :return: the engine over the loaded tables
+        """
+        tables = {}
+        for path in paths:
+            table = load_table(path)
+            tables[table.name] = table
+        return OfflineAnalyticsDAO(tables)
+
+    def _table(self, name: str) -> Optional[ColumnTable]:
+        table = self.tables.get(name)
+        if table is None:
+            DpLog.log().error("No %s export loaded for offline analytics", name)
+        return table
+
+    def _alarm_type(self, at_id: int) -> AlarmTypePOD:
+        alarm_type = self._alarm_types.get(at_id)
+        if alarm_type is None:  # same fallback as the alarm type registry
+            alarm_type = self._alarm_types[at_id] = AlarmTypePOD(at_id, str(at_id))
+        return alarm_type
+
+# Frequency Analysis
+    # state distribution
+    def get_machines_state_snapshot(self, t_start: int, t_end: int, machines: List[MachinePOD]) -> List[MachineStateSnapshotPOD]:
+        """
+        The per state sample count, production sum and speed sum of each machine on a certain time range
+        """
+        key = (t_start, t_end, tuple((m.get_machine_id(), m.get_machine_name()) for m in machines))
+        with self._snapshot_lock:
+            if key == self._snapshot_key:
+                return self._snapshot
+
+        st = self._table("MACHINE_STATUS")
+        if st is None:
+            return []
+        index = _range_index(st["STS_TIME"], t_start, t_end)
+        keys = _combine(_take(st["MACHINE_ID"], index), _take(st["CURRENT_STATE"], index), STATE_STRIDE)
+        uniq, counts, (prod_sums, speed_sums) = _group_sum(keys, _take(st["COUNT_PROD"], index),
+                                                           _take(st["CURRENT_SPEED"], index))
+
+        snapshot = MachinePODIndex.for_machines(machines, lambda m: MachineStateSnapshotPOD(
+            mach_id=m.get_machine_id(),
+            mach_name=m.get_machine_name()
+        ))
+        for group, samples, prod_sum, speed_sum in zip(uniq, counts, prod_sums, speed_sums):
+            mach_id, state = divmod(group, STATE_STRIDE)
+            ss = snapshot.get(mach_id)
+            if ss is None:  # machine not in the list we were asked about
+                continue
+            i = STATE_INDEX[MachineStateType(state)]
+            ss.samples[i] = samples
+            ss.prod_sum[i] = prod_sum
+            ss.speed_sum[i] = speed_sum
+
+        with self._snapshot_lock:
+            self._snapshot_key = key
+            self._snapshot = snapshot.pods
+        return snapshot.pods
+
+    def get_machines_state_distribution(self, t_start: int, t_end: int, machines: List[MachinePOD]) -> List[MachineStateDistributionPOD]:
+        snapshot = MachinePODIndex(self.get_machines_state_snapshot(t_start, t_end, machines))
+        return snapshot.project(machines, MachineStateSnapshotPOD.to_state_distribution)
+
+    def get_machines_goodbad_distribution(self, t_start: int, t_end: int, machines: List[MachinePOD]) -> List[MachineGoodbadDistributionPOD]:
+        snapshot = MachinePODIndex(self.get_machines_state_snapshot(t_start, t_end, machines))
+        return snapshot.project(machines, MachineStateSnapshotPOD.to_goodbad_distribution)
+
+    def get_machines_stateavgprod_distribution(self, t_start: int, t_end: int, machines: List[MachinePOD]) -> List[MachineStateavgprodDistributionPOD]:
+        snapshot = MachinePODIndex(self.get_machines_state_snapshot(t_start, t_end, machines))
+        return snapshot.project(machines, MachineStateSnapshotPOD.to_stateavgprod_distribution)
+
+    def get_machines_stateavgspeed_distribution(self, t_start: int, t_end: int, machines: List[MachinePOD]) -> List[MachineStateavgspeedDistributionPOD]:
+        snapshot = MachinePODIndex(self.get_machines_state_snapshot(t_start, t_end, machines))
+        return snapshot.project(machines, MachineStateSnapshotPOD.to_stateavgspeed_distribution)
+
+    # alarm
+    def get_machine_alarm_durations(self, t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> MachineAlarmDurationPOD:
+        """
+        The count, and the sum, mean and max clear time of each type of alarm of a machine, for the
+        alarms raised on a certain time range. Only alarms acknowledged by the end of the range are cleared.
+        """
+        al = self._table("MACHINE_ALARM")
+        if al is None:
+            return None
+        index = _range_index(al["ALARM_TIME"], t_start, t_end, al["MACHINE_ID"], [mach_id])
+        codes = _take(al["ALARM_CODE"], index)
+        ack_times = _take(al["ACK_TIME"], index)
+        cleared = _at_most(ack_times, t_end)
+        clear_times = _product(_difference(ack_times, _take(al["ALARM_TIME"], index)), cleared)
+
+        uniq, counts, (cleared_counts, clear_sums) = _group_sum(codes, cleared, clear_times)
+        _, _, clear_maxes = _group_extrema(codes, clear_times)
+
+        m = MachineAlarmDurationPOD(mach_id)
+        for code, count, cleared_count, clear_sum, clear_max in zip(uniq, counts, cleared_counts, clear_sums, clear_maxes):
+            m.alarm_durations[self._alarm_type(code)] = AlarmDurationPOD(count, int(cleared_count), int(clear_sum),
+                                                                         int(clear_max))
+        return m
+
+    def get_machine_alarm_count(self, t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> MachineAlarmCountPOD:
+        durations = self.get_machine_alarm_durations(t_start, t_end, mach_id, machines)
+        return durations.to_alarm_count() if durations is not None else None
+
+    def get_machine_alarm_cleartime(self, t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> MachineAlarmCleartimePOD:
+        durations = self.get_machine_alarm_durations(t_start, t_end, mach_id, machines)
+        return durations.to_alarm_cleartime() if durations is not None else None
+
+    def get_machine_alarm_avgclear(self, t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> MachineAlarmAvgclearPOD:
+        durations = self.get_machine_alarm_durations(t_start, t_end, mach_id, machines)
+        return durations.to_alarm_avgclear() if durations is not None else None
+
+# Time Series Analysis
+    # time
+    def _machine_buckets(self, t_start: int, t_end: int, mach_id: int, bucket: int) -> Optional[Tuple[Any, Any]]:
+        """
+        The status rows of a machine on a range, and the local time bucket of each
+        """
+        st = self._table("MACHINE_STATUS")
+        if st is None:
+            return None
+        index = _range_index(st["STS_TIME"], t_start, t_end, st["MACHINE_ID"], [mach_id])
+        buckets = _truncate(_take(st["STS_TIME"], index), bucket, self.utc_offset)
+        return index, buckets
+
+    def get_machine_avgspeed_time(self, t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD],
+                                  window_buckets: float = 1.0, bucket: Optional[int] = None) -> MachineAvgspeedTimePOD:
+        """
+        The average speed series of a machine while it produced good parts, smoothed like AnalyticsDAO's
+        """
+        bucket = int(bucket) if bucket else time_bucket(t_start, t_end)
+        rows = self._machine_buckets(t_start, t_end, mach_id, bucket)
+        if rows is None:
+            return None
+        index, hours = rows
+        st = self.tables["MACHINE_STATUS"]
+        running = _equals(_take(st["CURRENT_STATE"], index), GOOD_PROD_STATE)
+        uniq, _, (run_counts, speed_sums) = _group_sum(hours, running,
+                                                       _product(_take(st["CURRENT_SPEED"], index), running))
+
+        series = [(hour, speed_sum / run_count) for hour, run_count, speed_sum in zip(uniq, run_counts, speed_sums)
+                  if run_count > 0]
+        hours = array('q', (hour for hour, _ in series))
+        filtered_speed = Smoothing.rolling_mean(hours, [speed for _, speed in series], window_buckets * bucket)
+        return MachineAvgspeedTimePOD(mach_id,
+                                      "",
+                                      hours,
+                                      array('d', (int(v) for v in filtered_speed)))
+
+    def get_machine_avgprod_time(self, t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD],
+                                 window_buckets: float = 1.0, bucket: Optional[int] = None) -> MachineAvgprodTimePOD:
+        """
+        The average prod series of a machine, smoothed like AnalyticsDAO's
+        """
+        bucket = int(bucket) if bucket else time_bucket(t_start, t_end)
+        rows = self._machine_buckets(t_start, t_end, mach_id, bucket)
+        if rows is None:
+            return None
+        index, hours = rows
+        uniq, counts, (prod_sums,) = _group_sum(hours, _take(self.tables["MACHINE_STATUS"]["COUNT_PROD"], index))
+
+        hours = array('q', uniq)
+        prods = [360 * prod_sum / count for count, prod_sum in zip(counts, prod_sums)]
+        filtered_prod = Smoothing.rolling_mean(hours, prods, window_buckets * bucket)
+        return MachineAvgprodTimePOD(mach_id,
+                                     "",
+                                     hours,
+                                     array('d', (int(v) for v in filtered_prod)))
+
+    # hour
+    def _hour_of_day_rows(self, t_start: int, t_end: int, mach_ids: List[int]) -> Optional[Tuple[Any, Any]]:
+        """
+        The status rows of a set of machines on a range, and their (machine, hour of day) group keys
+        """
+        st = self._table("MACHINE_STATUS")
+        if st is None:
+            return None
+        index = _range_index(st["STS_TIME"], t_start, t_end, st["MACHINE_ID"], mach_ids)
+        keys = _combine(_take(st["MACHINE_ID"], index),
+                        _floor(_take(st["STS_TIME"], index), self.utc_offset, HOUR_SECONDS, 24), 24)
+        return index, keys
+
+    def get_machines_avgspeed_hour(self, t_start: int, t_end: int, mach_ids: List[int]) -> Optional[MachineHourProfilePOD]:
+        mach_ids = list(dict.fromkeys(mach_ids))
+        rows = self._hour_of_day_rows(t_start, t_end, mach_ids)
+        if rows is None:
+            return None
+        index, keys = rows
+        uniq, counts, (speed_sums,) = _group_sum(keys, _take(self.tables["MACHINE_STATUS"]["CURRENT_SPEED"], index))
+        return self._hour_profile(mach_ids, uniq, [s / c for c, s in zip(counts, speed_sums)])
+
+    def get_machines_avgprod_hour(self, t_start: int, t_end: int, mach_ids: List[int]) -> Optional[MachineHourProfilePOD]:
+        mach_ids = list(dict.fromkeys(mach_ids))
+        rows = self._hour_of_day_rows(t_start, t_end, mach_ids)
+        if rows is None:
+            return None
+        index, keys = rows
+        uniq, counts, (prod_sums,) = _group_sum(keys, _take(self.tables["MACHINE_STATUS"]["COUNT_PROD"], index))
+        return self._hour_profile(mach_ids, uniq, [p / c for c, p in zip(counts, prod_sums)])
+
+    def get_machines_goodbadratio_hour(self, t_start: int, t_end: int, mach_ids: List[int]) -> Optional[MachineHourProfilePOD]:
+        mach_ids = list(dict.fromkeys(mach_ids))
+        rows = self._hour_of_day_rows(t_start, t_end, mach_ids)
+        if rows is None:
+            return None
+        index, keys = rows
+        st = self.tables["MACHINE_STATUS"]
+        prods = _take(st["COUNT_PROD"], index)
+        good = _product(prods, _equals(_take(st["CURRENT_STATE"], index), GOOD_PROD_STATE))
+        uniq, _, (good_sums, prod_sums) = _group_sum(keys, good, prods)
+        # like IFNULL(good / bad, 0), a division by zero in SQL is NULL
+        ratios = [g / (p - g) if p != g else 0.0 for g, p in zip(good_sums, prod_sums)]
+        return self._hour_profile(mach_ids, uniq, ratios)
+
+    def get_machines_uptime_hour(self, t_start: int, t_end: int, mach_ids: List[int]) -> Optional[MachineHourProfilePOD]:
+        mach_ids = list(dict.fromkeys(mach_ids))
+        rows = self._hour_of_day_rows(t_start, t_end, mach_ids)
+        if rows is None:
+            return None
+        index, keys = rows
+        st = self.tables["MACHINE_STATUS"]
+        days = _floor(_take(st["STS_TIME"], index), self.utc_offset, DAY_SECONDS)
+        running = _nonzero(_equals(_take(st["CURRENT_STATE"], index), GOOD_PROD_STATE))
+
+        # distinct days with good production, over the days between the first and last sample
+        running_days = _unique(_take(_combine(keys, days, DAY_STRIDE), running))
+        up_days: Dict[int, int] = {}
+        for key_day in running_days:
+            key = key_day // DAY_STRIDE
+            up_days[key] = up_days.get(key, 0) + 1
+        uniq, first_days, last_days = _group_extrema(keys, days)
+        uptimes = [up_days.get(key, 0) / (last - first) if last > first else 0.0
+                   for key, first, last in zip(uniq, first_days, last_days)]
+        return self._hour_profile(mach_ids, uniq, uptimes)
+
+    @staticmethod
+    def _hour_profile(mach_ids: List[int], keys: List[int], values: List[float]) -> MachineHourProfilePOD:
+        """
+        A profile with the values of the (machine, hour of day) keys, scaled to a percentage as AnalyticsDAO does
+        """
+        profile = MachineHourProfilePOD(mach_ids)
+        for key, value in zip(keys, values):
+            mach_id, hour = divmod(key, 24)
+            profile.set(mach_id, hour, value*100.0)
+        return profile
+
+    def get_machine_avgspeed_hour(self, t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> MachineAvgspeedHourPOD:
+        profile = self.get_machines_avgspeed_hour(t_start, t_end, [mach_id])
+        if profile is None:
+            return None
+        return MachineAvgspeedHourPOD(mach_id, profile.row(mach_id))
+
+    def get_machine_avgprod_hour(self, t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> MachineAvgprodHourPOD:
+        profile = self.get_machines_avgprod_hour(t_start, t_end, [mach_id])
+        if profile is None:
+            return None
+        return MachineAvgprodHourPOD(mach_id, profile.row(mach_id))
+
+    def get_machine_goodbadratio_hour(self, t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> MachineGoodbadratioHourPOD:
+        profile = self.get_machines_goodbadratio_hour(t_start, t_end, [mach_id])
+        if profile is None:
+            return None
+        return MachineGoodbadratioHourPOD(mach_id, profile.row(mach_id))
+
+    def get_machine_uptime_hour(self, t_start: int, t_end: int, mach_id: int, machines: List[MachinePOD]) -> MachineUptimeHourPOD:
+        profile = self.get_machines_uptime_hour(t_start, t_end, [mach_id])
+        if profile is None:
+            return None
+        return MachineUptimeHourPOD(mach_id, profile.row(mach_id))
+
+# Job Analysis
+    def get_machines_job_stats(self, t_start: int, t_end: int, machines: List[MachinePOD]) -> List[MachineJobStatsPOD]:
+        """
+        The job statistics of each machine, over the jobs finished on a certain time range
+        """
+        jb = self._table("JOB")
+        if jb is None:
+            return []
+        index = _range_index(jb["FINISH_DATE"], t_start, t_end)
+        finish = _take(jb["FINISH_DATE"], index)
+        start = _take(jb["START_DATE"], index)
+        material = _take(jb["MATERIAL_DATE"], index)
+        order_qty = _take(jb["ORDER_QTY"], index)
+        started = _above(start, 0)
+        has_material = _above(material, 0)
+        uniq, counts, sums = _group_sum(_take(jb["MACHINE_ID"], index),
+                                        started,
+                                        _product(_difference(finish, start), started),
+                                        _product(order_qty, started),
+                                        _at_most(_difference(finish, _take(jb["DUE_DATE"], index)), 0),
+                                        has_material,
+                                        _product(_difference(finish, material), has_material),
+                                        order_qty,
+                                        _take(jb["YIELD_QTY"], index))
+
+        stats = MachinePODIndex.for_machines(machines, lambda m: MachineJobStatsPOD(
+            mach_id=m.get_machine_id(),
+            mach_name=m.get_machine_name()
+        ))
+        for mach_id, jobs, *row in zip(uniq, counts, *sums):
+            js = stats.get(mach_id)
+            if js is None:  # machine not in the list we were asked about
+                continue
+            js.jobs = jobs
+            (js.run_jobs, js.run_time_sum, js.run_qty_sum, js.on_time_jobs,
+             js.lead_jobs, js.lead_time_sum, js.order_qty_sum, js.yield_qty_sum) = (int(v) for v in row)
+        return stats.pods
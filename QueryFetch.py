@@ -0,0 +1,89 @@
+"""
+Bulk fetching of query results into typed columns.
+
+A result set is drained once, front to back, into one column per SELECT column: NumPy arrays
+when NumPy is installed, array('q') / array('d') otherwise, and lists for text. Rows are read in
+chunks of whole rows, then each column of a chunk is converted into its machine type in one go,
+so the only Python level work per row is the driver's next() and value() calls.
+"""
+import time
+from array import array
+from itertools import islice
+from typing import Any, List, Sequence
+
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from src.dao import QueryMetrics
+
+try:
+    import numpy as np
+except ImportError:  # optional, columns are array.array without it
+    np = None
+
+# Column dtypes, named after their array typecodes
+INT64 = "q"
+FLOAT64 = "d"
+TEXT = "U"
+
+# What NULL reads as, per dtype
+NULL_VALUES = {INT64: 0, FLOAT64: 0.0, TEXT: ""}
+# Rows read before they are converted into the columns, bounds the memory of the unconverted rows
+FETCH_CHUNK_ROWS = 65536
+
+
+def forward_only_query(db: QSqlDatabase) -> QSqlQuery:
+    """
+    A query that doesn't keep the rows it has already returned. Results read with fetch_columns
+    are only walked once, so there is no reason to let the driver cache them for seeking back.
+    Inside an @instrumented DAO method the query is an InstrumentedQuery, recorded in the metrics.
+    """
+    method = QueryMetrics.current_method()
+    if method is not None and QueryMetrics.metrics.enabled:
+        query = QueryMetrics.InstrumentedQuery(db, method)
+    else:
+        query = QSqlQuery(db)
+    query.setForwardOnly(True)
+    return query
+
+
+def _to_numpy(column: array, dtype: str) -> Any:
+    np_dtype = np.int64 if dtype == INT64 else np.float64
+    if not column:
+        return np.empty(0, dtype=np_dtype)
+    return np.frombuffer(column, dtype=np_dtype)  # zero copy view of the array's buffer
+
+
+def fetch_columns(query: QSqlQuery, dtypes: Sequence[str], use_numpy: bool = True) -> List[Any]:
+    """
+    Reads all remaining rows of an executed query into one column per dtype. NULL becomes 0, 0.0 or "".
+    :param query: an executed query, preferably from forward_only_query
+    :param dtypes: INT64, FLOAT64 or TEXT for each SELECT column, in order
+    :param use_numpy: return NumPy arrays for the numeric columns when NumPy is installed
+    :return: the columns, in the order of dtypes
+    """
+    t = time.perf_counter()
+    columns = [[] if dtype == TEXT else array(dtype) for dtype in dtypes]
+
+    value = query.value
+    indexes = range(len(dtypes))
+    more_rows = iter(query.next, False)
+    while True:
+        rows = [tuple(map(value, indexes)) for _ in islice(more_rows, FETCH_CHUNK_ROWS)]
+        for column, dtype, values in zip(columns, dtypes, zip(*rows)):
+            if None in values:
+                null = NULL_VALUES[dtype]
+                values = [null if v is None else v for v in values]
+            if dtype == INT64:
+                column.extend(map(int, values))
+            elif dtype == FLOAT64:
+                column.extend(map(float, values))
+            else:
+                column.extend(map(str, values))
+        if len(rows) < FETCH_CHUNK_ROWS:
+            break
+
+    if isinstance(query, QueryMetrics.InstrumentedQuery):
+        query.fetched(time.perf_counter() - t, len(columns[0]) if columns else 0)
+    if use_numpy and np is not None:
+        return [c if dtype == TEXT else _to_numpy(c, dtype) for c, dtype in zip(columns, dtypes)]
+    return columns
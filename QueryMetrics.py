@@ -0,0 +1,326 @@
+"""
+Instrumentation of the AnalyticsDAO queries.
+
+Query methods decorated with @instrumented get InstrumentedQuery objects from forward_only_query.
+These time prepare, exec and the fetch of the result separately, remember the row count and the
+bound values, and report each query to the metrics registry once its result has been fetched.
+Queries slower than a threshold also get their EXPLAIN plan captured. The registry keeps a
+bounded window of samples per method and logs a p50 / p95 summary at a fixed interval.
+"""
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from src.io import DpLog
+
+_current = threading.local()
+
+
+class QueryTimingPOD:
+    """
+    One executed query
+    """
+    __slots__ = ("method", "sql", "params", "prepare_s", "exec_s", "fetch_s", "rows", "ok", "plan", "finished")
+
+    def __init__(self, method: str, sql: str, params: Dict[str, Any], prepare_s: float, exec_s: float,
+                 fetch_s: float, rows: int, ok: bool):
+        self.method = method
+        self.sql = sql
+        self.params = params
+        self.prepare_s = prepare_s
+        self.exec_s = exec_s
+        self.fetch_s = fetch_s
+        self.rows = rows
+        self.ok = ok
+        self.plan: Optional[List[str]] = None
+        self.finished = time.time()
+
+    def total_s(self) -> float:
+        return self.prepare_s + self.exec_s + self.fetch_s
+
+    def __repr__(self):
+        params = ", ".join("%s=%r" % kv for kv in self.params.items())
+        if len(params) > 200:
+            params = params[:200] + "..."
+        return "QueryTimingPOD(method=%s, prepare=%.4f, exec=%.4f, fetch=%.4f, rows=%i, ok=%s, params={%s})" % (
+            self.method, self.prepare_s, self.exec_s, self.fetch_s, self.rows, self.ok, params)
+
+
+class QueryMethodStatsPOD:
+    """
+    Summary of the recent queries of one method, times in seconds
+    """
+    def __init__(self, method: str, count: int, failures: int, total_p50: float, total_p95: float,
+                 prepare_p50: float, exec_p50: float, exec_p95: float, fetch_p50: float, fetch_p95: float,
+                 rows_p50: float):
+        self.method = method
+        self.count = count
+        self.failures = failures
+        self.total_p50 = total_p50
+        self.total_p95 = total_p95
+        self.prepare_p50 = prepare_p50
+        self.exec_p50 = exec_p50
+        self.exec_p95 = exec_p95
+        self.fetch_p50 = fetch_p50
+        self.fetch_p95 = fetch_p95
+        self.rows_p50 = rows_p50
+
+    def __repr__(self):
+        return ("QueryMethodStatsPOD(method=%s, count=%i, failures=%i, total p50/p95=%.1f/%.1f ms, "
+                "prepare p50=%.1f ms, exec p50/p95=%.1f/%.1f ms, fetch p50/p95=%.1f/%.1f ms, rows p50=%i)" % (
+                    self.method, self.count, self.failures, self.total_p50 * 1e3, self.total_p95 * 1e3,
+                    self.prepare_p50 * 1e3, self.exec_p50 * 1e3, self.exec_p95 * 1e3,
+                    self.fetch_p50 * 1e3, self.fetch_p95 * 1e3, self.rows_p50))
+
+
+def _percentile(sorted_values: List[float], p: float) -> float:
+    """
+    Nearest rank percentile of an ascending list, 0 for an empty one
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class QueryMetricsRegistry:
+    """
+    In-process registry of the queries run by the instrumented DAO methods.
+
+    Keeps the last max_samples queries of each method, and the last max_slow queries over
+    explain_threshold, with their EXPLAIN plan. The plan of a method is captured at most once
+    per explain_interval, so a slow query that runs often doesn't run its EXPLAIN as often.
+    A summary of every method is logged, and appended to export_path as a JSON line if set,
+    when a query finishes and export_interval has passed since the last summary.
+    """
+    def __init__(self, max_samples: int = 1000, explain_threshold: float = 1.0, explain_interval: float = 60.0,
+                 max_slow: int = 50, export_interval: float = 300.0, export_path: Optional[str] = None):
+        """
+        :param max_samples: queries kept per method for the percentiles
+        :param explain_threshold: seconds from prepare to the end of the fetch above which a query is explained
+        :param explain_interval: minimum seconds between two EXPLAIN captures of the same method
+        :param max_slow: slow queries kept
+        :param export_interval: seconds between two summaries, 0 to disable them
+        :param export_path: JSON lines file the summaries are appended to, None to only log them
+        """
+        self.enabled = True
+        self.max_samples = max_samples
+        self.explain_threshold = explain_threshold
+        self.explain_interval = explain_interval
+        self.export_interval = export_interval
+        self.export_path = export_path
+
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[QueryTimingPOD]] = {}
+        self._failures: Dict[str, int] = {}
+        self._slow: Deque[QueryTimingPOD] = deque(maxlen=max_slow)
+        self._last_explain: Dict[str, float] = {}
+        self._last_export = time.monotonic()
+        self._captures: List[List[QueryTimingPOD]] = []
+
+    def should_explain(self, timing: QueryTimingPOD) -> bool:
+        """
+        Whether the plan of a finished query should be captured, and if so marks it as captured
+        """
+        if not timing.ok:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if self._captures:
+                return True
+            if timing.total_s() < self.explain_threshold:
+                return False
+            last = self._last_explain.get(timing.method)
+            if last is not None and now - last < self.explain_interval:
+                return False
+            self._last_explain[timing.method] = now
+        return True
+
+    def record(self, timing: QueryTimingPOD) -> None:
+        with self._lock:
+            samples = self._samples.get(timing.method)
+            if samples is None:
+                samples = self._samples[timing.method] = deque(maxlen=self.max_samples)
+            samples.append(timing)
+            for captured in self._captures:
+                captured.append(timing)
+            if not timing.ok:
+                self._failures[timing.method] = self._failures.get(timing.method, 0) + 1
+            if timing.total_s() >= self.explain_threshold:
+                self._slow.append(timing)
+            due = 0 < self.export_interval <= time.monotonic() - self._last_export
+            if due:
+                self._last_export = time.monotonic()
+
+        if timing.total_s() >= self.explain_threshold:
+            DpLog.log().warning("Slow analytics query %r%s", timing,
+                                "" if timing.plan is None else ", plan:\n" + "\n".join(timing.plan))
+        if due:
+            self.export()
+
+    def summary(self) -> List[QueryMethodStatsPOD]:
+        """
+        p50 / p95 of the recent queries of each method
+        """
+        with self._lock:
+            windows = {method: list(samples) for method, samples in self._samples.items()}
+            failures = dict(self._failures)
+
+        stats = []
+        for method, samples in sorted(windows.items()):
+            total = sorted(t.total_s() for t in samples)
+            exec_s = sorted(t.exec_s for t in samples)
+            fetch_s = sorted(t.fetch_s for t in samples)
+            stats.append(QueryMethodStatsPOD(
+                method, len(samples), failures.get(method, 0),
+                _percentile(total, 50), _percentile(total, 95),
+                _percentile(sorted(t.prepare_s for t in samples), 50),
+                _percentile(exec_s, 50), _percentile(exec_s, 95),
+                _percentile(fetch_s, 50), _percentile(fetch_s, 95),
+                _percentile(sorted(t.rows for t in samples), 50)))
+        return stats
+
+    @contextmanager
+    def capture(self) -> Iterator[List[QueryTimingPOD]]:
+        """
+        Collects the queries that finish inside the block, each with its plan whatever its time,
+        e.g. to compare the plans of the DAO queries before and after a schema change
+        """
+        captured: List[QueryTimingPOD] = []
+        with self._lock:
+            self._captures.append(captured)
+        try:
+            yield captured
+        finally:
+            with self._lock:
+                self._captures = [c for c in self._captures if c is not captured]
+
+    def slow_queries(self) -> List[QueryTimingPOD]:
+        with self._lock:
+            return list(self._slow)
+
+    def export(self) -> None:
+        """
+        Logs the summary, and appends it to export_path if set
+        """
+        stats = self.summary()
+        for s in stats:
+            DpLog.log().info("Query metrics: %r", s)
+        if self.export_path is None:
+            return
+        line = json.dumps({"time": time.time(), "methods": [vars(s) for s in stats]})
+        try:
+            with open(self.export_path, "a") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            DpLog.log().error("Failed to export query metrics to %s: %s", self.export_path, e)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._failures.clear()
+            self._slow.clear()
+            self._last_explain.clear()
+
+
+metrics = QueryMetricsRegistry()
+
+
+def current_method() -> Optional[str]:
+    """
+    The instrumented method running on the calling thread, None outside of one
+    """
+    return getattr(_current, "method", None)
+
+
+def instrumented(fn: Callable) -> Callable:
+    """
+    Decorates an AnalyticsDAO query method, so the queries it runs are recorded under its name.
+    Apply it below @cached_result, so only queries that actually run are recorded.
+    """
+    name = fn.__qualname__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        outer = current_method()
+        _current.method = name
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.method = outer
+    return wrapper
+
+
+class InstrumentedQuery(QSqlQuery):
+    """
+    A QSqlQuery that times prepare and exec, remembers its bound values, and reports itself to
+    the metrics registry when it fails or when fetch_columns has read its result
+    """
+    def __init__(self, db: QSqlDatabase, method: str):
+        QSqlQuery.__init__(self, db)
+        self._db = db
+        self._method = method
+        self._sql = ""
+        self._params: Dict[str, Any] = {}
+        self._prepare_s = 0.0
+        self._exec_s = 0.0
+
+    def prepare(self, query: str) -> bool:
+        t = time.perf_counter()
+        ok = QSqlQuery.prepare(self, query)
+        self._prepare_s = time.perf_counter() - t
+        self._sql = query
+        self._params = {}
+        return ok
+
+    def bindValue(self, placeholder, val, *args) -> None:
+        self._params[placeholder] = val
+        QSqlQuery.bindValue(self, placeholder, val, *args)
+
+    def exec(self, *args) -> bool:
+        if args:
+            self._sql = args[0]
+            self._prepare_s = 0.0
+            self._params = {}
+        t = time.perf_counter()
+        ok = QSqlQuery.exec(self, *args)
+        self._exec_s = time.perf_counter() - t
+        if not ok:
+            metrics.record(self._timing(0.0, 0, False))
+        return ok
+
+    def fetched(self, fetch_s: float, rows: int) -> None:
+        """
+        Called by fetch_columns once the result is read
+        """
+        timing = self._timing(fetch_s, rows, True)
+        if metrics.should_explain(timing):
+            timing.plan = self._explain()
+        metrics.record(timing)
+
+    def _timing(self, fetch_s: float, rows: int, ok: bool) -> QueryTimingPOD:
+        return QueryTimingPOD(self._method, self._sql, dict(self._params), self._prepare_s, self._exec_s,
+                              fetch_s, rows, ok)
+
+    def _explain(self) -> Optional[List[str]]:
+        """
+        The plan of the query, one line per plan row with the columns separated by " | "
+        """
+        prefix = "EXPLAIN QUERY PLAN " if self._db.driverName() == "QSQLITE" else "EXPLAIN "
+        query = QSqlQuery(self._db)
+        query.prepare(prefix + self._sql)
+        for placeholder, val in self._params.items():
+            query.bindValue(placeholder, val)
+        if not query.exec():
+            DpLog.log().debug("Failed to explain query of %s: %s", self._method, query.lastError().text())
+            return None
+        plan = []
+        while query.next():
+            plan.append(" | ".join(str(query.value(i)) for i in range(query.record().count())))
+        return plan
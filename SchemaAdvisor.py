@@ -0,0 +1,275 @@
+"""
+Indexes for the access paths of the analytics queries, applied as versioned migrations.
+
+The analytics queries filter MACHINE_STATUS by MACHINE_ID and STS_TIME and read CURRENT_STATE,
+COUNT_PROD and CURRENT_SPEED, filter MACHINE_ALARM by MACHINE_ID and ALARM_TIME, and JOB by
+FINISH_DATE. The indexes of MIGRATIONS hold every column those queries read, so the queries
+are answered from the index alone. Applied migrations are recorded in SCHEMA_MIGRATION. An
+index is only created when no existing index starts with its columns.
+
+explain_queries runs every AnalyticsDAO and JobAnalyticsDAO query with its plan captured, so
+the plans of before and after a migration can be compared with compare_plans. Indexes made
+redundant by a migration are only reported, dropping them is left to the DBA.
+"""
+import inspect
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from PyQt6.QtSql import QSqlQuery
+
+from src.dao.Analytics import AnalyticsDAO
+from src.dao.AnalyticsCache import result_cache
+from src.dao.JobAnalytics import JobAnalyticsDAO
+from src.dao.Machine import MachinePOD
+from src.dao.QueryMetrics import metrics, QueryTimingPOD
+from src.io import DpLog
+from src.io.ConnectionPool import current_db
+
+
+class IndexPOD:
+    """
+    An index of a migration, with its columns in key order
+    """
+    def __init__(self, name: str, table: str, columns: Sequence[str]):
+        self.name = name
+        self.table = table
+        self.columns = list(columns)
+
+    def is_covered_by(self, existing: Dict[str, List[str]]) -> bool:
+        """
+        Whether one of the existing indexes of the table starts with the columns of this one
+        :param existing: column lists by index name, as returned by SchemaAdvisorDAO.existing_indexes
+        """
+        n = len(self.columns)
+        return any([c.upper() for c in columns[:n]] == self.columns for columns in existing.values())
+
+    def supersedes(self, existing: Dict[str, List[str]]) -> List[str]:
+        """
+        The existing indexes of the table whose columns are a shorter prefix of this one's,
+        which this index makes redundant
+        """
+        return [name for name, columns in existing.items()
+                if len(columns) < len(self.columns) and [c.upper() for c in columns] == self.columns[:len(columns)]]
+
+    def create_sql(self) -> str:
+        return "CREATE INDEX %s ON %s (%s)" % (self.name, self.table, ", ".join(self.columns))
+
+    def __repr__(self):
+        return "IndexPOD(%s ON %s (%s))" % (self.name, self.table, ", ".join(self.columns))
+
+
+class MigrationPOD:
+    def __init__(self, version: int, description: str, indexes: List[IndexPOD]):
+        self.version = version
+        self.description = description
+        self.indexes = indexes
+
+
+MIGRATIONS = [
+    MigrationPOD(1, "Covering indexes of the analytics queries", [
+        # one machine over a range: time series, hour profiles of a group, the rollup's partial hours
+        IndexPOD("IX_MACHINE_STATUS_MACHINE_TIME_COVERING", "MACHINE_STATUS",
+                 ("MACHINE_ID", "STS_TIME", "CURRENT_STATE", "COUNT_PROD", "CURRENT_SPEED")),
+        # every machine over a range: the fleet distributions
+        IndexPOD("IX_MACHINE_STATUS_TIME_MACHINE_COVERING", "MACHINE_STATUS",
+                 ("STS_TIME", "MACHINE_ID", "CURRENT_STATE", "COUNT_PROD", "CURRENT_SPEED")),
+        IndexPOD("IX_MACHINE_ALARM_MACHINE_TIME_COVERING", "MACHINE_ALARM",
+                 ("MACHINE_ID", "ALARM_TIME", "ALARM_CODE", "ACK_TIME")),
+        IndexPOD("IX_JOB_FINISH_DATE_COVERING", "JOB",
+                 ("FINISH_DATE", "MACHINE_ID", "START_DATE", "DUE_DATE", "MATERIAL_DATE", "ORDER_QTY", "YIELD_QTY")),
+    ]),
+]
+
+
+class PlanChangePOD:
+    """
+    The plan and time of one query method before and after a migration, plans None if not captured
+    """
+    def __init__(self, method: str, before: Optional[List[str]], after: Optional[List[str]],
+                 before_s: float, after_s: float):
+        self.method = method
+        self.before = before
+        self.after = after
+        self.before_s = before_s
+        self.after_s = after_s
+
+    def changed(self) -> bool:
+        return self.before != self.after
+
+    def __repr__(self):
+        return "PlanChangePOD(method=%s, changed=%s, before=%.1f ms, after=%.1f ms)" % (
+            self.method, self.changed(), self.before_s * 1e3, self.after_s * 1e3)
+
+
+class SchemaAdvisorDAO:
+    _lock = threading.Lock()
+
+    @staticmethod
+    def existing_indexes(table: str) -> Dict[str, List[str]]:
+        """
+        The indexes of a table, primary key included on MySQL
+        :return: the column list of each index, in key order, by index name
+        """
+        db = current_db()
+        query = QSqlQuery(db)
+        indexes: Dict[str, List[str]] = {}
+        if db.driverName() == "QSQLITE":
+            if not query.exec("PRAGMA index_list(%s)" % table):
+                DpLog.log().error("Failed to list the indexes of %s: %s", table, query.lastError().text())
+                return indexes
+            names = []
+            while query.next():
+                names.append(str(query.value(1)))
+            for name in names:
+                if not query.exec("PRAGMA index_info(%s)" % name):
+                    DpLog.log().error("Failed to list the columns of %s: %s", name, query.lastError().text())
+                    continue
+                columns = []
+                while query.next():
+                    columns.append((int(query.value(0)), str(query.value(2))))
+                indexes[name] = [c for _, c in sorted(columns)]
+            return indexes
+
+        if not query.exec("SHOW INDEX FROM %s" % table):
+            DpLog.log().error("Failed to list the indexes of %s: %s", table, query.lastError().text())
+            return indexes
+        record = query.record()
+        key_name, seq, column = (record.indexOf(c) for c in ("Key_name", "Seq_in_index", "Column_name"))
+        columns: Dict[str, List[Tuple[int, str]]] = {}
+        while query.next():
+            columns.setdefault(str(query.value(key_name)), []).append((int(query.value(seq)), str(query.value(column))))
+        return {name: [c for _, c in sorted(cols)] for name, cols in columns.items()}
+
+    @staticmethod
+    def propose() -> List[IndexPOD]:
+        """
+        The indexes of the migrations that no existing index covers yet
+        """
+        existing: Dict[str, Dict[str, List[str]]] = {}
+        proposed = []
+        for migration in MIGRATIONS:
+            for index in migration.indexes:
+                if index.table not in existing:
+                    existing[index.table] = SchemaAdvisorDAO.existing_indexes(index.table)
+                if not index.is_covered_by(existing[index.table]):
+                    proposed.append(index)
+        return proposed
+
+    @staticmethod
+    def applied_versions() -> Optional[Set[int]]:
+        """
+        Creates SCHEMA_MIGRATION if it doesn't exist yet
+        :return: the versions already applied, None if the table can't be read
+        """
+        db = current_db()
+        query = QSqlQuery(db)
+        if not query.exec("""
+CREATE TABLE IF NOT EXISTS SCHEMA_MIGRATION (
+    VERSION INT NOT NULL PRIMARY KEY,
+    DESCRIPTION VARCHAR(255) NOT NULL,
+    APPLIED_AT BIGINT NOT NULL
+)"""):
+            DpLog.log().error("Failed to create the schema migration table: %s", query.lastError().text())
+            return None
+        if not query.exec("SELECT VERSION FROM SCHEMA_MIGRATION"):
+            DpLog.log().error("Failed to query the schema migrations: %s", query.lastError().text())
+            return None
+        versions = set()
+        while query.next():
+            versions.add(int(query.value(0)))
+        return versions
+
+    @staticmethod
+    def migrate() -> Optional[List[IndexPOD]]:
+        """
+        Applies the migrations that weren't applied yet, in version order. Indexes an existing
+        one already covers are skipped. MySQL commits each CREATE INDEX on its own, so a failed
+        migration is left unrecorded and is picked up again by the next call.
+        :return: the indexes created, None if a migration failed
+        """
+        with SchemaAdvisorDAO._lock:
+            applied = SchemaAdvisorDAO.applied_versions()
+            if applied is None:
+                return None
+
+            db = current_db()
+            query = QSqlQuery(db)
+            created = []
+            for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+                if migration.version in applied:
+                    continue
+                existing: Dict[str, Dict[str, List[str]]] = {}
+                for index in migration.indexes:
+                    if index.table not in existing:
+                        existing[index.table] = SchemaAdvisorDAO.existing_indexes(index.table)
+                    if index.is_covered_by(existing[index.table]):
+                        DpLog.log().info("Skipping %r, an existing index covers it", index)
+                        continue
+                    if not query.exec(index.create_sql()):
+                        DpLog.log().error("Failed to create %r: %s", index, query.lastError().text())
+                        return None
+                    existing[index.table][index.name] = index.columns
+                    created.append(index)
+                    DpLog.log().info("Created %r", index)
+
+                query.prepare("INSERT INTO SCHEMA_MIGRATION (VERSION, DESCRIPTION, APPLIED_AT) "
+                              "VALUES (:version, :description, :applied_at)")
+                query.bindValue(":version", migration.version)
+                query.bindValue(":description", migration.description)
+                query.bindValue(":applied_at", int(time.time()))
+                if not query.exec():
+                    DpLog.log().error("Failed to record schema migration %i: %s", migration.version,
+                                      query.lastError().text())
+                    return None
+                DpLog.log().info("Applied schema migration %i: %s", migration.version, migration.description)
+            return created
+
+    @staticmethod
+    def _query_methods() -> List[Tuple[str, Callable]]:
+        """
+        The public query methods of the DAOs, by qualified name
+        """
+        methods = []
+        for dao in (AnalyticsDAO, JobAnalyticsDAO):
+            for name, fn in inspect.getmembers(dao, inspect.isfunction):
+                if name.startswith("get_"):
+                    methods.append((dao.__name__ + "." + name, fn))
+        return methods
+
+    @staticmethod
+    def explain_queries(t_start: int, t_end: int, machines: List[MachinePOD]) -> Dict[str, QueryTimingPOD]:
+        """
+        Runs every query method on a range with the result cache cleared, and captures the plan of each
+        query. Per machine methods run for the first machine. Needs the query metrics enabled.
+        :param machines: the machines to query
+        :return: the last query run by each instrumented method, by method name
+        """
+        mach_ids = [m.get_machine_id() for m in machines]
+        args: Dict[str, Any] = {"t_start": t_start, "t_end": t_end, "machines": machines,
+                                "mach_ids": mach_ids, "mach_id": mach_ids[0] if mach_ids else 0}
+        result_cache.clear()
+        with metrics.capture() as captured:
+            for name, fn in SchemaAdvisorDAO._query_methods():
+                params = inspect.signature(fn).parameters
+                if any(p not in args and params[p].default is inspect.Parameter.empty for p in params):
+                    DpLog.log().debug("Not explaining %s, its arguments are unknown", name)
+                    continue
+                fn(**{p: args[p] for p in params if p in args})
+        return {timing.method: timing for timing in captured}
+
+    @staticmethod
+    def compare_plans(before: Dict[str, QueryTimingPOD], after: Dict[str, QueryTimingPOD]) -> List[PlanChangePOD]:
+        """
+        Pairs up the queries of two explain_queries runs
+        """
+        changes = []
+        for method in sorted(set(before) | set(after)):
+            b = before.get(method)
+            a = after.get(method)
+            changes.append(PlanChangePOD(method,
+                                         b.plan if b is not None else None,
+                                         a.plan if a is not None else None,
+                                         b.total_s() if b is not None else 0.0,
+                                         a.total_s() if a is not None else 0.0))
+        return changes
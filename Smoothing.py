@@ -0,0 +1,105 @@
+"""
+Smoothing of the analytics time series.
+
+All functions take plain sequences and return a list of floats. They are vectorized with
+NumPy when it is installed, and fall back to linear time pure Python otherwise.
+"""
+import bisect
+from itertools import accumulate
+from typing import List, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # optional, everything here also works without it
+    np = None
+
+
+def rolling_mean(times: Sequence[float], values: Sequence[float], half_window: float) -> List[float]:
+    """
+    Centered moving average over time: each point becomes the mean of all points whose time is
+    within half_window of its own. Gaps in the series shrink the window instead of stretching it.
+    Runs in O(n) from prefix sums and two moving window bounds, whatever the window width.
+    :param times: sample times, sorted ascending
+    :param values: sample values, same length as times
+    :param half_window: half the window width, in the units of times
+    :return: the smoothed values
+    """
+    n = len(values)
+    if n == 0:
+        return []
+
+    if np is not None:
+        t = np.asarray(times, dtype=np.float64)
+        v = np.asarray(values, dtype=np.float64)
+        lo = np.searchsorted(t, t - half_window, side="left")
+        hi = np.searchsorted(t, t + half_window, side="right")
+        prefix = np.concatenate(([0.0], np.cumsum(v)))
+        return ((prefix[hi] - prefix[lo]) / (hi - lo)).tolist()
+
+    prefix = [0.0]
+    prefix.extend(accumulate(values))
+    smoothed = []
+    lo = 0
+    hi = 0
+    for t in times:
+        while times[lo] < t - half_window:
+            lo += 1
+        while hi < n and times[hi] <= t + half_window:
+            hi += 1
+        smoothed.append((prefix[hi] - prefix[lo]) / (hi - lo))
+    return smoothed
+
+
+def exponential_smoothing(values: Sequence[float], alpha: float) -> List[float]:
+    """
+    Exponentially weighted moving average, s[0] = x[0], s[i] = alpha * x[i] + (1 - alpha) * s[i-1].
+    Each step depends on the previous one, so this is a single O(n) pass in both modes.
+    :param values: sample values, in time order
+    :param alpha: weight of the newest sample, 0 < alpha <= 1
+    :return: the smoothed values
+    """
+    if not 0.0 < alpha <= 1.0:
+        raise ValueError("alpha must be in (0, 1], got %r" % alpha)
+
+    smoothed = []
+    s = None
+    for x in values:
+        s = x if s is None else alpha * x + (1.0 - alpha) * s
+        smoothed.append(float(s))
+    return smoothed
+
+
+def rolling_median(values: Sequence[float], window: int) -> List[float]:
+    """
+    Centered median filter over a fixed number of samples. Near either end the window is cut
+    short rather than padded.
+    :param values: sample values, in time order
+    :param window: samples per window, odd
+    :return: the filtered values
+    """
+    if window < 1 or window % 2 == 0:
+        raise ValueError("window must be a positive odd number, got %r" % window)
+    n = len(values)
+    half = window // 2
+    if n == 0 or half == 0:
+        return [float(v) for v in values]
+
+    if np is not None and n >= window:
+        v = np.asarray(values, dtype=np.float64)
+        filtered = np.empty(n, dtype=np.float64)
+        filtered[half:n - half] = np.median(np.lib.stride_tricks.sliding_window_view(v, window), axis=1)
+        for i in list(range(half)) + list(range(n - half, n)):
+            filtered[i] = np.median(v[max(0, i - half):i + half + 1])
+        return filtered.tolist()
+
+    # Sorted copy of the current window, updated by one insert and one removal per step
+    filtered = []
+    current = sorted(values[:min(half, n)])
+    for i in range(n):
+        if i + half < n:
+            bisect.insort(current, values[i + half])
+        if i - half - 1 >= 0:
+            del current[bisect.bisect_left(current, values[i - half - 1])]
+        m = len(current)
+        filtered.append(float(current[m // 2]) if m % 2 else (current[m // 2 - 1] + current[m // 2]) / 2.0)
+    return filtered
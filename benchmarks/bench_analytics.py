@@ -0,0 +1,431 @@
+"""
+Benchmark suite for the analytics layer, on synthetic data.
+
+Generates MACHINE_STATUS, MACHINE_ALARM, ALARM_TYPE and JOB tables at a chosen scale into a
+temporary SQLite database, which stands in for the production database through the QSQLITE
+driver. Then it times every public AnalyticsDAO method, cold (result cache cleared) and warm,
+and every AnalyticsView chart builder fed with those results, headless on the offscreen
+platform. Results are written as JSON, and a previous result file can be given to compare
+against. Needs PyQt6, and is run from the application root so src can be imported.
+
+The hourly rollup is built before the timings, which measure the queries on an up to date
+rollup. DAO methods whose SQL the SQLite stand-in can't run, e.g. the rollup's row value IN
+before SQLite 3.15, are reported with status "failed".
+
+Usage: python benchmarks/bench_analytics.py [--machines 50] [--days 7] [--interval 60]
+                                            [--output bench_analytics.json] [--compare old.json]
+"""
+import argparse
+import bisect
+import importlib
+import inspect
+import json
+import os
+import platform
+import pkgutil
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # before the first Qt import
+
+from PyQt6.QtCore import QT_VERSION_STR  # noqa: E402
+from PyQt6.QtSql import QSqlDatabase  # noqa: E402
+from PyQt6.QtWidgets import QApplication, QWidget  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import src  # noqa: E402
+from src.dao.Analytics import AnalyticsDAO  # noqa: E402
+from src.dao.AnalyticsCache import result_cache  # noqa: E402
+from src.dao.AnalyticsRollup import MachineStatusRollupDAO  # noqa: E402
+from src.io.ConnectionPool import connection_pool  # noqa: E402
+
+CONNECTION_NAME = "bench_analytics"
+T0 = 1672549200  # 2023-01-01 00:00 in the plant's time zone, as in job.csv
+
+# MachineStateType values 0..5, RUNNING (5) is the good production state
+STATE_WEIGHTS = (0.05, 0.1, 0.1, 0.1, 0.05, 0.6)
+STATE_CHANGE_PROB = 0.02  # chance per sample that a machine leaves its current state
+RUNNING_STATE = 5
+NOMINAL_SPEED = 600.0
+
+ALARM_DESCS = ["E-STOP", "GUARD OPEN", "JAM", "LOW AIR", "MOTOR OVERLOAD", "WEB BREAK", "INK LOW",
+               "DIE CHANGE", "FEEDER EMPTY", "STACKER FULL", "TEMP HIGH", "VACUUM LOSS"]
+UNACKED_ALARM_PROB = 0.02
+CUSTOMERS = ["GPI", "CARDBOX", "KEYSTONE", "CULTECH", "NORPAC", "WESTROCK", "SMURFIT", "GRAPHIC"]
+
+SCHEMA = ["""CREATE TABLE MACHINE_STATUS (
+    STS_ID INTEGER PRIMARY KEY,
+    MACHINE_ID INTEGER NOT NULL,
+    STS_TIME INTEGER NOT NULL,
+    CURRENT_STATE INTEGER NOT NULL,
+    COUNT_PROD INTEGER,
+    CURRENT_SPEED REAL)""", """CREATE TABLE MACHINE_ALARM (
+    ALARM_ID INTEGER PRIMARY KEY,
+    ALARM_CODE INTEGER NOT NULL,
+    MACHINE_ID INTEGER NOT NULL,
+    ACTIVE_JOB INTEGER,
+    ALARM_TIME INTEGER NOT NULL,
+    ACK_TIME INTEGER)""", """CREATE TABLE ALARM_TYPE (
+    AT_ID INTEGER PRIMARY KEY,
+    ALARM_DESC VARCHAR(64) NOT NULL)""", """CREATE TABLE JOB (
+    JOB_ID INTEGER PRIMARY KEY,
+    MACHINE_ID INTEGER NOT NULL,
+    JOB_DESC VARCHAR(64),
+    DUE_DATE INTEGER,
+    CUSTOMER INTEGER,
+    GLOBE_JOB_NUM VARCHAR(32),
+    FINISH_DATE INTEGER,
+    YIELD_QTY INTEGER,
+    ORDER_QTY INTEGER,
+    START_DATE INTEGER,
+    MATERIAL_DATE INTEGER)""",
+          "CREATE INDEX IX_MACHINE_STATUS_TIME ON MACHINE_STATUS (STS_TIME)",
+          "CREATE INDEX IX_MACHINE_ALARM_MACHINE_TIME ON MACHINE_ALARM (MACHINE_ID, ALARM_TIME)"]
+
+
+class BenchMachine:
+    """
+    Stands in for MachinePOD, which the DAO only reads the id and name of
+    """
+    def __init__(self, mach_id: int, mach_name: str):
+        self._mach_id = mach_id
+        self._mach_name = mach_name
+
+    def get_machine_id(self) -> int:
+        return self._mach_id
+
+    def get_machine_name(self) -> str:
+        return self._mach_name
+
+
+def _status_rows(rng: random.Random, num_machines: int, t_end: int, interval: int):
+    states = [rng.choices(range(len(STATE_WEIGHTS)), STATE_WEIGHTS)[0] for _ in range(num_machines)]
+    for sts_time in range(T0, t_end, interval):
+        for i in range(num_machines):
+            if rng.random() < STATE_CHANGE_PROB:
+                states[i] = rng.choices(range(len(STATE_WEIGHTS)), STATE_WEIGHTS)[0]
+            state = states[i]
+            if state == RUNNING_STATE:
+                yield i + 1, sts_time, state, rng.randrange(5, 20), rng.gauss(NOMINAL_SPEED, NOMINAL_SPEED * 0.08)
+            else:
+                yield i + 1, sts_time, state, rng.randrange(3), 0.0
+
+
+def _job_rows(rng: random.Random, num_machines: int, t_end: int, jobs_per_day: float) -> List[Tuple]:
+    """
+    Back to back jobs on each machine, with the columns and value shapes of job.csv
+    """
+    mean_span = 86400 / jobs_per_day
+    rows = []
+    job_id = 200001
+    for mach_id in range(1, num_machines + 1):
+        start = T0 + rng.randrange(int(mean_span))
+        while start < t_end:
+            run = int(rng.uniform(0.3, 0.9) * mean_span)
+            customer = rng.randrange(1, 60)
+            order_qty = rng.randrange(5, 300) * 100
+            finish = start + run
+            due = (start // 86400 + rng.randrange(2, 10)) * 86400 + 86399
+            rows.append((job_id, mach_id, "GL%i %s" % (job_id, CUSTOMERS[customer % len(CUSTOMERS)]), due,
+                         customer, "GL%i" % job_id, finish if finish < t_end else None,
+                         0 if finish >= t_end else int(order_qty * rng.uniform(0.9, 1.05)), order_qty,
+                         start, max(T0, start - rng.randrange(3 * 86400))))
+            job_id += 1
+            start = finish + rng.randrange(60, int(mean_span - run) + 120)
+    return rows
+
+
+def _alarm_rows(rng: random.Random, num_machines: int, t_end: int, alarms_per_day: float, jobs: List[Tuple]):
+    # Running job of each machine at a time, for ACTIVE_JOB
+    job_starts: Dict[int, List[int]] = {}
+    job_ids: Dict[int, List[int]] = {}
+    for job in jobs:
+        job_starts.setdefault(job[1], []).append(job[9])
+        job_ids.setdefault(job[1], []).append(job[0])
+
+    num_alarms = int(alarms_per_day * num_machines * (t_end - T0) / 86400)
+    for _ in range(num_alarms):
+        mach_id = rng.randrange(1, num_machines + 1)
+        alarm_time = rng.randrange(T0, t_end)
+        starts = job_starts.get(mach_id, [])
+        j = bisect.bisect_right(starts, alarm_time) - 1
+        active_job = job_ids[mach_id][j] if j >= 0 else None
+        ack_time = None if rng.random() < UNACKED_ALARM_PROB else alarm_time + int(rng.expovariate(1 / 600.0)) + 1
+        yield rng.randrange(1, len(ALARM_DESCS) + 1), mach_id, active_job, alarm_time, ack_time
+
+
+def build_database(path: str, num_machines: int, days: float, interval: int, alarms_per_day: float,
+                   jobs_per_day: float, seed: int) -> Dict[str, int]:
+    """
+    Writes the synthetic tables to a SQLite file
+    :return: the number of rows of each table
+    """
+    rng = random.Random(seed)
+    t_end = T0 + int(days * 86400)
+    conn = sqlite3.connect(path)
+    for statement in SCHEMA:
+        conn.execute(statement)
+
+    conn.executemany("INSERT INTO ALARM_TYPE (AT_ID, ALARM_DESC) VALUES (?, ?)",
+                     enumerate(ALARM_DESCS, start=1))
+    conn.executemany("INSERT INTO MACHINE_STATUS (MACHINE_ID, STS_TIME, CURRENT_STATE, COUNT_PROD, CURRENT_SPEED) "
+                     "VALUES (?, ?, ?, ?, ?)", _status_rows(rng, num_machines, t_end, interval))
+    jobs = _job_rows(rng, num_machines, t_end, jobs_per_day)
+    conn.executemany("INSERT INTO JOB VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", jobs)
+    conn.executemany("INSERT INTO MACHINE_ALARM (ALARM_CODE, MACHINE_ID, ACTIVE_JOB, ALARM_TIME, ACK_TIME) "
+                     "VALUES (?, ?, ?, ?, ?)", _alarm_rows(rng, num_machines, t_end, alarms_per_day, jobs))
+    conn.commit()
+
+    counts = {table: conn.execute("SELECT COUNT(*) FROM %s" % table).fetchone()[0]
+              for table in ("MACHINE_STATUS", "MACHINE_ALARM", "ALARM_TYPE", "JOB")}
+    conn.close()
+    return counts
+
+
+def _is_ok(result: Any) -> bool:
+    # Failed DAO queries come back as None or []
+    return result is not None and not (isinstance(result, list) and not result)
+
+
+def _summary(times: List[float]) -> Dict[str, float]:
+    return {"min_s": min(times), "median_s": statistics.median(times), "mean_s": statistics.fmean(times)}
+
+
+def _call_args(fn: Callable, t_start: int, t_end: int, machines: List[BenchMachine]) -> Optional[Dict[str, Any]]:
+    """
+    Arguments for a DAO method, picked by parameter name. None if it takes one the suite doesn't know.
+    """
+    known = {
+        "t_start": t_start,
+        "t_end": t_end,
+        "mach_id": machines[0].get_machine_id(),
+        "machines": machines,
+        "mach_ids": [m.get_machine_id() for m in machines],
+    }
+    kwargs = {}
+    for name, param in inspect.signature(fn).parameters.items():
+        if name in known:
+            kwargs[name] = known[name]
+        elif param.default is inspect.Parameter.empty:
+            return None
+    return kwargs
+
+
+def bench_dao(t_start: int, t_end: int, machines: List[BenchMachine], repeat: int) -> Tuple[List[Dict], Dict[str, Any]]:
+    """
+    Times every public AnalyticsDAO method, cold and warm
+    :return: one result dict per method, and the last result of each successful method
+    """
+    results = []
+    data = {}
+    for name, fn in inspect.getmembers(AnalyticsDAO, inspect.isfunction):
+        if name.startswith("_"):
+            continue
+        kwargs = _call_args(fn, t_start, t_end, machines)
+        if kwargs is None:
+            results.append({"method": name, "status": "skipped"})
+            continue
+
+        cold = []
+        result = None
+        with connection_pool.connection():
+            for _ in range(repeat):
+                result_cache.clear()
+                t = time.perf_counter()
+                result = fn(**kwargs)
+                cold.append(time.perf_counter() - t)
+            t = time.perf_counter()
+            fn(**kwargs)
+            warm = time.perf_counter() - t
+
+        entry = {"method": name, "status": "ok" if _is_ok(result) else "failed",
+                 "cold": _summary(cold), "warm_s": warm}
+        results.append(entry)
+        if _is_ok(result):
+            data[name] = result
+        print("%-42s %-8s %12.4f %12.6f" % (name, entry["status"], entry["cold"]["min_s"], warm))
+    return results, data
+
+
+def _view_module():
+    """
+    The module of AnalyticsView, found among the application packages
+    """
+    for info in pkgutil.walk_packages(src.__path__, "src."):
+        if info.name.rsplit(".", 1)[-1] == "AnalyticsView":
+            return importlib.import_module(info.name)
+    raise ImportError("AnalyticsView not found under %s" % src.__path__)
+
+
+def bench_charts(data: Dict[str, Any], machines: List[BenchMachine], t_start: int, t_end: int,
+                 repeat: int) -> List[Dict]:
+    """
+    Times the chart builders of AnalyticsView: building all charts once, then drawing each chart
+    from its query result, and rendering it to a pixmap
+    """
+    view_cls = _view_module().AnalyticsView
+    # The view's own __init__ needs the application's database thread, so only the chart part is set up
+    view = view_cls.__new__(view_cls)
+    QWidget.__init__(view)
+    view.setupUi(view)
+    view.resize(1600, 1000)
+    t = time.perf_counter()
+    view._init_charts()
+    init_s = time.perf_counter() - t
+    view._set_machines(machines)
+    view._time_args = {key: (t_start, t_end, machines[0].get_machine_id(), machines) for key in view._time_charts}
+    view.show()
+    QApplication.processEvents()
+
+    # Which DAO method feeds each chart, as in AnalyticsView.on_load_pressed
+    sources = {
+        "state_distribution": "get_machines_state_distribution",
+        "goodbad_distribution": "get_machines_goodbad_distribution",
+        "stateavgprod_distribution": "get_machines_stateavgprod_distribution",
+        "stateavgspeed_distribution": "get_machines_stateavgspeed_distribution",
+        "alarm_count": "get_machine_alarm_count",
+        "alarm_cleartime": "get_machine_alarm_cleartime",
+        "alarm_avgclear": "get_machine_alarm_avgclear",
+        "avgspeed_time": "get_machine_avgspeed_time",
+        "avgprod_time": "get_machine_avgprod_time",
+        "avgspeed_hour": "get_machines_avgspeed_hour",
+        "avgprod_hour": "get_machines_avgprod_hour",
+        "goodbadratio_hour": "get_machines_goodbadratio_hour",
+        "uptime_hour": "get_machines_uptime_hour",
+    }
+    results = [{"chart": "init_charts", "status": "ok", "draw": _summary([init_s])}]
+    for key, method in sources.items():
+        result = data.get(method)
+        if result is None:
+            results.append({"chart": key, "status": "no data"})
+            continue
+        binding = view._bar_charts.get(key) or view._line_charts.get(key)
+        chart_view = binding.chart.scene().views()[0]
+
+        draw = []
+        render = []
+        for _ in range(repeat):
+            t = time.perf_counter()
+            view._on_query_result(key, result)
+            draw.append(time.perf_counter() - t)
+            t = time.perf_counter()
+            QApplication.processEvents()
+            chart_view.grab()
+            render.append(time.perf_counter() - t)
+        results.append({"chart": key, "status": "ok", "draw": _summary(draw), "render": _summary(render)})
+        print("%-42s %-8s %12.4f %12.4f" % (key, "ok", min(draw), min(render)))
+    view.close()
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict, previous_path: str) -> None:
+    """
+    Prints the ratio of each timing to the same timing of a previous result file, > 1 means slower now
+    """
+    with open(previous_path) as f:
+        previous = json.load(f)
+    print("\ncompared to %s (%s): current / previous" % (previous_path, previous["meta"].get("git_commit")))
+    for section, name_key, timing in (("dao", "method", "cold"), ("charts", "chart", "draw")):
+        before = {e[name_key]: e for e in previous.get(section, []) if e.get("status") == "ok"}
+        for entry in current[section]:
+            old = before.get(entry[name_key])
+            if entry.get("status") != "ok" or old is None:
+                continue
+            print("%-42s %8.2fx" % (entry[name_key], entry[timing]["min_s"] / old[timing]["min_s"]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--machines", type=int, default=50)
+    parser.add_argument("--days", type=float, default=7.0)
+    parser.add_argument("--interval", type=int, default=60, help="seconds between two status samples of a machine")
+    parser.add_argument("--alarms-per-day", type=float, default=20.0, help="per machine")
+    parser.add_argument("--jobs-per-day", type=float, default=3.0, help="per machine")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-charts", action="store_true")
+    parser.add_argument("--output", default="bench_analytics.json", help="result file to write")
+    parser.add_argument("--compare", metavar="PREVIOUS", help="result file of an earlier run to compare against")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)  # noqa: F841, QtSql drivers and the charts need an application instance
+    machines = [BenchMachine(i, "MACHINE %02i" % i) for i in range(1, args.machines + 1)]
+    t_start = T0
+    t_end = T0 + int(args.days * 86400) - 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench_analytics.sqlite")
+        t = time.perf_counter()
+        counts = build_database(path, args.machines, args.days, args.interval, args.alarms_per_day,
+                                args.jobs_per_day, args.seed)
+        print("generated %s in %.1f s" % (", ".join("%i %s" % (n, table) for table, n in counts.items()),
+                                           time.perf_counter() - t))
+
+        db = QSqlDatabase.addDatabase("QSQLITE", CONNECTION_NAME)
+        db.setDatabaseName(path)
+        if not db.open():
+            sys.exit("Failed to open %s: %s" % (path, db.lastError().text()))
+        connection_pool.set_template(CONNECTION_NAME)
+
+        with connection_pool.connection():
+            t = time.perf_counter()
+            if MachineStatusRollupDAO.refresh():
+                print("built the hourly rollup in %.1f s" % (time.perf_counter() - t))
+            else:
+                print("failed to build the hourly rollup, its queries read MACHINE_STATUS")
+
+        print("%-42s %-8s %12s %12s" % ("method", "status", "cold s", "warm s"))
+        dao_results, data = bench_dao(t_start, t_end, machines, args.repeat)
+        chart_results = []
+        if not args.skip_charts:
+            print("%-42s %-8s %12s %12s" % ("chart", "status", "draw s", "render s"))
+            chart_results = bench_charts(data, machines, t_start, t_end, args.repeat)
+
+        connection_pool.close_thread_connection()
+        db.close()
+        del db
+        QSqlDatabase.removeDatabase(CONNECTION_NAME)
+
+    current = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR,
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "machines": args.machines,
+            "days": args.days,
+            "interval": args.interval,
+            "alarms_per_day": args.alarms_per_day,
+            "jobs_per_day": args.jobs_per_day,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "rows": counts,
+        },
+        "dao": dao_results,
+        "charts": chart_results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(current, f, indent=2)
+    print("results written to %s" % args.output)
+    if args.compare:
+        compare(current, args.compare)
+
+
+if __name__ == "__main__":
+    main()
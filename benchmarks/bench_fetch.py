@@ -0,0 +1,129 @@
+"""
+Benchmark for reading query results into Python.
+
+Compares the per cell loop the DAO methods used (query.next(), then int(query.value(i)) /
+float(query.value(i)) for every cell) against fetch_columns, on a synthetic MACHINE_STATUS
+table in a temporary SQLite database opened through the QSQLITE driver. Needs PyQt6, and is
+run from the application root so src.dao can be imported. NumPy is used when installed.
+
+Usage: python benchmarks/bench_fetch.py [--rows 1000000]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import List
+
+from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.dao.QueryFetch import fetch_columns, forward_only_query, INT64, FLOAT64  # noqa: E402
+
+SAMPLE_INTERVAL = 10  # seconds between two status samples of one machine
+NUM_MACHINES = 50
+NUM_STATES = 6
+
+SELECT_QUERY = "SELECT STS_TIME, MACHINE_ID, CURRENT_STATE, COUNT_PROD, CURRENT_SPEED FROM MACHINE_STATUS"
+DTYPES = (INT64, INT64, INT64, INT64, FLOAT64)
+
+
+def build_database(path: str, num_rows: int) -> None:
+    """
+    Writes a MACHINE_STATUS table with num_rows samples to a SQLite file
+    """
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE MACHINE_STATUS (
+    STS_ID INTEGER PRIMARY KEY,
+    MACHINE_ID INTEGER,
+    STS_TIME INTEGER,
+    CURRENT_STATE INTEGER,
+    COUNT_PROD INTEGER,
+    CURRENT_SPEED REAL)""")
+    rng = random.Random(42)
+    t0 = 1672549200
+    conn.executemany("INSERT INTO MACHINE_STATUS (MACHINE_ID, STS_TIME, CURRENT_STATE, COUNT_PROD, CURRENT_SPEED) "
+                     "VALUES (?, ?, ?, ?, ?)",
+                     ((i % NUM_MACHINES + 1, t0 + (i // NUM_MACHINES) * SAMPLE_INTERVAL,
+                       rng.randrange(NUM_STATES), rng.randrange(20), rng.random()) for i in range(num_rows)))
+    conn.commit()
+    conn.close()
+
+
+def per_cell(db: QSqlDatabase, forward_only: bool) -> int:
+    """
+    The loop the DAO methods used before fetch_columns
+    """
+    query = QSqlQuery(db)
+    query.setForwardOnly(forward_only)
+    query.exec(SELECT_QUERY)
+    times: List[int] = []
+    ids: List[int] = []
+    states: List[int] = []
+    prods: List[int] = []
+    speeds: List[float] = []
+    while query.next():
+        times.append(int(query.value(0)))
+        ids.append(int(query.value(1)))
+        states.append(int(query.value(2)))
+        prods.append(int(query.value(3)))
+        speeds.append(float(query.value(4)))
+    return len(times)
+
+
+def columnar(db: QSqlDatabase, use_numpy: bool) -> int:
+    query = forward_only_query(db)
+    query.exec(SELECT_QUERY)
+    return len(fetch_columns(query, DTYPES, use_numpy=use_numpy)[0])
+
+
+def time_call(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)  # noqa: F841, QtSql drivers need an application instance
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench_fetch.sqlite")
+        build_database(path, args.rows)
+
+        db = QSqlDatabase.addDatabase("QSQLITE", "bench_fetch")
+        db.setDatabaseName(path)
+        if not db.open():
+            sys.exit("Failed to open %s: %s" % (path, db.lastError().text()))
+
+        cases = [
+            ("per cell, scrollable", lambda: per_cell(db, False)),
+            ("per cell, forward only", lambda: per_cell(db, True)),
+            ("fetch_columns, array", lambda: columnar(db, False)),
+            ("fetch_columns, numpy", lambda: columnar(db, True)),
+        ]
+        print("%10i rows x %i columns" % (args.rows, len(DTYPES)))
+        print("%-26s %10s %14s %10s" % ("method", "s", "ns/cell", "speedup"))
+        baseline = None
+        for name, fn in cases:
+            t = time_call(fn, args.repeat)
+            baseline = baseline or t
+            print("%-26s %10.3f %14.1f %9.2fx" % (name, t, t / (args.rows * len(DTYPES)) * 1e9, baseline / t))
+
+        del cases
+        db.close()
+        del db
+        QSqlDatabase.removeDatabase("bench_fetch")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Benchmark for the memory held by analytics results.
+
+Builds the results of every AnalyticsDAO method for a fleet of machines over a period, once
+with the previous POD layout (a __dict__ per object, Python lists and dicts of floats, one
+object per time series point) and once with the current one (__slots__, fixed float64
+buffers per machine x state and machine x hour, time series as parallel arrays), and reports
+the memory each holds, measured with tracemalloc. The POD classes are mirrored here, so only
+the standard library is needed.
+
+Results of different machines are independent, so the fleet is built and measured a chunk of
+machines at a time and the chunks are added up; tracemalloc's own bookkeeping for a whole
+year of the legacy layout would not fit in memory otherwise.
+
+Usage: python benchmarks/bench_pod_memory.py [--machines 500] [--days 365] [--chunk 25]
+"""
+import argparse
+import enum
+import tracemalloc
+from array import array
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, List
+
+HOUR_SECONDS = 3600
+T0 = 1672549200
+
+
+class MachineStateType(enum.Enum):
+    OFF = 0
+    IDLE = 1
+    SETUP = 2
+    DOWN = 3
+    WAITING = 4
+    RUNNING = 5
+
+
+MACHINE_STATES = list(MachineStateType)
+STATE_INDEX = {s: i for i, s in enumerate(MACHINE_STATES)}
+
+
+# Previous layout
+class LegacyStatesPOD:
+    def __init__(self, mach_id: int, mach_name: str, states: Dict[MachineStateType, float]):
+        self.mach_id = mach_id
+        self.mach_name = mach_name
+        self.states = states
+
+
+class LegacyGoodbadPOD:
+    def __init__(self, mach_id: int, mach_name: str, mach_goodprod: float, mach_badprod: float):
+        self.mach_id = mach_id
+        self.mach_name = mach_name
+        self.mach_goodprod = mach_goodprod
+        self.mach_badprod = mach_badprod
+
+
+class LegacyTimePOD:
+    def __init__(self, mach_id: int, mach_name: str, hour: int, value: float):
+        self.mach_id = mach_id
+        self.mach_name = mach_name
+        self.hour = hour
+        self.value = value
+
+
+class LegacyHourPOD:
+    def __init__(self, mach_id: int):
+        self.mach_id = mach_id
+        self.values = [0.0] * 24
+
+
+# Current layout
+class StateValues(Mapping):
+    __slots__ = ("buffer",)
+
+    def __init__(self, buffer: array):
+        self.buffer = buffer
+
+    def __getitem__(self, state: MachineStateType) -> float:
+        return self.buffer[STATE_INDEX[state]]
+
+    def __iter__(self):
+        return iter(MACHINE_STATES)
+
+    def __len__(self) -> int:
+        return len(MACHINE_STATES)
+
+
+class StatesPOD:
+    __slots__ = ("mach_id", "mach_name", "states")
+
+    def __init__(self, mach_id: int, mach_name: str, states: StateValues):
+        self.mach_id = mach_id
+        self.mach_name = mach_name
+        self.states = states
+
+
+class GoodbadPOD:
+    __slots__ = ("mach_id", "mach_name", "mach_goodprod", "mach_badprod")
+
+    def __init__(self, mach_id: int, mach_name: str, mach_goodprod: float, mach_badprod: float):
+        self.mach_id = mach_id
+        self.mach_name = mach_name
+        self.mach_goodprod = mach_goodprod
+        self.mach_badprod = mach_badprod
+
+
+class TimeSeriesPOD:
+    __slots__ = ("mach_id", "mach_name", "hours", "values")
+
+    def __init__(self, mach_id: int, mach_name: str, hours: array, values: array):
+        self.mach_id = mach_id
+        self.mach_name = mach_name
+        self.hours = hours
+        self.values = values
+
+
+class HourPOD:
+    __slots__ = ("mach_id", "values")
+
+    def __init__(self, mach_id: int):
+        self.mach_id = mach_id
+        self.values = array('d', [0.0]) * 24
+
+
+def state_value(mach_id: int, i: int) -> float:
+    # Distinct values, so small float caching doesn't flatter either layout
+    return mach_id * 0.001 + i * 0.1 + 0.5
+
+
+def build_legacy(machines: range, hours: int) -> List[Any]:
+    results: List[Any] = []
+    for kind in range(3):
+        results.append([LegacyStatesPOD(m, "Machine %i" % m,
+                                        {s: state_value(m, i) + kind for i, s in enumerate(MACHINE_STATES)})
+                        for m in machines])
+    results.append([LegacyGoodbadPOD(m, "Machine %i" % m, m + 0.5, m + 0.25) for m in machines])
+    for kind in range(2):
+        results.append([[LegacyTimePOD(m, "", T0 + h * HOUR_SECONDS, float(h + kind + m)) for h in range(hours)]
+                        for m in machines])
+    for kind in range(4):
+        hour_pods = []
+        for m in machines:
+            pod = LegacyHourPOD(m)
+            pod.values = [m * 0.5 + h + kind + 0.25 for h in range(24)]
+            hour_pods.append(pod)
+        results.append(hour_pods)
+    return results
+
+
+def build_compact(machines: range, hours: int) -> List[Any]:
+    results: List[Any] = []
+    for kind in range(3):
+        results.append([StatesPOD(m, "Machine %i" % m,
+                                  StateValues(array('d', (state_value(m, i) + kind for i in range(len(MACHINE_STATES))))))
+                        for m in machines])
+    results.append([GoodbadPOD(m, "Machine %i" % m, m + 0.5, m + 0.25) for m in machines])
+    for kind in range(2):
+        results.append([TimeSeriesPOD(m, "", array('q', (T0 + h * HOUR_SECONDS for h in range(hours))),
+                                      array('d', (float(h + kind + m) for h in range(hours))))
+                        for m in machines])
+    for kind in range(4):
+        hour_pods = []
+        for m in machines:
+            pod = HourPOD(m)
+            for h in range(24):
+                pod.values[h] = m * 0.5 + h + kind + 0.25
+            hour_pods.append(pod)
+        results.append(hour_pods)
+    return results
+
+
+def measure(build: Callable[[range, int], List[Any]], machines: int, hours: int, chunk: int) -> int:
+    """
+    Memory held by the results of all machines, in bytes
+    """
+    held = 0
+    for first in range(0, machines, chunk):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        results = build(range(first, min(machines, first + chunk)), hours)
+        held += tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        del results
+    return held
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--machines", type=int, default=500)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--chunk", type=int, default=25, help="machines built and measured at once")
+    args = parser.parse_args()
+
+    hours = args.days * 24
+    legacy = measure(build_legacy, args.machines, hours, args.chunk)
+    compact = measure(build_compact, args.machines, hours, args.chunk)
+
+    print("%i machines, %i days, %i time series points per machine and chart" % (args.machines, args.days, hours))
+    print("%-10s %12s" % ("layout", "MiB"))
+    print("%-10s %12.1f" % ("legacy", legacy / 2 ** 20))
+    print("%-10s %12.1f" % ("compact", compact / 2 ** 20))
+    print("compact holds %.1fx less memory" % (legacy / compact))
+
+
+if __name__ == "__main__":
+    main()
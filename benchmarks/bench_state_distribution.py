@@ -0,0 +1,130 @@
+"""
+Benchmark for the machine state distribution query.
+
+Compares the old correlated-subquery form of AnalyticsDAO.get_machines_state_distribution
+against the single pass grouped count it was replaced with, on a synthetic MACHINE_STATUS
+table in an in-memory SQLite database. Only the standard library is needed.
+
+Usage: python benchmarks/bench_state_distribution.py [--rows 25000 50000 100000 200000]
+"""
+import argparse
+import random
+import sqlite3
+import time
+from typing import Dict, List, Tuple
+
+SAMPLE_INTERVAL = 10  # seconds between two status samples of one machine
+ROWS_PER_MACHINE = 2500  # machines grow with the row count, as the fleet does
+NUM_STATES = 6
+
+CORRELATED_QUERY = """SELECT
+    ms2.MACHINE_ID,
+    ms2.CURRENT_STATE,
+    COUNT(ms2.STS_ID) * 1.0 / (SELECT
+                             COUNT(ms1.STS_ID)
+                         FROM MACHINE_STATUS ms1
+                         WHERE ms1.MACHINE_ID=ms2.MACHINE_ID
+                         AND ms2.STS_TIME >= :t_start AND ms2.STS_TIME <= :t_end
+    ) AS TIME_FRAC
+FROM MACHINE_STATUS ms2
+WHERE
+    ms2.STS_TIME >= :t_start AND ms2.STS_TIME <= :t_end
+GROUP BY ms2.MACHINE_ID, ms2.CURRENT_STATE"""
+
+SINGLE_PASS_QUERY = """SELECT
+    MACHINE_ID,
+    CURRENT_STATE,
+    COUNT(STS_ID) AS STATE_COUNT
+FROM
+    MACHINE_STATUS
+WHERE
+    STS_TIME>=:t_start and STS_TIME<=:t_end
+GROUP BY
+    MACHINE_ID,
+    CURRENT_STATE"""
+
+
+def build_table(num_rows: int) -> Tuple[sqlite3.Connection, int, int]:
+    """
+    Creates an in-memory MACHINE_STATUS table with num_rows samples
+    :param num_rows: number of status rows to generate
+    :return: the connection, and the start and end time of the generated data
+    """
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""CREATE TABLE MACHINE_STATUS (
+    STS_ID INTEGER PRIMARY KEY,
+    MACHINE_ID INTEGER,
+    STS_TIME INTEGER,
+    CURRENT_STATE INTEGER,
+    COUNT_PROD INTEGER,
+    CURRENT_SPEED REAL)""")
+    conn.execute("CREATE INDEX IX_STS_TIME ON MACHINE_STATUS (STS_TIME)")
+
+    rng = random.Random(42)
+    num_machines = max(1, num_rows // ROWS_PER_MACHINE)
+    t0 = 1672549200
+    rows = []
+    for i in range(num_rows):
+        mach_id = i % num_machines + 1
+        sts_time = t0 + (i // num_machines) * SAMPLE_INTERVAL
+        rows.append((mach_id, sts_time, rng.randrange(NUM_STATES), rng.randrange(20), rng.random()))
+    conn.executemany("INSERT INTO MACHINE_STATUS (MACHINE_ID, STS_TIME, CURRENT_STATE, COUNT_PROD, CURRENT_SPEED) "
+                     "VALUES (?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    return conn, t0, rows[-1][1]
+
+
+def single_pass_fractions(conn: sqlite3.Connection, t_start: int, t_end: int) -> Dict[Tuple[int, int], float]:
+    """
+    Same reduction as AnalyticsDAO.get_machines_state_distribution does on the query result
+    """
+    state_counts: Dict[Tuple[int, int], int] = {}
+    machine_totals: Dict[int, int] = {}
+    for mach_id, state, count in conn.execute(SINGLE_PASS_QUERY, {"t_start": t_start, "t_end": t_end}):
+        state_counts[(mach_id, state)] = count
+        machine_totals[mach_id] = machine_totals.get(mach_id, 0) + count
+    return {k: c / machine_totals[k[0]] for k, c in state_counts.items()}
+
+
+def time_call(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[25000, 50000, 100000, 200000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-correlated", action="store_true",
+                        help="only time the single pass query, e.g. for very large row counts")
+    args = parser.parse_args()
+
+    print("%10s %10s %14s %14s %16s" % ("rows", "machines", "correlated s", "single s", "single us/row"))
+    results: List[Tuple[int, float]] = []
+    for num_rows in args.rows:
+        conn, t_start, t_end = build_table(num_rows)
+        binds = {"t_start": t_start, "t_end": t_end}
+
+        t_single = time_call(lambda: single_pass_fractions(conn, t_start, t_end), args.repeat)
+        if args.skip_correlated:
+            t_corr = float("nan")
+        else:
+            t_corr = time_call(lambda: conn.execute(CORRELATED_QUERY, binds).fetchall(), args.repeat)
+
+        results.append((num_rows, t_single))
+        print("%10i %10i %14.4f %14.4f %16.3f" % (num_rows, max(1, num_rows // ROWS_PER_MACHINE),
+                                                   t_corr, t_single, t_single / num_rows * 1e6))
+        conn.close()
+
+    # For linear growth the cost per row stays flat as the row count grows
+    if len(results) > 1:
+        (n0, t0), (n1, t1) = results[0], results[-1]
+        print("single pass growth: %.1fx time for %.1fx rows" % (t1 / t0, n1 / n0))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+Headless report of every analytics metric for the whole fleet.
+
+Runs the AnalyticsDAO and JobAnalyticsDAO metrics of every machine over a range, without opening
+a window, and writes them as one CSV file per metric and/or one JSON document. The machines are
+split into groups that run on a pool of worker processes, each with its own database connection,
+or its own copy of the exports with --exports. Fleet wide metrics run once, as one grouped query
+each. Needs PyQt6, and is run from the application root so src can be imported.
+
+Records are in long form: metric, machine id, machine name, key and value. The key is a state
+for the distributions, an alarm type for the alarm metrics, a unix hour for the time series and
+an hour of the day for the hour profiles. Machines are the ones with status samples in the range,
+unless --machine-ids is given. They are named from the MACHINE table of the database or exports
+read, and by id where it has no name for them.
+
+Usage: python reports/fleet_report.py --start 2023-01-01 --end 2023-02-01
+           (--sqlite FILE | --driver QMYSQL --host HOST --database DB --user USER | --exports FILE...)
+           [--machine-ids 1,2,3] [--workers 4] [--group-size 10] [--format csv|json|both] [--output report]
+The database password is read from the ANALYTICS_DB_PASSWORD environment variable.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.dao.Analytics import AnalyticsDAO, MachineHourProfilePOD  # noqa: E402
+from src.dao.AnalyticsRollup import MachineStatusRollupDAO  # noqa: E402
+from src.dao.JobAnalytics import JobAnalyticsDAO  # noqa: E402
+from src.dao.OfflineAnalytics import OfflineAnalyticsDAO  # noqa: E402
+from src.io.ConnectionPool import connection_pool  # noqa: E402
+
+CONNECTION_NAME = "fleet_report"
+PASSWORD_ENV = "ANALYTICS_DB_PASSWORD"
+# Table naming the machines, in the database and in the exports
+MACHINE_TABLE = "MACHINE"
+
+# metric, machine id, machine name, key, value
+Record = Tuple[str, int, str, Any, float]
+
+# Set up once per worker process by _init_worker
+_app: Optional[QCoreApplication] = None
+_dao: Any = None
+_job_dao: Any = None
+
+
+class ReportMachine:
+    """
+    Stands in for MachinePOD in the worker processes, which are sent the id and name of each
+    machine, the only parts the DAO reads
+    """
+    def __init__(self, mach_id: int, mach_name: str):
+        self._mach_id = mach_id
+        self._mach_name = mach_name
+
+    def get_machine_id(self) -> int:
+        return self._mach_id
+
+    def get_machine_name(self) -> str:
+        return self._mach_name
+
+
+def _init_worker(source: Dict[str, Any]) -> None:
+    """
+    Opens the report's own database connection, or loads the exports, in this process
+    """
+    global _app, _dao, _job_dao
+    _app = QCoreApplication.instance() or QCoreApplication([])  # QtSql drivers need an application instance
+    if source["exports"]:
+        _dao = _job_dao = OfflineAnalyticsDAO.from_files(source["exports"])
+        return
+
+    db = QSqlDatabase.addDatabase(source["driver"], CONNECTION_NAME)
+    db.setDatabaseName(source["database"])
+    if source["host"]:
+        db.setHostName(source["host"])
+    if source["port"]:
+        db.setPort(source["port"])
+    if source["user"]:
+        db.setUserName(source["user"])
+    db.setPassword(os.environ.get(PASSWORD_ENV, ""))
+    if not db.open():
+        raise RuntimeError("Failed to open %s: %s" % (source["database"], db.lastError().text()))
+    connection_pool.set_template(CONNECTION_NAME)
+    _dao = AnalyticsDAO
+    _job_dao = JobAnalyticsDAO
+
+
+def _run(fn, *args) -> List[Record]:
+    """
+    Runs a task on this worker's connection, or without one for exports
+    """
+    if isinstance(_dao, OfflineAnalyticsDAO):
+        return list(fn(*args))
+    with connection_pool.connection() as db:
+        if db is None:
+            raise RuntimeError("No database connection for the report")
+        return list(fn(*args))
+
+
+def _fleet_records(t_start: int, t_end: int, machines: List[ReportMachine]) -> Iterator[Record]:
+    for metric, method, attr in (("state_distribution", "get_machines_state_distribution", "states"),
+                                 ("stateavgprod_distribution", "get_machines_stateavgprod_distribution", "states"),
+                                 ("stateavgspeed_distribution", "get_machines_stateavgspeed_distribution", "states")):
+        for pod in getattr(_dao, method)(t_start, t_end, machines):
+            for state, value in getattr(pod, attr).items():
+                yield metric, pod.mach_id, pod.mach_name, state.name, value
+
+    for pod in _dao.get_machines_goodbad_distribution(t_start, t_end, machines):
+        yield "goodbad_distribution", pod.mach_id, pod.mach_name, "good", pod.mach_goodprod
+        yield "goodbad_distribution", pod.mach_id, pod.mach_name, "bad", pod.mach_badprod
+
+    for pod in _job_dao.get_machines_job_stats(t_start, t_end, machines):
+        for key, value in (("jobs", pod.jobs), ("cycle_time", pod.cycle_time()), ("run_rate", pod.run_rate()),
+                           ("on_time_percentage", pod.on_time_percentage()), ("lead_time", pod.lead_time()),
+                           ("yield_ratio", pod.yield_ratio())):
+            yield "job_stats", pod.mach_id, pod.mach_name, key, value
+
+
+def _group_records(t_start: int, t_end: int, machines: List[ReportMachine]) -> Iterator[Record]:
+    names = {m.get_machine_id(): m.get_machine_name() for m in machines}
+    mach_ids = list(names)
+
+    # One query per profile for the whole group
+    for metric, method in (("avgspeed_hour", "get_machines_avgspeed_hour"),
+                           ("avgprod_hour", "get_machines_avgprod_hour"),
+                           ("goodbadratio_hour", "get_machines_goodbadratio_hour"),
+                           ("uptime_hour", "get_machines_uptime_hour")):
+        profile: Optional[MachineHourProfilePOD] = getattr(_dao, method)(t_start, t_end, mach_ids)
+        if profile is None:
+            continue
+        for mach_id in mach_ids:
+            for hour, value in enumerate(profile.row(mach_id)):
+                yield metric, mach_id, names[mach_id], hour, value
+
+    for m in machines:
+        mach_id = m.get_machine_id()
+        durations = _dao.get_machine_alarm_durations(t_start, t_end, mach_id, machines)
+        if durations is not None:
+            for metric, values in (("alarm_count", durations.to_alarm_count().alarm_counts),
+                                   ("alarm_cleartime", durations.to_alarm_cleartime().alarm_cleartime),
+                                   ("alarm_avgclear", durations.to_alarm_avgclear().alarm_avgclear)):
+                for alarm_type, value in values.items():
+                    yield metric, mach_id, names[mach_id], alarm_type.alarm_desc, value
+
+        for metric, method, attr in (("avgspeed_time", "get_machine_avgspeed_time", "average_speed"),
+                                     ("avgprod_time", "get_machine_avgprod_time", "average_prod")):
+            series = getattr(_dao, method)(t_start, t_end, mach_id, machines)
+            if series is None:
+                continue
+            for hour, value in zip(series.hours, getattr(series, attr)):
+                yield metric, mach_id, names[mach_id], hour, value
+
+
+def _fleet_task(args: Tuple[int, int, List[Tuple[int, str]]]) -> List[Record]:
+    t_start, t_end, machines = args
+    return _run(_fleet_records, t_start, t_end, [ReportMachine(*m) for m in machines])
+
+
+def _group_task(args: Tuple[int, int, List[Tuple[int, str]]]) -> List[Record]:
+    t_start, t_end, machines = args
+    return _run(_group_records, t_start, t_end, [ReportMachine(*m) for m in machines])
+
+
+def _report_machines(t_start: int, t_end: int) -> List[int]:
+    """
+    The machines with status samples in the range, on the calling process's connection or exports
+    """
+    if isinstance(_dao, OfflineAnalyticsDAO):
+        st = _dao.tables["MACHINE_STATUS"]
+        return sorted({int(m) for m, t in zip(st["MACHINE_ID"], st["STS_TIME"]) if t_start <= t <= t_end})
+
+    with connection_pool.connection() as db:
+        query = QSqlQuery(db)
+        query.setForwardOnly(True)
+        query.prepare("SELECT DISTINCT MACHINE_ID FROM MACHINE_STATUS WHERE STS_TIME>=:t_start and STS_TIME<=:t_end")
+        query.bindValue(":t_start", t_start)
+        query.bindValue(":t_end", t_end)
+        if not query.exec():
+            raise RuntimeError("Failed to query the machines: %s" % query.lastError().text())
+        mach_ids = []
+        while query.next():
+            mach_ids.append(int(query.value(0)))
+        return sorted(mach_ids)
+
+
+def _database_machine_names(db: QSqlDatabase) -> Dict[int, str]:
+    """
+    The machine names of the MACHINE table, empty if the database has none
+    """
+    query = QSqlQuery(db)
+    query.setForwardOnly(True)
+    if not query.exec("SELECT MACHINE_ID, MACHINE_NAME FROM %s" % MACHINE_TABLE):
+        print("No machine names, failed to query %s: %s" % (MACHINE_TABLE, query.lastError().text()))
+        return {}
+    names = {}
+    while query.next():
+        if query.value(1):
+            names[int(query.value(0))] = str(query.value(1))
+    return names
+
+
+def _machine_names() -> Dict[int, str]:
+    """
+    The machine names of the calling process's connection or exports
+    """
+    if isinstance(_dao, OfflineAnalyticsDAO):
+        machine = _dao.tables.get(MACHINE_TABLE)
+        if machine is None:
+            print("No machine names, the exports have no %s table" % MACHINE_TABLE)
+            return {}
+        return {int(m): name for m, name in zip(machine["MACHINE_ID"], machine["MACHINE_NAME"])}
+
+    with connection_pool.connection() as db:
+        return _database_machine_names(db)
+
+
+def _named_machines(mach_ids: Sequence[int], names: Dict[int, str]) -> List[ReportMachine]:
+    """
+    The machines of the ids, named by id where names has no name for them
+    """
+    return [ReportMachine(mach_id, names.get(mach_id) or "MACHINE %02i" % mach_id) for mach_id in mach_ids]
+
+
+def run_report(source: Dict[str, Any], t_start: int, t_end: int, mach_ids: Optional[Sequence[int]] = None,
+               workers: int = 4, group_size: int = 10) -> Dict[str, List[Record]]:
+    """
+    Computes every metric of every machine on a pool of worker processes
+    :param source: the database or exports to read, as built by main
+    :param t_start: start of the range, unix time
+    :param t_end: end of the range, unix time
+    :param mach_ids: the machines to report on, None for every machine with status samples in the range
+    :param workers: worker processes, each with its own connection
+    :param group_size: machines per task
+    :return: the records of each metric, by metric
+    """
+    _init_worker(source)
+    if _dao is AnalyticsDAO:
+        # Brought up to date once here, a worker would leave a large backlog to a background thread
+        with connection_pool.connection():
+            if not MachineStatusRollupDAO.refresh():
+                print("Failed to update the hourly rollup, the time series read MACHINE_STATUS")
+    if mach_ids is None:
+        mach_ids = _report_machines(t_start, t_end)
+    machines = [(m.get_machine_id(), m.get_machine_name()) for m in _named_machines(mach_ids, _machine_names())]
+    groups = [machines[i:i + group_size] for i in range(0, len(machines), group_size)]
+
+    records: Dict[str, List[Record]] = {}
+    context = multiprocessing.get_context("spawn")  # no Qt state is inherited from this process
+    with context.Pool(workers, initializer=_init_worker, initargs=(source,)) as pool:
+        fleet = pool.apply_async(_fleet_task, ((t_start, t_end, machines),))
+        for done, group_records in enumerate(pool.imap_unordered(_group_task, [(t_start, t_end, g) for g in groups]),
+                                             start=1):
+            for record in group_records:
+                records.setdefault(record[0], []).append(record)
+            print("%i / %i machine groups done" % (done, len(groups)))
+        for record in fleet.get():
+            records.setdefault(record[0], []).append(record)
+
+    order = {mach_id: i for i, (mach_id, _) in enumerate(machines)}
+    for metric_records in records.values():
+        metric_records.sort(key=lambda r: order[r[1]])  # stable, so keys stay in query order
+    return records
+
+
+def write_csv(records: Dict[str, List[Record]], output: str) -> None:
+    os.makedirs(output, exist_ok=True)
+    for metric, metric_records in sorted(records.items()):
+        with open(os.path.join(output, metric + ".csv"), "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["MACHINE_ID", "MACHINE_NAME", "KEY", "VALUE"])
+            for _, mach_id, mach_name, key, value in metric_records:
+                writer.writerow([mach_id, mach_name, key, value])
+
+
+def write_json(records: Dict[str, List[Record]], output: str, meta: Dict[str, Any]) -> None:
+    os.makedirs(output, exist_ok=True)
+    document = {
+        "meta": meta,
+        "metrics": {metric: [{"mach_id": mach_id, "mach_name": mach_name, "key": key, "value": value}
+                             for _, mach_id, mach_name, key, value in metric_records]
+                    for metric, metric_records in sorted(records.items())},
+    }
+    with open(os.path.join(output, "report.json"), "w") as f:
+        json.dump(document, f, indent=1)
+
+
+def _parse_time(value: str) -> int:
+    """
+    Unix time, or a YYYY-MM-DD date at midnight local time
+    """
+    if value.isdigit():
+        return int(value)
+    return int(time.mktime(time.strptime(value, "%Y-%m-%d")))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", required=True, help="YYYY-MM-DD or unix time, inclusive")
+    parser.add_argument("--end", required=True, help="YYYY-MM-DD or unix time, exclusive")
+    source_args = parser.add_mutually_exclusive_group(required=True)
+    source_args.add_argument("--sqlite", metavar="FILE", help="SQLite database file")
+    source_args.add_argument("--database", help="database name on --host, with --driver")
+    source_args.add_argument("--exports", nargs="+", metavar="FILE", help="CSV/XLSX exports, read offline")
+    parser.add_argument("--driver", default="QMYSQL")
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--user")
+    parser.add_argument("--machine-ids", help="comma separated, default every machine with samples in the range")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--group-size", type=int, default=10, help="machines per task")
+    parser.add_argument("--format", choices=("csv", "json", "both"), default="both")
+    parser.add_argument("--output", default="report", help="directory to write to")
+    args = parser.parse_args()
+
+    source = {
+        "driver": "QSQLITE" if args.sqlite else args.driver,
+        "database": args.sqlite or args.database,
+        "host": args.host,
+        "port": args.port,
+        "user": args.user,
+        "exports": args.exports,
+    }
+    t_start = _parse_time(args.start)
+    t_end = _parse_time(args.end) - 1
+    mach_ids = [int(m) for m in args.machine_ids.split(",")] if args.machine_ids else None
+
+    t = time.perf_counter()
+    records = run_report(source, t_start, t_end, mach_ids, args.workers, args.group_size)
+    elapsed = time.perf_counter() - t
+    print("%i records of %i metrics in %.1f s" % (sum(len(r) for r in records.values()), len(records), elapsed))
+
+    if args.format in ("csv", "both"):
+        write_csv(records, args.output)
+    if args.format in ("json", "both"):
+        write_json(records, args.output, {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "t_start": t_start,
+                                          "t_end": t_end, "seconds": elapsed})
+    print("report written to %s" % args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Index advice for the analytics queries, and the migration that creates the indexes.
+
+Lists the indexes of the tables the analytics queries read, proposes the covering indexes that
+are missing, and captures the EXPLAIN plan of every AnalyticsDAO and JobAnalyticsDAO query over
+a range. With --apply it then runs the pending schema migrations, captures the plans again and
+reports which plans changed and how the query times moved. Existing indexes a proposed one makes
+redundant are listed, not dropped. Needs PyQt6, and is run from the application root so src can
+be imported.
+
+Usage: python reports/index_advisor.py --start 2023-01-01 --end 2023-02-01
+           (--sqlite FILE | --driver QMYSQL --host HOST --database DB --user USER)
+           [--machine-ids 1,2,3] [--apply] [--output index_report.json]
+The database password is read from the ANALYTICS_DB_PASSWORD environment variable.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.dao.SchemaAdvisor import SchemaAdvisorDAO, MIGRATIONS, PlanChangePOD  # noqa: E402
+from src.dao.QueryMetrics import metrics  # noqa: E402
+from src.io.ConnectionPool import connection_pool  # noqa: E402
+from fleet_report import ReportMachine, _database_machine_names, _named_machines, _parse_time, PASSWORD_ENV  # noqa: E402
+
+CONNECTION_NAME = "index_advisor"
+
+
+def _open_database(args: argparse.Namespace) -> None:
+    db = QSqlDatabase.addDatabase("QSQLITE" if args.sqlite else args.driver, CONNECTION_NAME)
+    db.setDatabaseName(args.sqlite or args.database)
+    if args.host:
+        db.setHostName(args.host)
+    if args.port:
+        db.setPort(args.port)
+    if args.user:
+        db.setUserName(args.user)
+    db.setPassword(os.environ.get(PASSWORD_ENV, ""))
+    if not db.open():
+        sys.exit("Failed to open %s: %s" % (args.sqlite or args.database, db.lastError().text()))
+    connection_pool.set_template(CONNECTION_NAME)
+
+
+def _machines(db: QSqlDatabase, t_start: int, t_end: int, mach_ids: Optional[List[int]]) -> List[ReportMachine]:
+    """
+    The machines with status samples in the range, only the given ones if any, named from the database.
+    Exits if there are none, the plans of queries over no machine say nothing.
+    """
+    query = QSqlQuery(db)
+    query.prepare("SELECT DISTINCT MACHINE_ID FROM MACHINE_STATUS WHERE STS_TIME>=:t_start and STS_TIME<=:t_end")
+    query.bindValue(":t_start", t_start)
+    query.bindValue(":t_end", t_end)
+    if not query.exec():
+        sys.exit("Failed to query the machines: %s" % query.lastError().text())
+    sampled = set()
+    while query.next():
+        sampled.add(int(query.value(0)))
+    selected = sorted(sampled if mach_ids is None else sampled.intersection(mach_ids))
+    if not selected:
+        sys.exit("No %smachines with status samples in the range" % ("" if mach_ids is None else "given "))
+    return _named_machines(selected, _database_machine_names(db))
+
+
+def _print_indexes() -> Dict[str, Dict[str, List[str]]]:
+    tables = {}
+    for table in sorted({index.table for migration in MIGRATIONS for index in migration.indexes}):
+        tables[table] = SchemaAdvisorDAO.existing_indexes(table)
+        print("%s indexes:" % table)
+        for name, columns in sorted(tables[table].items()):
+            print("    %s (%s)" % (name, ", ".join(columns)))
+    return tables
+
+
+def _print_plan(plan: Optional[List[str]], indent: str = "        ") -> None:
+    for line in plan if plan is not None else ["(no plan)"]:
+        print(indent + line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", required=True, help="YYYY-MM-DD or unix time, inclusive")
+    parser.add_argument("--end", required=True, help="YYYY-MM-DD or unix time, exclusive")
+    source_args = parser.add_mutually_exclusive_group(required=True)
+    source_args.add_argument("--sqlite", metavar="FILE", help="SQLite database file")
+    source_args.add_argument("--database", help="database name on --host, with --driver")
+    parser.add_argument("--driver", default="QMYSQL")
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--user")
+    parser.add_argument("--machine-ids", help="comma separated, default every machine with samples in the range")
+    parser.add_argument("--apply", action="store_true", help="run the pending schema migrations")
+    parser.add_argument("--output", help="JSON file to write the report to")
+    args = parser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication([])  # QtSql drivers need an application instance
+    _open_database(args)
+    t_start = _parse_time(args.start)
+    t_end = _parse_time(args.end) - 1
+    metrics.enabled = True
+
+    report: Dict[str, Any] = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "t_start": t_start, "t_end": t_end}
+    with connection_pool.connection() as db:
+        if db is None:
+            sys.exit("No database connection")
+        machines = _machines(db, t_start, t_end,
+                             [int(m) for m in args.machine_ids.split(",")] if args.machine_ids else None)
+        report["indexes_before"] = _print_indexes()
+        proposed = SchemaAdvisorDAO.propose()
+        report["proposed"] = [{"name": i.name, "table": i.table, "columns": i.columns,
+                               "supersedes": i.supersedes(report["indexes_before"][i.table])} for i in proposed]
+        print("\nProposed indexes:" if proposed else "\nNo missing indexes")
+        for index in proposed:
+            print("    " + index.create_sql())
+            superseded = index.supersedes(report["indexes_before"][index.table])
+            if superseded:
+                print("        makes redundant: %s" % ", ".join(superseded))
+
+        before = SchemaAdvisorDAO.explain_queries(t_start, t_end, machines)
+        if not args.apply:
+            print("\nCurrent plans:")
+            for method, timing in sorted(before.items()):
+                print("    %s, %.1f ms" % (method, timing.total_s() * 1e3))
+                _print_plan(timing.plan)
+            report["plans"] = {method: {"plan": timing.plan, "seconds": timing.total_s()}
+                               for method, timing in before.items()}
+        else:
+            created = SchemaAdvisorDAO.migrate()
+            if created is None:
+                sys.exit("Schema migration failed, see the log")
+            print("\nCreated %i indexes" % len(created))
+            after = SchemaAdvisorDAO.explain_queries(t_start, t_end, machines)
+            changes: List[PlanChangePOD] = SchemaAdvisorDAO.compare_plans(before, after)
+            print("\nPlan changes:")
+            for change in changes:
+                print("    %s, %.1f ms -> %.1f ms%s" % (change.method, change.before_s * 1e3, change.after_s * 1e3,
+                                                      "" if change.changed() else ", plan unchanged"))
+                if change.changed():
+                    print("      before:")
+                    _print_plan(change.before)
+                    print("      after:")
+                    _print_plan(change.after)
+            report["created"] = [index.name for index in created]
+            report["indexes_after"] = {table: SchemaAdvisorDAO.existing_indexes(table)
+                                       for table in report["indexes_before"]}
+            report["plan_changes"] = [vars(change) for change in changes]
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+        print("report written to %s" % args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,253 +1,253 @@
-# Form implementation generated from reading ui file 'C:\Users\chuyigao\PycharmProjects\MachineManagerV1\ui\AnalyticsView.ui'
-#
-# Created by: PyQt6 UI code generator 6.3.1
-#
-# WARNING: Any manual changes made to this file will be lost when pyuic6 is
-# run again.  Do not edit this file unless you know what you are doing.
-
-
-from PyQt6 import QtCore, QtGui, QtWidgets
-
-
-class Ui_AnalyticsView(object):
-    def setupUi(self, AnalyticsView):
-        AnalyticsView.setObjectName("AnalyticsView")
-        AnalyticsView.resize(992, 731)
-        self.horizontalLayout_2 = QtWidgets.QHBoxLayout(AnalyticsView)
-        self.horizontalLayout_2.setObjectName("horizontalLayout_2")
-        self.verticalLayout = QtWidgets.QVBoxLayout()
-        self.verticalLayout.setObjectName("verticalLayout")
-        self.horizontalLayout = QtWidgets.QHBoxLayout()
-        self.horizontalLayout.setObjectName("horizontalLayout")
-        self.pbLoad = QtWidgets.QPushButton(AnalyticsView)
-        self.pbLoad.setObjectName("pbLoad")
-        self.horizontalLayout.addWidget(self.pbLoad)
-        self.cmbMachine = QtWidgets.QComboBox(AnalyticsView)
-        self.cmbMachine.setObjectName("cmbMachine")
-        self.horizontalLayout.addWidget(self.cmbMachine)
-        self.dteStartTime = QtWidgets.QDateTimeEdit(AnalyticsView)
-        self.dteStartTime.setObjectName("dteStartTime")
-        self.horizontalLayout.addWidget(self.dteStartTime)
-        self.dteEndTime = QtWidgets.QDateTimeEdit(AnalyticsView)
-        self.dteEndTime.setObjectName("dteEndTime")
-        self.horizontalLayout.addWidget(self.dteEndTime)
-        self.verticalLayout.addLayout(self.horizontalLayout)
-        self.tabWidget = QtWidgets.QTabWidget(AnalyticsView)
-        self.tabWidget.setObjectName("tabWidget")
-        self.DescriptiveAnalysis = QtWidgets.QWidget()
-        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Expanding)
-        sizePolicy.setHorizontalStretch(0)
-        sizePolicy.setVerticalStretch(0)
-        sizePolicy.setHeightForWidth(self.DescriptiveAnalysis.sizePolicy().hasHeightForWidth())
-        self.DescriptiveAnalysis.setSizePolicy(sizePolicy)
-        self.DescriptiveAnalysis.setMaximumSize(QtCore.QSize(16777215, 16777215))
-        self.DescriptiveAnalysis.setObjectName("DescriptiveAnalysis")
-        self.verticalLayout_2 = QtWidgets.QVBoxLayout(self.DescriptiveAnalysis)
-        self.verticalLayout_2.setObjectName("verticalLayout_2")
-        self.tblvMachineProd = QtWidgets.QTableView(self.DescriptiveAnalysis)
-        self.tblvMachineProd.setObjectName("tblvMachineProd")
-        self.verticalLayout_2.addWidget(self.tblvMachineProd)
-        self.tblvMachineSpeed = QtWidgets.QTableView(self.DescriptiveAnalysis)
-        self.tblvMachineSpeed.setObjectName("tblvMachineSpeed")
-        self.verticalLayout_2.addWidget(self.tblvMachineSpeed)
-        self.tabWidget.addTab(self.DescriptiveAnalysis, "")
-        self.FrequencyAnalysis = QtWidgets.QWidget()
-        self.FrequencyAnalysis.setObjectName("FrequencyAnalysis")
-        self.horizontalLayout_14 = QtWidgets.QHBoxLayout(self.FrequencyAnalysis)
-        self.horizontalLayout_14.setObjectName("horizontalLayout_14")
-        self.tab_frequency_main = QtWidgets.QTabWidget(self.FrequencyAnalysis)
-        self.tab_frequency_main.setObjectName("tab_frequency_main")
-        self.tab_frequency_state = QtWidgets.QWidget()
-        self.tab_frequency_state.setObjectName("tab_frequency_state")
-        self.horizontalLayout_15 = QtWidgets.QHBoxLayout(self.tab_frequency_state)
-        self.horizontalLayout_15.setObjectName("horizontalLayout_15")
-        self.qwdg_frequency_state = QtWidgets.QTabWidget(self.tab_frequency_state)
-        self.qwdg_frequency_state.setObjectName("qwdg_frequency_state")
-        self.tab_frequency_state_total = QtWidgets.QWidget()
-        self.tab_frequency_state_total.setObjectName("tab_frequency_state_total")
-        self.horizontalLayout_18 = QtWidgets.QHBoxLayout(self.tab_frequency_state_total)
-        self.horizontalLayout_18.setObjectName("horizontalLayout_18")
-        self.gfxview_statetime_machine = QChartView(self.tab_frequency_state_total)
-        self.gfxview_statetime_machine.setObjectName("gfxview_statetime_machine")
-        self.horizontalLayout_18.addWidget(self.gfxview_statetime_machine)
-        self.qwdg_frequency_state.addTab(self.tab_frequency_state_total, "")
-        self.tab_frequency_state_avgspeed = QtWidgets.QWidget()
-        self.tab_frequency_state_avgspeed.setObjectName("tab_frequency_state_avgspeed")
-        self.horizontalLayout_19 = QtWidgets.QHBoxLayout(self.tab_frequency_state_avgspeed)
-        self.horizontalLayout_19.setObjectName("horizontalLayout_19")
-        self.gfxview_avgspeed_state_machine = QChartView(self.tab_frequency_state_avgspeed)
-        self.gfxview_avgspeed_state_machine.setObjectName("gfxview_avgspeed_state_machine")
-        self.horizontalLayout_19.addWidget(self.gfxview_avgspeed_state_machine)
-        self.qwdg_frequency_state.addTab(self.tab_frequency_state_avgspeed, "")
-        self.tab_frequency_state_avgprod = QtWidgets.QWidget()
-        self.tab_frequency_state_avgprod.setObjectName("tab_frequency_state_avgprod")
-        self.horizontalLayout_20 = QtWidgets.QHBoxLayout(self.tab_frequency_state_avgprod)
-        self.horizontalLayout_20.setObjectName("horizontalLayout_20")
-        self.gfxview_avgprod_state_machine = QChartView(self.tab_frequency_state_avgprod)
-        self.gfxview_avgprod_state_machine.setObjectName("gfxview_avgprod_state_machine")
-        self.horizontalLayout_20.addWidget(self.gfxview_avgprod_state_machine)
-        self.qwdg_frequency_state.addTab(self.tab_frequency_state_avgprod, "")
-        self.horizontalLayout_15.addWidget(self.qwdg_frequency_state)
-        self.tab_frequency_main.addTab(self.tab_frequency_state, "")
-        self.tab_frequency_alarm = QtWidgets.QWidget()
-        self.tab_frequency_alarm.setObjectName("tab_frequency_alarm")
-        self.horizontalLayout_16 = QtWidgets.QHBoxLayout(self.tab_frequency_alarm)
-        self.horizontalLayout_16.setObjectName("horizontalLayout_16")
-        self.qwdg_frequency_alarm = QtWidgets.QTabWidget(self.tab_frequency_alarm)
-        self.qwdg_frequency_alarm.setObjectName("qwdg_frequency_alarm")
-        self.tab_frequency_alarm_count = QtWidgets.QWidget()
-        self.tab_frequency_alarm_count.setObjectName("tab_frequency_alarm_count")
-        self.horizontalLayout_22 = QtWidgets.QHBoxLayout(self.tab_frequency_alarm_count)
-        self.horizontalLayout_22.setObjectName("horizontalLayout_22")
-        self.gfxview_alarm_count_machine = QChartView(self.tab_frequency_alarm_count)
-        self.gfxview_alarm_count_machine.setObjectName("gfxview_alarm_count_machine")
-        self.horizontalLayout_22.addWidget(self.gfxview_alarm_count_machine)
-        self.qwdg_frequency_alarm.addTab(self.tab_frequency_alarm_count, "")
-        self.tab_frequency_alarm_cleartime = QtWidgets.QWidget()
-        self.tab_frequency_alarm_cleartime.setObjectName("tab_frequency_alarm_cleartime")
-        self.horizontalLayout_23 = QtWidgets.QHBoxLayout(self.tab_frequency_alarm_cleartime)
-        self.horizontalLayout_23.setObjectName("horizontalLayout_23")
-        self.gfxview_alarm_cleartime = QChartView(self.tab_frequency_alarm_cleartime)
-        self.gfxview_alarm_cleartime.setObjectName("gfxview_alarm_cleartime")
-        self.horizontalLayout_23.addWidget(self.gfxview_alarm_cleartime)
-        self.qwdg_frequency_alarm.addTab(self.tab_frequency_alarm_cleartime, "")
-        self.tab_frequency_alarm_avgcleartime = QtWidgets.QWidget()
-        self.tab_frequency_alarm_avgcleartime.setObjectName("tab_frequency_alarm_avgcleartime")
-        self.horizontalLayout_21 = QtWidgets.QHBoxLayout(self.tab_frequency_alarm_avgcleartime)
-        self.horizontalLayout_21.setObjectName("horizontalLayout_21")
-        self.gfxview_avgclear = QChartView(self.tab_frequency_alarm_avgcleartime)
-        self.gfxview_avgclear.setObjectName("gfxview_avgclear")
-        self.horizontalLayout_21.addWidget(self.gfxview_avgclear)
-        self.qwdg_frequency_alarm.addTab(self.tab_frequency_alarm_avgcleartime, "")
-        self.horizontalLayout_16.addWidget(self.qwdg_frequency_alarm)
-        self.tab_frequency_main.addTab(self.tab_frequency_alarm, "")
-        self.tab_frequency_goodbad = QtWidgets.QWidget()
-        self.tab_frequency_goodbad.setObjectName("tab_frequency_goodbad")
-        self.horizontalLayout_17 = QtWidgets.QHBoxLayout(self.tab_frequency_goodbad)
-        self.horizontalLayout_17.setObjectName("horizontalLayout_17")
-        self.qwdg_frequency_goodbad = QtWidgets.QTabWidget(self.tab_frequency_goodbad)
-        self.qwdg_frequency_goodbad.setObjectName("qwdg_frequency_goodbad")
-        self.tab_frequency_goodbad_bad = QtWidgets.QWidget()
-        self.tab_frequency_goodbad_bad.setObjectName("tab_frequency_goodbad_bad")
-        self.horizontalLayout_26 = QtWidgets.QHBoxLayout(self.tab_frequency_goodbad_bad)
-        self.horizontalLayout_26.setObjectName("horizontalLayout_26")
-        self.gfxview_goodbadprod_machine = QChartView(self.tab_frequency_goodbad_bad)
-        self.gfxview_goodbadprod_machine.setObjectName("gfxview_goodbadprod_machine")
-        self.horizontalLayout_26.addWidget(self.gfxview_goodbadprod_machine)
-        self.qwdg_frequency_goodbad.addTab(self.tab_frequency_goodbad_bad, "")
-        self.horizontalLayout_17.addWidget(self.qwdg_frequency_goodbad)
-        self.tab_frequency_main.addTab(self.tab_frequency_goodbad, "")
-        self.horizontalLayout_14.addWidget(self.tab_frequency_main)
-        self.tabWidget.addTab(self.FrequencyAnalysis, "")
-        self.TimeSeriesAnalysis = QtWidgets.QWidget()
-        self.TimeSeriesAnalysis.setObjectName("TimeSeriesAnalysis")
-        self.horizontalLayout_5 = QtWidgets.QHBoxLayout(self.TimeSeriesAnalysis)
-        self.horizontalLayout_5.setObjectName("horizontalLayout_5")
-        self.tab_timeseriesanalysis_maintab = QtWidgets.QTabWidget(self.TimeSeriesAnalysis)
-        self.tab_timeseriesanalysis_maintab.setObjectName("tab_timeseriesanalysis_maintab")
-        self.tab_timeseries_time = QtWidgets.QWidget()
-        self.tab_timeseries_time.setObjectName("tab_timeseries_time")
-        self.horizontalLayout_7 = QtWidgets.QHBoxLayout(self.tab_timeseries_time)
-        self.horizontalLayout_7.setObjectName("horizontalLayout_7")
-        self.qwdg_timeseries_time = QtWidgets.QTabWidget(self.tab_timeseries_time)
-        self.qwdg_timeseries_time.setObjectName("qwdg_timeseries_time")
-        self.tab_avgspeed_time = QtWidgets.QWidget()
-        self.tab_avgspeed_time.setObjectName("tab_avgspeed_time")
-        self.horizontalLayout_12 = QtWidgets.QHBoxLayout(self.tab_avgspeed_time)
-        self.horizontalLayout_12.setObjectName("horizontalLayout_12")
-        self.gfxview_avgspeed_time = QChartView(self.tab_avgspeed_time)
-        self.gfxview_avgspeed_time.setObjectName("gfxview_avgspeed_time")
-        self.horizontalLayout_12.addWidget(self.gfxview_avgspeed_time)
-        self.qwdg_timeseries_time.addTab(self.tab_avgspeed_time, "")
-        self.tab_avgprod_time = QtWidgets.QWidget()
-        self.tab_avgprod_time.setObjectName("tab_avgprod_time")
-        self.horizontalLayout_8 = QtWidgets.QHBoxLayout(self.tab_avgprod_time)
-        self.horizontalLayout_8.setObjectName("horizontalLayout_8")
-        self.gfxview_avgprod_time = QChartView(self.tab_avgprod_time)
-        self.gfxview_avgprod_time.setObjectName("gfxview_avgprod_time")
-        self.horizontalLayout_8.addWidget(self.gfxview_avgprod_time)
-        self.qwdg_timeseries_time.addTab(self.tab_avgprod_time, "")
-        self.horizontalLayout_7.addWidget(self.qwdg_timeseries_time)
-        self.tab_timeseriesanalysis_maintab.addTab(self.tab_timeseries_time, "")
-        self.tab_timeseries_hour = QtWidgets.QWidget()
-        self.tab_timeseries_hour.setObjectName("tab_timeseries_hour")
-        self.horizontalLayout_6 = QtWidgets.QHBoxLayout(self.tab_timeseries_hour)
-        self.horizontalLayout_6.setObjectName("horizontalLayout_6")
-        self.qwdg_timeseries_hour = QtWidgets.QTabWidget(self.tab_timeseries_hour)
-        self.qwdg_timeseries_hour.setObjectName("qwdg_timeseries_hour")
-        self.tab_avgspeed_hour = QtWidgets.QWidget()
-        self.tab_avgspeed_hour.setObjectName("tab_avgspeed_hour")
-        self.horizontalLayout_13 = QtWidgets.QHBoxLayout(self.tab_avgspeed_hour)
-        self.horizontalLayout_13.setObjectName("horizontalLayout_13")
-        self.gfxview_avgspeed_hour = QChartView(self.tab_avgspeed_hour)
-        self.gfxview_avgspeed_hour.setObjectName("gfxview_avgspeed_hour")
-        self.horizontalLayout_13.addWidget(self.gfxview_avgspeed_hour)
-        self.qwdg_timeseries_hour.addTab(self.tab_avgspeed_hour, "")
-        self.tab_avgprod_hour = QtWidgets.QWidget()
-        self.tab_avgprod_hour.setObjectName("tab_avgprod_hour")
-        self.horizontalLayout_27 = QtWidgets.QHBoxLayout(self.tab_avgprod_hour)
-        self.horizontalLayout_27.setObjectName("horizontalLayout_27")
-        self.gfxview_avgprod_hour = QChartView(self.tab_avgprod_hour)
-        self.gfxview_avgprod_hour.setObjectName("gfxview_avgprod_hour")
-        self.horizontalLayout_27.addWidget(self.gfxview_avgprod_hour)
-        self.qwdg_timeseries_hour.addTab(self.tab_avgprod_hour, "")
-        self.tab_goodbadratio_hour = QtWidgets.QWidget()
-        self.tab_goodbadratio_hour.setObjectName("tab_goodbadratio_hour")
-        self.horizontalLayout_29 = QtWidgets.QHBoxLayout(self.tab_goodbadratio_hour)
-        self.horizontalLayout_29.setObjectName("horizontalLayout_29")
-        self.gfxview_goodbadratio_hour = QChartView(self.tab_goodbadratio_hour)
-        self.gfxview_goodbadratio_hour.setObjectName("gfxview_goodbadratio_hour")
-        self.horizontalLayout_29.addWidget(self.gfxview_goodbadratio_hour)
-        self.qwdg_timeseries_hour.addTab(self.tab_goodbadratio_hour, "")
-        self.tab_uptime_hour = QtWidgets.QWidget()
-        self.tab_uptime_hour.setObjectName("tab_uptime_hour")
-        self.horizontalLayout_30 = QtWidgets.QHBoxLayout(self.tab_uptime_hour)
-        self.horizontalLayout_30.setObjectName("horizontalLayout_30")
-        self.gfxview_uptime_hour = QChartView(self.tab_uptime_hour)
-        self.gfxview_uptime_hour.setObjectName("gfxview_uptime_hour")
-        self.horizontalLayout_30.addWidget(self.gfxview_uptime_hour)
-        self.qwdg_timeseries_hour.addTab(self.tab_uptime_hour, "")
-        self.horizontalLayout_6.addWidget(self.qwdg_timeseries_hour)
-        self.tab_timeseriesanalysis_maintab.addTab(self.tab_timeseries_hour, "")
-        self.horizontalLayout_5.addWidget(self.tab_timeseriesanalysis_maintab)
-        self.tabWidget.addTab(self.TimeSeriesAnalysis, "")
-        self.verticalLayout.addWidget(self.tabWidget)
-        self.horizontalLayout_2.addLayout(self.verticalLayout)
-
-        self.retranslateUi(AnalyticsView)
-        self.tabWidget.setCurrentIndex(1)
-        self.tab_frequency_main.setCurrentIndex(1)
-        self.qwdg_frequency_state.setCurrentIndex(2)
-        self.qwdg_frequency_alarm.setCurrentIndex(1)
-        self.qwdg_frequency_goodbad.setCurrentIndex(0)
-        self.tab_timeseriesanalysis_maintab.setCurrentIndex(0)
-        self.qwdg_timeseries_time.setCurrentIndex(0)
-        self.qwdg_timeseries_hour.setCurrentIndex(3)
-        QtCore.QMetaObject.connectSlotsByName(AnalyticsView)
-
-    def retranslateUi(self, AnalyticsView):
-        _translate = QtCore.QCoreApplication.translate
-        AnalyticsView.setWindowTitle(_translate("AnalyticsView", "Form"))
-        self.pbLoad.setText(_translate("AnalyticsView", "Load"))
-        self.tabWidget.setTabText(self.tabWidget.indexOf(self.DescriptiveAnalysis), _translate("AnalyticsView", "Descriptive Analysis"))
-        self.qwdg_frequency_state.setTabText(self.qwdg_frequency_state.indexOf(self.tab_frequency_state_total), _translate("AnalyticsView", "Total_time"))
-        self.qwdg_frequency_state.setTabText(self.qwdg_frequency_state.indexOf(self.tab_frequency_state_avgspeed), _translate("AnalyticsView", "Average_speed"))
-        self.qwdg_frequency_state.setTabText(self.qwdg_frequency_state.indexOf(self.tab_frequency_state_avgprod), _translate("AnalyticsView", "Average_production"))
-        self.tab_frequency_main.setTabText(self.tab_frequency_main.indexOf(self.tab_frequency_state), _translate("AnalyticsView", "State"))
-        self.qwdg_frequency_alarm.setTabText(self.qwdg_frequency_alarm.indexOf(self.tab_frequency_alarm_count), _translate("AnalyticsView", "Alarm Count"))
-        self.qwdg_frequency_alarm.setTabText(self.qwdg_frequency_alarm.indexOf(self.tab_frequency_alarm_cleartime), _translate("AnalyticsView", "Alarm Clear Time"))
-        self.qwdg_frequency_alarm.setTabText(self.qwdg_frequency_alarm.indexOf(self.tab_frequency_alarm_avgcleartime), _translate("AnalyticsView", "Average Alarm Clear Time"))
-        self.tab_frequency_main.setTabText(self.tab_frequency_main.indexOf(self.tab_frequency_alarm), _translate("AnalyticsView", "Alarm"))
-        self.qwdg_frequency_goodbad.setTabText(self.qwdg_frequency_goodbad.indexOf(self.tab_frequency_goodbad_bad), _translate("AnalyticsView", "Good/Bad Production"))
-        self.tab_frequency_main.setTabText(self.tab_frequency_main.indexOf(self.tab_frequency_goodbad), _translate("AnalyticsView", "Good/Bad"))
-        self.tabWidget.setTabText(self.tabWidget.indexOf(self.FrequencyAnalysis), _translate("AnalyticsView", "Frequency Analysis"))
-        self.qwdg_timeseries_time.setTabText(self.qwdg_timeseries_time.indexOf(self.tab_avgspeed_time), _translate("AnalyticsView", "Average Speed"))
-        self.qwdg_timeseries_time.setTabText(self.qwdg_timeseries_time.indexOf(self.tab_avgprod_time), _translate("AnalyticsView", "Average Prod"))
-        self.tab_timeseriesanalysis_maintab.setTabText(self.tab_timeseriesanalysis_maintab.indexOf(self.tab_timeseries_time), _translate("AnalyticsView", "Time"))
-        self.qwdg_timeseries_hour.setTabText(self.qwdg_timeseries_hour.indexOf(self.tab_avgspeed_hour), _translate("AnalyticsView", "Average Speed"))
-        self.qwdg_timeseries_hour.setTabText(self.qwdg_timeseries_hour.indexOf(self.tab_avgprod_hour), _translate("AnalyticsView", "Average Production"))
-        self.qwdg_timeseries_hour.setTabText(self.qwdg_timeseries_hour.indexOf(self.tab_goodbadratio_hour), _translate("AnalyticsView", "Good/Bad Ratio"))
-        self.qwdg_timeseries_hour.setTabText(self.qwdg_timeseries_hour.indexOf(self.tab_uptime_hour), _translate("AnalyticsView", "Uptime Percent"))
-        self.tab_timeseriesanalysis_maintab.setTabText(self.tab_timeseriesanalysis_maintab.indexOf(self.tab_timeseries_hour), _translate("AnalyticsView", "Hour"))
-        self.tabWidget.setTabText(self.tabWidget.indexOf(self.TimeSeriesAnalysis), _translate("AnalyticsView", "Time Series Analysis"))
-from PyQt6.QtCharts import QChartView
+# Form implementation generated from reading ui file 'C:\Users\chuyigao\PycharmProjects\MachineManagerV1\ui\AnalyticsView.ui'
+#
+# Created by: PyQt6 UI code generator 6.3.1
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic6 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+
+class Ui_AnalyticsView(object):
+    def setupUi(self, AnalyticsView):
+        AnalyticsView.setObjectName("AnalyticsView")
+        AnalyticsView.resize(992, 731)
+        self.horizontalLayout_2 = QtWidgets.QHBoxLayout(AnalyticsView)
+        self.horizontalLayout_2.setObjectName("horizontalLayout_2")
+        self.verticalLayout = QtWidgets.QVBoxLayout()
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.horizontalLayout = QtWidgets.QHBoxLayout()
+        self.horizontalLayout.setObjectName("horizontalLayout")
+        self.pbLoad = QtWidgets.QPushButton(AnalyticsView)
+        self.pbLoad.setObjectName("pbLoad")
+        self.horizontalLayout.addWidget(self.pbLoad)
+        self.cmbMachine = QtWidgets.QComboBox(AnalyticsView)
+        self.cmbMachine.setObjectName("cmbMachine")
+        self.horizontalLayout.addWidget(self.cmbMachine)
+        self.dteStartTime = QtWidgets.QDateTimeEdit(AnalyticsView)
+        self.dteStartTime.setObjectName("dteStartTime")
+        self.horizontalLayout.addWidget(self.dteStartTime)
+        self.dteEndTime = QtWidgets.QDateTimeEdit(AnalyticsView)
+        self.dteEndTime.setObjectName("dteEndTime")
+        self.horizontalLayout.addWidget(self.dteEndTime)
+        self.verticalLayout.addLayout(self.horizontalLayout)
+        self.tabWidget = QtWidgets.QTabWidget(AnalyticsView)
+        self.tabWidget.setObjectName("tabWidget")
+        self.DescriptiveAnalysis = QtWidgets.QWidget()
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.DescriptiveAnalysis.sizePolicy().hasHeightForWidth())
+        self.DescriptiveAnalysis.setSizePolicy(sizePolicy)
+        self.DescriptiveAnalysis.setMaximumSize(QtCore.QSize(16777215, 16777215))
+        self.DescriptiveAnalysis.setObjectName("DescriptiveAnalysis")
+        self.verticalLayout_2 = QtWidgets.QVBoxLayout(self.DescriptiveAnalysis)
+        self.verticalLayout_2.setObjectName("verticalLayout_2")
+        self.tblvMachineProd = QtWidgets.QTableView(self.DescriptiveAnalysis)
+        self.tblvMachineProd.setObjectName("tblvMachineProd")
+        self.verticalLayout_2.addWidget(self.tblvMachineProd)
+        self.tblvMachineSpeed = QtWidgets.QTableView(self.DescriptiveAnalysis)
+        self.tblvMachineSpeed.setObjectName("tblvMachineSpeed")
+        self.verticalLayout_2.addWidget(self.tblvMachineSpeed)
+        self.tabWidget.addTab(self.DescriptiveAnalysis, "")
+        self.FrequencyAnalysis = QtWidgets.QWidget()
+        self.FrequencyAnalysis.setObjectName("FrequencyAnalysis")
+        self.horizontalLayout_14 = QtWidgets.QHBoxLayout(self.FrequencyAnalysis)
+        self.horizontalLayout_14.setObjectName("horizontalLayout_14")
+        self.tab_frequency_main = QtWidgets.QTabWidget(self.FrequencyAnalysis)
+        self.tab_frequency_main.setObjectName("tab_frequency_main")
+        self.tab_frequency_state = QtWidgets.QWidget()
+        self.tab_frequency_state.setObjectName("tab_frequency_state")
+        self.horizontalLayout_15 = QtWidgets.QHBoxLayout(self.tab_frequency_state)
+        self.horizontalLayout_15.setObjectName("horizontalLayout_15")
+        self.qwdg_frequency_state = QtWidgets.QTabWidget(self.tab_frequency_state)
+        self.qwdg_frequency_state.setObjectName("qwdg_frequency_state")
+        self.tab_frequency_state_total = QtWidgets.QWidget()
+        self.tab_frequency_state_total.setObjectName("tab_frequency_state_total")
+        self.horizontalLayout_18 = QtWidgets.QHBoxLayout(self.tab_frequency_state_total)
+        self.horizontalLayout_18.setObjectName("horizontalLayout_18")
+        self.gfxview_statetime_machine = QChartView(self.tab_frequency_state_total)
+        self.gfxview_statetime_machine.setObjectName("gfxview_statetime_machine")
+        self.horizontalLayout_18.addWidget(self.gfxview_statetime_machine)
+        self.qwdg_frequency_state.addTab(self.tab_frequency_state_total, "")
+        self.tab_frequency_state_avgspeed = QtWidgets.QWidget()
+        self.tab_frequency_state_avgspeed.setObjectName("tab_frequency_state_avgspeed")
+        self.horizontalLayout_19 = QtWidgets.QHBoxLayout(self.tab_frequency_state_avgspeed)
+        self.horizontalLayout_19.setObjectName("horizontalLayout_19")
+        self.gfxview_avgspeed_state_machine = QChartView(self.tab_frequency_state_avgspeed)
+        self.gfxview_avgspeed_state_machine.setObjectName("gfxview_avgspeed_state_machine")
+        self.horizontalLayout_19.addWidget(self.gfxview_avgspeed_state_machine)
+        self.qwdg_frequency_state.addTab(self.tab_frequency_state_avgspeed, "")
+        self.tab_frequency_state_avgprod = QtWidgets.QWidget()
+        self.tab_frequency_state_avgprod.setObjectName("tab_frequency_state_avgprod")
+        self.horizontalLayout_20 = QtWidgets.QHBoxLayout(self.tab_frequency_state_avgprod)
+        self.horizontalLayout_20.setObjectName("horizontalLayout_20")
+        self.gfxview_avgprod_state_machine = QChartView(self.tab_frequency_state_avgprod)
+        self.gfxview_avgprod_state_machine.setObjectName("gfxview_avgprod_state_machine")
+        self.horizontalLayout_20.addWidget(self.gfxview_avgprod_state_machine)
+        self.qwdg_frequency_state.addTab(self.tab_frequency_state_avgprod, "")
+        self.horizontalLayout_15.addWidget(self.qwdg_frequency_state)
+        self.tab_frequency_main.addTab(self.tab_frequency_state, "")
+        self.tab_frequency_alarm = QtWidgets.QWidget()
+        self.tab_frequency_alarm.setObjectName("tab_frequency_alarm")
+        self.horizontalLayout_16 = QtWidgets.QHBoxLayout(self.tab_frequency_alarm)
+        self.horizontalLayout_16.setObjectName("horizontalLayout_16")
+        self.qwdg_frequency_alarm = QtWidgets.QTabWidget(self.tab_frequency_alarm)
+        self.qwdg_frequency_alarm.setObjectName("qwdg_frequency_alarm")
+        self.tab_frequency_alarm_count = QtWidgets.QWidget()
+        self.tab_frequency_alarm_count.setObjectName("tab_frequency_alarm_count")
+        self.horizontalLayout_22 = QtWidgets.QHBoxLayout(self.tab_frequency_alarm_count)
+        self.horizontalLayout_22.setObjectName("horizontalLayout_22")
+        self.gfxview_alarm_count_machine = QChartView(self.tab_frequency_alarm_count)
+        self.gfxview_alarm_count_machine.setObjectName("gfxview_alarm_count_machine")
+        self.horizontalLayout_22.addWidget(self.gfxview_alarm_count_machine)
+        self.qwdg_frequency_alarm.addTab(self.tab_frequency_alarm_count, "")
+        self.tab_frequency_alarm_cleartime = QtWidgets.QWidget()
+        self.tab_frequency_alarm_cleartime.setObjectName("tab_frequency_alarm_cleartime")
+        self.horizontalLayout_23 = QtWidgets.QHBoxLayout(self.tab_frequency_alarm_cleartime)
+        self.horizontalLayout_23.setObjectName("horizontalLayout_23")
+        self.gfxview_alarm_cleartime = QChartView(self.tab_frequency_alarm_cleartime)
+        self.gfxview_alarm_cleartime.setObjectName("gfxview_alarm_cleartime")
+        self.horizontalLayout_23.addWidget(self.gfxview_alarm_cleartime)
+        self.qwdg_frequency_alarm.addTab(self.tab_frequency_alarm_cleartime, "")
+        self.tab_frequency_alarm_avgcleartime = QtWidgets.QWidget()
+        self.tab_frequency_alarm_avgcleartime.setObjectName("tab_frequency_alarm_avgcleartime")
+        self.horizontalLayout_21 = QtWidgets.QHBoxLayout(self.tab_frequency_alarm_avgcleartime)
+        self.horizontalLayout_21.setObjectName("horizontalLayout_21")
+        self.gfxview_avgclear = QChartView(self.tab_frequency_alarm_avgcleartime)
+        self.gfxview_avgclear.setObjectName("gfxview_avgclear")
+        self.horizontalLayout_21.addWidget(self.gfxview_avgclear)
+        self.qwdg_frequency_alarm.addTab(self.tab_frequency_alarm_avgcleartime, "")
+        self.horizontalLayout_16.addWidget(self.qwdg_frequency_alarm)
+        self.tab_frequency_main.addTab(self.tab_frequency_alarm, "")
+        self.tab_frequency_goodbad = QtWidgets.QWidget()
+        self.tab_frequency_goodbad.setObjectName("tab_frequency_goodbad")
+        self.horizontalLayout_17 = QtWidgets.QHBoxLayout(self.tab_frequency_goodbad)
+        self.horizontalLayout_17.setObjectName("horizontalLayout_17")
+        self.qwdg_frequency_goodbad = QtWidgets.QTabWidget(self.tab_frequency_goodbad)
+        self.qwdg_frequency_goodbad.setObjectName("qwdg_frequency_goodbad")
+        self.tab_frequency_goodbad_bad = QtWidgets.QWidget()
+        self.tab_frequency_goodbad_bad.setObjectName("tab_frequency_goodbad_bad")
+        self.horizontalLayout_26 = QtWidgets.QHBoxLayout(self.tab_frequency_goodbad_bad)
+        self.horizontalLayout_26.setObjectName("horizontalLayout_26")
+        self.gfxview_goodbadprod_machine = QChartView(self.tab_frequency_goodbad_bad)
+        self.gfxview_goodbadprod_machine.setObjectName("gfxview_goodbadprod_machine")
+        self.horizontalLayout_26.addWidget(self.gfxview_goodbadprod_machine)
+        self.qwdg_frequency_goodbad.addTab(self.tab_frequency_goodbad_bad, "")
+        self.horizontalLayout_17.addWidget(self.qwdg_frequency_goodbad)
+        self.tab_frequency_main.addTab(self.tab_frequency_goodbad, "")
+        self.horizontalLayout_14.addWidget(self.tab_frequency_main)
+        self.tabWidget.addTab(self.FrequencyAnalysis, "")
+        self.TimeSeriesAnalysis = QtWidgets.QWidget()
+        self.TimeSeriesAnalysis.setObjectName("TimeSeriesAnalysis")
+        self.horizontalLayout_5 = QtWidgets.QHBoxLayout(self.TimeSeriesAnalysis)
+        self.horizontalLayout_5.setObjectName("horizontalLayout_5")
+        self.tab_timeseriesanalysis_maintab = QtWidgets.QTabWidget(self.TimeSeriesAnalysis)
+        self.tab_timeseriesanalysis_maintab.setObjectName("tab_timeseriesanalysis_maintab")
+        self.tab_timeseries_time = QtWidgets.QWidget()
+        self.tab_timeseries_time.setObjectName("tab_timeseries_time")
+        self.horizontalLayout_7 = QtWidgets.QHBoxLayout(self.tab_timeseries_time)
+        self.horizontalLayout_7.setObjectName("horizontalLayout_7")
+        self.qwdg_timeseries_time = QtWidgets.QTabWidget(self.tab_timeseries_time)
+        self.qwdg_timeseries_time.setObjectName("qwdg_timeseries_time")
+        self.tab_avgspeed_time = QtWidgets.QWidget()
+        self.tab_avgspeed_time.setObjectName("tab_avgspeed_time")
+        self.horizontalLayout_12 = QtWidgets.QHBoxLayout(self.tab_avgspeed_time)
+        self.horizontalLayout_12.setObjectName("horizontalLayout_12")
+        self.gfxview_avgspeed_time = QChartView(self.tab_avgspeed_time)
+        self.gfxview_avgspeed_time.setObjectName("gfxview_avgspeed_time")
+        self.horizontalLayout_12.addWidget(self.gfxview_avgspeed_time)
+        self.qwdg_timeseries_time.addTab(self.tab_avgspeed_time, "")
+        self.tab_avgprod_time = QtWidgets.QWidget()
+        self.tab_avgprod_time.setObjectName("tab_avgprod_time")
+        self.horizontalLayout_8 = QtWidgets.QHBoxLayout(self.tab_avgprod_time)
+        self.horizontalLayout_8.setObjectName("horizontalLayout_8")
+        self.gfxview_avgprod_time = QChartView(self.tab_avgprod_time)
+        self.gfxview_avgprod_time.setObjectName("gfxview_avgprod_time")
+        self.horizontalLayout_8.addWidget(self.gfxview_avgprod_time)
+        self.qwdg_timeseries_time.addTab(self.tab_avgprod_time, "")
+        self.horizontalLayout_7.addWidget(self.qwdg_timeseries_time)
+        self.tab_timeseriesanalysis_maintab.addTab(self.tab_timeseries_time, "")
+        self.tab_timeseries_hour = QtWidgets.QWidget()
+        self.tab_timeseries_hour.setObjectName("tab_timeseries_hour")
+        self.horizontalLayout_6 = QtWidgets.QHBoxLayout(self.tab_timeseries_hour)
+        self.horizontalLayout_6.setObjectName("horizontalLayout_6")
+        self.qwdg_timeseries_hour = QtWidgets.QTabWidget(self.tab_timeseries_hour)
+        self.qwdg_timeseries_hour.setObjectName("qwdg_timeseries_hour")
+        self.tab_avgspeed_hour = QtWidgets.QWidget()
+        self.tab_avgspeed_hour.setObjectName("tab_avgspeed_hour")
+        self.horizontalLayout_13 = QtWidgets.QHBoxLayout(self.tab_avgspeed_hour)
+        self.horizontalLayout_13.setObjectName("horizontalLayout_13")
+        self.gfxview_avgspeed_hour = QChartView(self.tab_avgspeed_hour)
+        self.gfxview_avgspeed_hour.setObjectName("gfxview_avgspeed_hour")
+        self.horizontalLayout_13.addWidget(self.gfxview_avgspeed_hour)
+        self.qwdg_timeseries_hour.addTab(self.tab_avgspeed_hour, "")
+        self.tab_avgprod_hour = QtWidgets.QWidget()
+        self.tab_avgprod_hour.setObjectName("tab_avgprod_hour")
+        self.horizontalLayout_27 = QtWidgets.QHBoxLayout(self.tab_avgprod_hour)
+        self.horizontalLayout_27.setObjectName("horizontalLayout_27")
+        self.gfxview_avgprod_hour = QChartView(self.tab_avgprod_hour)
+        self.gfxview_avgprod_hour.setObjectName("gfxview_avgprod_hour")
+        self.horizontalLayout_27.addWidget(self.gfxview_avgprod_hour)
+        self.qwdg_timeseries_hour.addTab(self.tab_avgprod_hour, "")
+        self.tab_goodbadratio_hour = QtWidgets.QWidget()
+        self.tab_goodbadratio_hour.setObjectName("tab_goodbadratio_hour")
+        self.horizontalLayout_29 = QtWidgets.QHBoxLayout(self.tab_goodbadratio_hour)
+        self.horizontalLayout_29.setObjectName("horizontalLayout_29")
+        self.gfxview_goodbadratio_hour = QChartView(self.tab_goodbadratio_hour)
+        self.gfxview_goodbadratio_hour.setObjectName("gfxview_goodbadratio_hour")
+        self.horizontalLayout_29.addWidget(self.gfxview_goodbadratio_hour)
+        self.qwdg_timeseries_hour.addTab(self.tab_goodbadratio_hour, "")
+        self.tab_uptime_hour = QtWidgets.QWidget()
+        self.tab_uptime_hour.setObjectName("tab_uptime_hour")
+        self.horizontalLayout_30 = QtWidgets.QHBoxLayout(self.tab_uptime_hour)
+        self.horizontalLayout_30.setObjectName("horizontalLayout_30")
+        self.gfxview_uptime_hour = QChartView(self.tab_uptime_hour)
+        self.gfxview_uptime_hour.setObjectName("gfxview_uptime_hour")
+        self.horizontalLayout_30.addWidget(self.gfxview_uptime_hour)
+        self.qwdg_timeseries_hour.addTab(self.tab_uptime_hour, "")
+        self.horizontalLayout_6.addWidget(self.qwdg_timeseries_hour)
+        self.tab_timeseriesanalysis_maintab.addTab(self.tab_timeseries_hour, "")
+        self.horizontalLayout_5.addWidget(self.tab_timeseriesanalysis_maintab)
+        self.tabWidget.addTab(self.TimeSeriesAnalysis, "")
+        self.verticalLayout.addWidget(self.tabWidget)
+        self.horizontalLayout_2.addLayout(self.verticalLayout)
+
+        self.retranslateUi(AnalyticsView)
+        self.tabWidget.setCurrentIndex(1)
+        self.tab_frequency_main.setCurrentIndex(1)
+        self.qwdg_frequency_state.setCurrentIndex(2)
+        self.qwdg_frequency_alarm.setCurrentIndex(1)
+        self.qwdg_frequency_goodbad.setCurrentIndex(0)
+        self.tab_timeseriesanalysis_maintab.setCurrentIndex(0)
+        self.qwdg_timeseries_time.setCurrentIndex(0)
+        self.qwdg_timeseries_hour.setCurrentIndex(3)
+        QtCore.QMetaObject.connectSlotsByName(AnalyticsView)
+
+    def retranslateUi(self, AnalyticsView):
+        _translate = QtCore.QCoreApplication.translate
+        AnalyticsView.setWindowTitle(_translate("AnalyticsView", "Form"))
+        self.pbLoad.setText(_translate("AnalyticsView", "Load"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.DescriptiveAnalysis), _translate("AnalyticsView", "Descriptive Analysis"))
+        self.qwdg_frequency_state.setTabText(self.qwdg_frequency_state.indexOf(self.tab_frequency_state_total), _translate("AnalyticsView", "Total_time"))
+        self.qwdg_frequency_state.setTabText(self.qwdg_frequency_state.indexOf(self.tab_frequency_state_avgspeed), _translate("AnalyticsView", "Average_speed"))
+        self.qwdg_frequency_state.setTabText(self.qwdg_frequency_state.indexOf(self.tab_frequency_state_avgprod), _translate("AnalyticsView", "Average_production"))
+        self.tab_frequency_main.setTabText(self.tab_frequency_main.indexOf(self.tab_frequency_state), _translate("AnalyticsView", "State"))
+        self.qwdg_frequency_alarm.setTabText(self.qwdg_frequency_alarm.indexOf(self.tab_frequency_alarm_count), _translate("AnalyticsView", "Alarm Count"))
+        self.qwdg_frequency_alarm.setTabText(self.qwdg_frequency_alarm.indexOf(self.tab_frequency_alarm_cleartime), _translate("AnalyticsView", "Alarm Clear Time"))
+        self.qwdg_frequency_alarm.setTabText(self.qwdg_frequency_alarm.indexOf(self.tab_frequency_alarm_avgcleartime), _translate("AnalyticsView", "Average Alarm Clear Time"))
+        self.tab_frequency_main.setTabText(self.tab_frequency_main.indexOf(self.tab_frequency_alarm), _translate("AnalyticsView", "Alarm"))
+        self.qwdg_frequency_goodbad.setTabText(self.qwdg_frequency_goodbad.indexOf(self.tab_frequency_goodbad_bad), _translate("AnalyticsView", "Good/Bad Production"))
+        self.tab_frequency_main.setTabText(self.tab_frequency_main.indexOf(self.tab_frequency_goodbad), _translate("AnalyticsView", "Good/Bad"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.FrequencyAnalysis), _translate("AnalyticsView", "Frequency Analysis"))
+        self.qwdg_timeseries_time.setTabText(self.qwdg_timeseries_time.indexOf(self.tab_avgspeed_time), _translate("AnalyticsView", "Average Speed"))
+        self.qwdg_timeseries_time.setTabText(self.qwdg_timeseries_time.indexOf(self.tab_avgprod_time), _translate("AnalyticsView", "Average Prod"))
+        self.tab_timeseriesanalysis_maintab.setTabText(self.tab_timeseriesanalysis_maintab.indexOf(self.tab_timeseries_time), _translate("AnalyticsView", "Time"))
+        self.qwdg_timeseries_hour.setTabText(self.qwdg_timeseries_hour.indexOf(self.tab_avgspeed_hour), _translate("AnalyticsView", "Average Speed"))
+        self.qwdg_timeseries_hour.setTabText(self.qwdg_timeseries_hour.indexOf(self.tab_avgprod_hour), _translate("AnalyticsView", "Average Production"))
+        self.qwdg_timeseries_hour.setTabText(self.qwdg_timeseries_hour.indexOf(self.tab_goodbadratio_hour), _translate("AnalyticsView", "Good/Bad Ratio"))
+        self.qwdg_timeseries_hour.setTabText(self.qwdg_timeseries_hour.indexOf(self.tab_uptime_hour), _translate("AnalyticsView", "Uptime Percent"))
+        self.tab_timeseriesanalysis_maintab.setTabText(self.tab_timeseriesanalysis_maintab.indexOf(self.tab_timeseries_hour), _translate("AnalyticsView", "Hour"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.TimeSeriesAnalysis), _translate("AnalyticsView", "Time Series Analysis"))
+from PyQt6.QtCharts import QChartView